@@ -5,6 +5,9 @@ from typing import Optional
 
 import frappe
 
+from hr_time.api import logger
+from hr_time.api.utils.container import Lifetime, services
+
 
 class Status(enum.Enum):
     Present = 0,
@@ -69,6 +72,41 @@ class Attendance:
         self.employee_id = employee_id
 
 
+# Preloaded attendance records, indexed by employee ID and date
+class AttendanceIndex:
+    records: dict[tuple[str, datetime.date], Attendance]
+
+    def __init__(self, attendances: Optional[list[Attendance]] = None):
+        self.records = {}
+
+        for attendance in attendances or []:
+            self.insert(attendance)
+
+    def insert(self, attendance: Attendance):
+        self.records[(attendance.employee_id, attendance.date)] = attendance
+
+    # Same as AttendanceRepository.get(), but answered from the preloaded records
+    def get(self, employee_id: str, day: datetime.date) -> Optional[Attendance]:
+        return self.records.get((employee_id, day))
+
+    # Returns the IDs of all employees with at least one leave record
+    def get_employees_on_leave(self) -> list[str]:
+        employee_ids = {attendance.employee_id for attendance in self.records.values()
+                        if attendance.status is Status.OnLeave}
+
+        return sorted(employee_ids)
+
+    # Returns a new index just containing the records of the given employees
+    def select(self, employee_ids: list[str]) -> 'AttendanceIndex':
+        employee_ids = set(employee_ids)
+        return AttendanceIndex([attendance for (employee_id, _), attendance in self.records.items()
+                                if employee_id in employee_ids])
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+@services.provide(Lifetime.Worker)
 class AttendanceRepository:
     def get(self, employee_id: str, day: datetime.date) -> Optional[Attendance]:
         docs = frappe.get_all("Attendance", fields=["employee", "status", "leave_type", "attendance_date"],
@@ -78,13 +116,15 @@ class AttendanceRepository:
         if not docs:
             return None
 
-        status = Status.from_doc(docs[0].status)
+        return self._build_from_doc(docs[0])
 
-        return Attendance(employee_id,
-                          docs[0].attendance_date,
-                          status,
-                          None if status is not Status.OnLeave else LeaveType.from_doc(docs[0].leave_type)
-                          )
+    # Returns all submitted attendance records of the given employees between start and end date (both inclusive)
+    def get_range(self, employee_ids: list[str], start: datetime.date, end: datetime.date) -> AttendanceIndex:
+        docs = frappe.get_all("Attendance", fields=["employee", "status", "leave_type", "attendance_date"],
+                              filters=[["employee", "in", employee_ids], ["attendance_date", ">=", start],
+                                       ["attendance_date", "<=", end], ["docstatus", "=", 1]])
+
+        return AttendanceIndex([self._build_from_doc(doc) for doc in docs])
 
     # Saves the given attendance record
     def create(self, attendance: Attendance):
@@ -96,5 +136,98 @@ class AttendanceRepository:
         if attendance.leave_type is not None:
             doc.leave_type = attendance.leave_type.to_doc()
 
+        # Derived from the daily status, so the day is not queued for recalculation by the document events
+        doc.flags.hr_time_derived = True
+
         doc.save()
         doc.submit()
+
+    # Saves and submits the given attendance records in chunks, returns the number of created docs.
+    # If skip_hooks is true, records are written by multi-row inserts without running any ERPNext document hooks.
+    def create_all(self, attendances: list[Attendance], skip_hooks: bool = False, chunk_size: int = 500) -> int:
+        if not attendances:
+            return 0
+
+        if not skip_hooks:
+            for attendance in attendances:
+                self.create(attendance)
+
+            return len(attendances)
+
+        employees = self._get_employee_details(list({attendance.employee_id for attendance in attendances}))
+
+        # Employees deleted in the meantime are skipped before any name is reserved
+        for employee_id in {attendance.employee_id for attendance in attendances} - set(employees):
+            logger.info("Skipping attendance records of " + employee_id + ", as employee does not exist anymore")
+
+        attendances = [attendance for attendance in attendances if attendance.employee_id in employees]
+
+        if not attendances:
+            return 0
+
+        naming_series = frappe.get_meta("Attendance").get_field("naming_series").options.split("\n")[0]
+        names = self._reserve_names(naming_series, len(attendances))
+        now = frappe.utils.now()
+        user = frappe.session.user
+
+        for offset in range(0, len(attendances), chunk_size):
+            values = []
+
+            for index in range(offset, min(offset + chunk_size, len(attendances))):
+                attendance = attendances[index]
+                employee = employees[attendance.employee_id]
+
+                values.append((names[index], now, now, user, user, 1, naming_series, attendance.employee_id,
+                               employee.employee_name, employee.company, employee.department,
+                               attendance.status.to_doc(),
+                               None if attendance.leave_type is None else attendance.leave_type.to_doc(),
+                               attendance.date))
+
+            frappe.db.bulk_insert("Attendance", ["name", "creation", "modified", "owner", "modified_by", "docstatus",
+                                                 "naming_series", "employee", "employee_name", "company",
+                                                 "department", "status", "leave_type", "attendance_date"], values)
+
+        return len(attendances)
+
+    # Returns company related employee fields required by attendance docs, indexed by employee ID
+    @staticmethod
+    def _get_employee_details(employee_ids: list[str]) -> dict:
+        docs = frappe.get_all("Employee", fields=["name", "employee_name", "company", "department"],
+                              filters=[["name", "in", employee_ids]])
+
+        return {doc.name: doc for doc in docs}
+
+    # Reserves the given amount of consecutive document names of the attendance naming series. Names are built like
+    # frappe's make_autoname(): the "#" part defines the digit count (five, if missing), the parts before form the
+    # key of the series and the parts after are appended to the number.
+    @staticmethod
+    def _reserve_names(naming_series: str, count: int) -> list[str]:
+        if "#" not in naming_series:
+            naming_series += ".#####"
+
+        parts = naming_series.split(".")
+        number_index = next(index for index, part in enumerate(parts) if part.startswith("#"))
+        digits = len(parts[number_index])
+        prefix = frappe.model.naming.parse_naming_series(parts[:number_index])
+        suffix = frappe.model.naming.parse_naming_series(parts[number_index + 1:])
+
+        current = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE `name` = %s FOR UPDATE", prefix)
+
+        if current:
+            start = current[0][0]
+            frappe.db.sql("UPDATE `tabSeries` SET `current` = `current` + %s WHERE `name` = %s", (count, prefix))
+        else:
+            start = 0
+            frappe.db.sql("INSERT INTO `tabSeries` (`name`, `current`) VALUES (%s, %s)", (prefix, count))
+
+        return [prefix + str(start + index).zfill(digits) + suffix for index in range(1, count + 1)]
+
+    @staticmethod
+    def _build_from_doc(doc) -> Attendance:
+        status = Status.from_doc(doc.status)
+
+        return Attendance(doc.employee,
+                          doc.attendance_date,
+                          status,
+                          None if status is not Status.OnLeave else LeaveType.from_doc(doc.leave_type)
+                          )
@@ -0,0 +1,108 @@
+import bisect
+import datetime
+from array import array
+from typing import Optional
+
+from hr_time.api import logger
+from hr_time.api.check_in.event import CheckinEvent
+from hr_time.api.flextime.repository import DurationColumns
+
+# Bits of the flags column
+FLAG_IN = 1
+FLAG_BREAK = 2
+
+
+# Compact store of time ordered checkin events as parallel columns.
+# Timestamps are stored as seconds since 0001-01-01 (proleptic ordinal), sub-second precision is dropped.
+class CheckinColumns:
+    # Document IDs
+    ids: list[str]
+
+    # Timestamps in ordinal seconds
+    times: array
+
+    # Combination of FLAG_IN and FLAG_BREAK
+    flags: array
+
+    def __init__(self):
+        self.ids = []
+        self.times = array("q")
+        self.flags = array("B")
+
+    @staticmethod
+    def from_events(events: list[CheckinEvent]) -> 'CheckinColumns':
+        columns = CheckinColumns()
+
+        for event in events:
+            columns.append(event.id, event.timestamp, event.is_in, event.is_break)
+
+        return columns
+
+    def append(self, name: str, timestamp: datetime.datetime, is_in: bool, is_break: bool):
+        self.ids.append(name)
+        self.times.append(timestamp.toordinal() * 86400 + timestamp.hour * 3600 + timestamp.minute * 60
+                          + timestamp.second)
+        self.flags.append((FLAG_IN if is_in else 0) | (FLAG_BREAK if is_break else 0))
+
+    # Returns the index range [begin, end) of each day, days without events are not included
+    def split_by_day(self) -> dict[datetime.date, tuple[int, int]]:
+        ranges = {}
+        begin = 0
+
+        while begin < len(self.times):
+            ordinal = self.times[begin] // 86400
+            end = bisect.bisect_left(self.times, (ordinal + 1) * 86400, begin)
+
+            ranges[datetime.date.fromordinal(ordinal)] = (begin, end)
+            begin = end
+
+        return ranges
+
+    def get_event(self, index: int) -> CheckinEvent:
+        ordinal, second = divmod(self.times[index], 86400)
+        timestamp = datetime.datetime.combine(datetime.date.fromordinal(ordinal), datetime.time()) \
+            + datetime.timedelta(seconds=second)
+
+        return CheckinEvent(self.ids[index], timestamp, bool(self.flags[index] & FLAG_IN),
+                            bool(self.flags[index] & FLAG_BREAK))
+
+    # Pairs the events of the given index range to durations, same rules as CheckinList.get_durations()
+    def get_durations(self, begin: int = 0, end: Optional[int] = None) -> DurationColumns:
+        end = len(self.times) if end is None else end
+        durations = DurationColumns(self.ids)
+        times = self.times
+        flags = self.flags
+        current = -1
+
+        for index in range(begin, end):
+            if current < 0:
+                current = index
+                continue
+
+            current_flags = flags[current]
+
+            # Cannot start with a non-break OUT event
+            if not current_flags & (FLAG_IN | FLAG_BREAK):
+                logger.info("Unable to match checkin event " + self.ids[current])
+                current = index
+                continue
+
+            # Matching OUT event to current IN event
+            if current_flags == FLAG_IN:
+                if not flags[index] & FLAG_IN:
+                    durations.append(times[current] % 86400, times[index] % 86400, False, current, index)
+                    current = index if flags[index] & FLAG_BREAK else -1
+                else:
+                    logger.info("Skipping double checkin event " + self.ids[index])
+
+                continue
+
+            # Currently in break, searching for IN event
+            if current_flags == FLAG_BREAK and flags[index] & FLAG_IN:
+                durations.append(times[current] % 86400, times[index] % 86400, True, current, index)
+                current = index
+
+        return durations
+
+    def __len__(self) -> int:
+        return len(self.times)
@@ -0,0 +1,280 @@
+import copy
+import datetime
+from typing import Optional
+
+import frappe
+
+from hr_time.api import logger
+from hr_time.api.check_in.event import CheckinEvent
+from hr_time.api.check_in.repository import CheckinRepository
+from hr_time.api.flextime.repository import DurationType
+from hr_time.api.utils.container import Lifetime, services
+
+
+# Checkin state of an employee at a single day, maintained incrementally event by event.
+# Applying all events of a day in time order gives the same results as replaying the day with
+# CheckinList.get_durations().
+class DayState:
+    employee_id: str
+    date: datetime.date
+
+    # Flags of the latest event, both false if no event exists
+    is_in: bool
+    is_break: bool
+
+    # Timestamp of the latest event, None if no event exists
+    state_since: Optional[datetime.datetime]
+
+    # Timestamp of the first event
+    first_checkin: Optional[datetime.datetime]
+
+    # True if at least one break event exists
+    had_break: bool
+
+    # Sum of all matched durations in seconds
+    work_seconds: int
+    break_seconds: int
+
+    # Type of the latest matched duration, None if no duration was matched yet
+    last_duration_type: Optional[DurationType]
+
+    # Event waiting for its matching event, same as "current" of CheckinList.get_durations()
+    pending: Optional[CheckinEvent]
+
+    def __init__(self, employee_id: str, date: datetime.date):
+        self.employee_id = employee_id
+        self.date = date
+        self.is_in = False
+        self.is_break = False
+        self.state_since = None
+        self.first_checkin = None
+        self.had_break = False
+        self.work_seconds = 0
+        self.break_seconds = 0
+        self.last_duration_type = None
+        self.pending = None
+
+    @staticmethod
+    def from_events(employee_id: str, date: datetime.date, events: list[CheckinEvent]) -> 'DayState':
+        state = DayState(employee_id, date)
+
+        for event in events:
+            state.apply(event)
+
+        return state
+
+    # Applies the given event, which must not be older than the latest applied event
+    def apply(self, event: CheckinEvent):
+        self.is_in = event.is_in
+        self.is_break = event.is_break
+        self.state_since = event.timestamp
+        self.had_break = self.had_break or event.is_break
+
+        if self.first_checkin is None:
+            self.first_checkin = event.timestamp
+
+        current = self.pending
+
+        if current is None:
+            self.pending = event
+            return
+
+        # Cannot start with a non-break OUT event
+        if (not current.is_in) and (not current.is_break):
+            logger.info("Unable to match checkin event " + current.id)
+            self.pending = event
+            return
+
+        # Matching OUT event to current IN event
+        if current.is_in and (not current.is_break):
+            if not event.is_in:
+                self._add_duration(current, event, DurationType.WORK)
+                self.pending = event if event.is_break else None
+            else:
+                logger.info("Skipping double checkin event " + event.id)
+
+            return
+
+        # Currently in break, searching for IN event
+        if (not current.is_in) and current.is_break and event.is_in:
+            self._add_duration(current, event, DurationType.BREAK)
+            self.pending = event
+
+    # Returns true if at least one event was applied
+    def has_events(self) -> bool:
+        return self.state_since is not None
+
+    # Returns the total duration of the current state in seconds, with the current duration closed at the given time.
+    # Same as summing up the durations of the current type after CheckinList.close_current().
+    def get_current_duration(self, now: datetime.datetime) -> int:
+        state = self
+
+        if self.is_in or self.is_break:
+            state = copy.copy(self)
+            state.apply(CheckinEvent("Simulated", now, not self.is_in, False))
+
+        match state.last_duration_type:
+            case DurationType.WORK:
+                return state.work_seconds
+            case DurationType.BREAK:
+                return state.break_seconds
+
+        return 0
+
+    def _add_duration(self, first: CheckinEvent, second: CheckinEvent, duration_type: DurationType):
+        # Same as CheckinDuration.total_time, durations crossing midnight are wrapped
+        seconds = (self._get_second_of_day(second.timestamp) - self._get_second_of_day(first.timestamp)) % 86400
+
+        if duration_type is DurationType.BREAK:
+            self.break_seconds += seconds
+        else:
+            self.work_seconds += seconds
+
+        self.last_duration_type = duration_type
+
+    @staticmethod
+    def _get_second_of_day(timestamp: datetime.datetime) -> int:
+        return timestamp.hour * 3600 + timestamp.minute * 60 + timestamp.second
+
+
+# Stores the day state of each employee, just the state of the latest day with checkin events is kept
+@services.provide(Lifetime.Worker)
+class DayStateRepository:
+    _doc_type = "Checkin day state"
+
+    _fields = ["employee", "date", "state", "state_since", "first_checkin", "had_break", "work_seconds",
+               "break_seconds", "last_duration_type", "pending_checkin", "pending_time", "pending_is_in",
+               "pending_is_break"]
+
+    # Returns the stored state of the given employee and day, None if no state of this day is stored
+    def get(self, employee_id: str, date: datetime.date) -> Optional[DayState]:
+        doc = frappe.db.get_value(self._doc_type, employee_id, self._fields, as_dict=True)
+
+        if not doc or doc.date != date:
+            return None
+
+        return self._build_from_doc(doc)
+
+    # Returns the modification timestamp of the stored state, None if no state is stored
+    def get_modified(self, employee_id: str) -> Optional[datetime.datetime]:
+        return frappe.db.get_value(self._doc_type, employee_id, "modified")
+
+    # Returns the stored states of the given employees and day, indexed by employee ID
+    def get_all(self, employee_ids: list[str], date: datetime.date) -> dict[str, DayState]:
+        if not employee_ids:
+            return {}
+
+        docs = frappe.get_all(self._doc_type, fields=self._fields,
+                              filters=[["employee", "in", employee_ids], ["date", "=", date]])
+
+        return {doc.employee: self._build_from_doc(doc) for doc in docs}
+
+    # Applies the given (inserted) event to the stored state. Events of a new day start a new state, events older
+    # than the stored state cause a replay of the day. Events of previous days are ignored.
+    def apply(self, employee_id: str, event: CheckinEvent):
+        date = event.timestamp.date()
+        doc = frappe.db.get_value(self._doc_type, employee_id, self._fields, as_dict=True, for_update=True)
+
+        if doc and doc.date > date:
+            return
+
+        if doc and doc.date == date and doc.state_since is not None and event.timestamp >= doc.state_since:
+            state = self._build_from_doc(doc)
+            state.apply(event)
+        else:
+            state = self._replay(employee_id, date)
+
+        self.save(state)
+
+    # Replays the given day (e.g. after an event was changed or deleted), if it is not older than the stored state
+    def rebuild(self, employee_id: str, date: datetime.date):
+        stored_date = frappe.db.get_value(self._doc_type, employee_id, "date", for_update=True)
+
+        if stored_date is not None and stored_date > date:
+            return
+
+        self.save(self._replay(employee_id, date))
+
+    def save(self, state: DayState):
+        now = frappe.utils.now()
+        user = frappe.session.user
+        pending = state.pending
+
+        values = {
+            "name": state.employee_id,
+            "now": now,
+            "user": user,
+            "date": state.date,
+            "state": self._state_to_doc(state),
+            "state_since": state.state_since,
+            "first_checkin": state.first_checkin,
+            "had_break": 1 if state.had_break else 0,
+            "work_seconds": state.work_seconds,
+            "break_seconds": state.break_seconds,
+            "last_duration_type": self._duration_type_to_doc(state.last_duration_type),
+            "pending_checkin": None if pending is None else pending.id,
+            "pending_time": None if pending is None else pending.timestamp,
+            "pending_is_in": 1 if pending is not None and pending.is_in else 0,
+            "pending_is_break": 1 if pending is not None and pending.is_break else 0
+        }
+
+        frappe.db.sql("""
+            INSERT INTO `tabCheckin day state` (name, creation, modified, owner, modified_by, docstatus, employee,
+                date, state, state_since, first_checkin, had_break, work_seconds, break_seconds, last_duration_type,
+                pending_checkin, pending_time, pending_is_in, pending_is_break)
+            VALUES (%(name)s, %(now)s, %(now)s, %(user)s, %(user)s, 0, %(name)s, %(date)s, %(state)s,
+                %(state_since)s, %(first_checkin)s, %(had_break)s, %(work_seconds)s, %(break_seconds)s,
+                %(last_duration_type)s, %(pending_checkin)s, %(pending_time)s, %(pending_is_in)s,
+                %(pending_is_break)s)
+            ON DUPLICATE KEY UPDATE modified = VALUES(modified), modified_by = VALUES(modified_by),
+                date = VALUES(date), state = VALUES(state), state_since = VALUES(state_since),
+                first_checkin = VALUES(first_checkin), had_break = VALUES(had_break),
+                work_seconds = VALUES(work_seconds), break_seconds = VALUES(break_seconds),
+                last_duration_type = VALUES(last_duration_type), pending_checkin = VALUES(pending_checkin),
+                pending_time = VALUES(pending_time), pending_is_in = VALUES(pending_is_in),
+                pending_is_break = VALUES(pending_is_break)
+        """, values)
+
+    @staticmethod
+    def _replay(employee_id: str, date: datetime.date) -> DayState:
+        return DayState.from_events(employee_id, date, services.get(CheckinRepository).get(date, employee_id).events)
+
+    @staticmethod
+    def _build_from_doc(doc) -> DayState:
+        state = DayState(doc.employee, doc.date)
+        state.is_in = doc.state == "In"
+        state.is_break = doc.state == "Break"
+        state.state_since = doc.state_since
+        state.first_checkin = doc.first_checkin
+        state.had_break = bool(doc.had_break)
+        state.work_seconds = doc.work_seconds or 0
+        state.break_seconds = doc.break_seconds or 0
+
+        match doc.last_duration_type:
+            case "Work":
+                state.last_duration_type = DurationType.WORK
+            case "Break":
+                state.last_duration_type = DurationType.BREAK
+
+        if doc.pending_time is not None:
+            state.pending = CheckinEvent(doc.pending_checkin, doc.pending_time, bool(doc.pending_is_in),
+                                         bool(doc.pending_is_break))
+
+        return state
+
+    @staticmethod
+    def _state_to_doc(state: DayState) -> str:
+        if state.is_in:
+            return "In"
+
+        return "Break" if state.is_break else "Out"
+
+    @staticmethod
+    def _duration_type_to_doc(duration_type: Optional[DurationType]) -> Optional[str]:
+        match duration_type:
+            case DurationType.WORK:
+                return "Work"
+            case DurationType.BREAK:
+                return "Break"
+
+        return None
@@ -0,0 +1,35 @@
+import frappe
+
+from hr_time.api.check_in.day_state import DayStateRepository
+from hr_time.api.check_in.event import CheckinEvent
+from hr_time.api.flextime.api import publish_checkin_status
+from hr_time.api.utils.container import services
+
+
+# Document event handlers of Employee Checkin (see hooks.py), maintaining the day state and pushing the changed
+# status to the employees desk
+
+def on_checkin_insert(doc, method=None):
+    event = CheckinEvent(doc.name, frappe.utils.get_datetime(doc.time), doc.log_type == "IN",
+                         bool(doc.custom_is_break))
+
+    services.get(DayStateRepository).apply(doc.employee, event)
+    publish_checkin_status(doc.employee)
+
+
+def on_checkin_change(doc, method=None):
+    previous = doc.get_doc_before_save()
+
+    # Inserts are handled by on_checkin_insert()
+    if method == "on_update" and previous is None:
+        return
+
+    repository = services.get(DayStateRepository)
+    repository.rebuild(doc.employee, frappe.utils.get_datetime(doc.time).date())
+
+    # Day of the previous check-in time (or employee) is affected as well
+    if previous is not None and (previous.employee != doc.employee or previous.time != doc.time):
+        repository.rebuild(previous.employee, frappe.utils.get_datetime(previous.time).date())
+        publish_checkin_status(previous.employee)
+
+    publish_checkin_status(doc.employee)
@@ -2,16 +2,65 @@ import datetime
 from typing import Optional
 
 from hr_time.api import logger
+from hr_time.api.check_in.columns import CheckinColumns
 from hr_time.api.check_in.event import CheckinEvent
-from hr_time.api.flextime.repository import CheckinDuration
+from hr_time.api.flextime.repository import CheckinDuration, DurationColumns
 from hr_time.api.utils.clock import Clock
 
 
 class CheckinList:
-    events: list[CheckinEvent]
+    _events: Optional[list[CheckinEvent]]
+
+    # Column store and index range backing this list, if created by from_columns()
+    _columns: Optional[CheckinColumns]
+    _range: tuple[int, int]
 
     def __init__(self, events: list[CheckinEvent]):
-        self.events = events
+        self._events = events
+        self._columns = None
+        self._range = (0, 0)
+
+    # Creates a list backed by the given index range [begin, end) of the column store, event objects are just
+    # created on access of events
+    @staticmethod
+    def from_columns(columns: CheckinColumns, begin: int, end: int) -> 'CheckinList':
+        checkin_list = CheckinList([])
+        checkin_list._events = None
+        checkin_list._columns = columns
+        checkin_list._range = (begin, end)
+
+        return checkin_list
+
+    # Splits the given column store into one list per day, backed by the column store
+    @staticmethod
+    def split_columns_by_day(columns: CheckinColumns) -> dict[datetime.date, 'CheckinList']:
+        return {day: CheckinList.from_columns(columns, begin, end)
+                for day, (begin, end) in columns.split_by_day().items()}
+
+    @property
+    def events(self) -> list[CheckinEvent]:
+        if self._events is None:
+            self._events = [self._columns.get_event(index) for index in range(*self._range)]
+
+            # Modifications are done on the event objects from now on
+            self._columns = None
+
+        return self._events
+
+    # Splits the given (time ordered) events into one list per day
+    @staticmethod
+    def split_by_day(events: list[CheckinEvent]) -> dict[datetime.date, 'CheckinList']:
+        lists = {}
+
+        for event in events:
+            day = event.timestamp.date()
+
+            if day not in lists:
+                lists[day] = CheckinList([])
+
+            lists[day].events.append(event)
+
+        return lists
 
     # Processes the event list and builds durations
     def get_durations(self) -> list[CheckinDuration]:
@@ -55,6 +104,13 @@ class CheckinList:
 
         return durations
 
+    # Same as get_durations(), but pairs the events on the column store and returns integer columns
+    def get_duration_columns(self) -> DurationColumns:
+        if self._columns is not None:
+            return self._columns.get_durations(*self._range)
+
+        return CheckinColumns.from_events(self.events).get_durations()
+
     def get_latest(self) -> Optional[CheckinEvent]:
         if not self.events:
             return None
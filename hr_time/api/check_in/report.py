@@ -2,9 +2,12 @@ import datetime
 
 import frappe
 
+from hr_time.api.check_in.day_state import DayState, DayStateRepository
+from hr_time.api.check_in.list import CheckinList
 from hr_time.api.check_in.repository import CheckinRepository
 from hr_time.api.check_in.service import State
-from hr_time.api.employee.repository import EmployeeRepository, Employee, TimeModel
+from hr_time.api.employee.repository import EmployeeRepository, Employee
+from hr_time.api.utils.container import services
 
 
 class PresentEmployee:
@@ -39,37 +42,33 @@ class PresentEmployee:
 class CheckinReportService:
     employees: EmployeeRepository
     data: CheckinRepository
+    day_states: DayStateRepository
 
-    def __init__(self, employees: EmployeeRepository, data: CheckinRepository):
+    def __init__(self, employees: EmployeeRepository, data: CheckinRepository, day_states: DayStateRepository):
         super().__init__()
 
         self.employees = employees
         self.data = data
+        self.day_states = day_states
 
     @staticmethod
     def prod():
-        return CheckinReportService(EmployeeRepository(), CheckinRepository())
+        return services.get(CheckinReportService, lambda: CheckinReportService(
+            services.get(EmployeeRepository), services.get(CheckinRepository), services.get(DayStateRepository)))
 
     def get_present(self, filter_status=None) -> [PresentEmployee]:
-        employees = self.employees.get_all()
-        rows = []
-
         today = datetime.date.today()
+        employees = self.employees.get_flextime(today)
+        day_states = self._get_day_states([employee.id for employee in employees], today)
+        rows = []
 
         for employee in employees:
-            if employee.time_model is not TimeModel.Flextime:
-                continue
-
-            events = self.data.get(today, employee.id)
-            latest_event = events.get_latest()
+            day_state = day_states[employee.id]
 
-            if latest_event is None:
+            if (not day_state.is_in) and (not day_state.is_break):
                 continue
 
-            if (not latest_event.is_in) and (not latest_event.is_break):
-                continue
-
-            status = State.Break if latest_event.is_break else State.In
+            status = State.Break if day_state.is_break else State.In
 
             if (filter_status is not None) and (status != filter_status):
                 continue
@@ -77,8 +76,23 @@ class CheckinReportService:
             rows.append(PresentEmployee(
                 employee,
                 status,
-                latest_event.timestamp.time(),
-                events.events[0].timestamp.time()
+                day_state.state_since.time(),
+                day_state.first_checkin.time()
             ))
 
         return rows
+
+    # Returns the stored day states of the given employees. Days without stored state are replayed, the events of
+    # those employees are loaded at once.
+    def _get_day_states(self, employee_ids: list[str], date: datetime.date) -> dict[str, DayState]:
+        day_states = self.day_states.get_all(employee_ids, date)
+        missing = [employee_id for employee_id in employee_ids if employee_id not in day_states]
+
+        if missing:
+            checkins = self.data.get_range_by_employee(date, date, missing)
+
+            for employee_id in missing:
+                events = checkins.get(employee_id, {}).get(date, CheckinList([]))
+                day_states[employee_id] = DayState.from_events(employee_id, date, events.events)
+
+        return day_states
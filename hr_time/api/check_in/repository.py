@@ -2,26 +2,73 @@ import datetime
 
 import frappe
 
+from hr_time.api.check_in.columns import CheckinColumns
 from hr_time.api.check_in.event import CheckinEvent
 from hr_time.api.check_in.list import CheckinList
+from hr_time.api.utils.container import Lifetime, services
 
 
+@services.provide(Lifetime.Worker)
 class CheckinRepository:
     # Returns all checkin events of the given date for the given employee
     def get(self, date: datetime.date, employee_id: str) -> CheckinList:
         time_min = date.isoformat() + " 00:00:00"
         time_max = date.isoformat() + " 23:59:59"
 
+        return CheckinList(self._load([employee_id], time_min, time_max).get(employee_id, []))
+
+    # Returns all checkin events between start and end date (both inclusive) of the given employee, grouped by day.
+    # Days without any checkin event are not included.
+    def get_range(self, start: datetime.date, end: datetime.date, employee_id: str) -> dict[datetime.date, CheckinList]:
+        return self.get_range_by_employee(start, end, [employee_id]).get(employee_id, {})
+
+    # Same as get_range(), but loads the events of all given employees with a single query.
+    # Result is grouped by employee ID and day, the lists of an employee share a compact column store.
+    def get_range_by_employee(self, start: datetime.date, end: datetime.date,
+                              employee_ids: list[str]) -> dict[str, dict[datetime.date, CheckinList]]:
+        time_min = start.isoformat() + " 00:00:00"
+        time_max = end.isoformat() + " 23:59:59"
+
+        lists = {}
+
+        for employee_id, columns in self._load_columns(employee_ids, time_min, time_max).items():
+            lists[employee_id] = CheckinList.split_columns_by_day(columns)
+
+        return lists
+
+    # Returns the time ordered checkin events by employee ID
+    @staticmethod
+    def _load(employee_ids: list[str], time_min: str, time_max: str) -> dict[str, list[CheckinEvent]]:
         docs = frappe.get_all("Employee Checkin", fields=["name", "employee", "log_type", "time", "custom_is_break"],
-                              filters=[["employee", "=", employee_id], ["time", ">=", time_min],
+                              filters=[["employee", "in", employee_ids], ["time", ">=", time_min],
                                        ["time", "<=", time_max]], order_by="time asc")
 
-        events = []
+        events = {}
 
         for doc in docs:
-            events.append(CheckinEvent(doc.name, doc.time, doc.log_type == "IN", doc.custom_is_break))
+            if doc.employee not in events:
+                events[doc.employee] = []
+
+            events[doc.employee].append(CheckinEvent(doc.name, doc.time, doc.log_type == "IN", doc.custom_is_break))
+
+        return events
+
+    # Same as _load(), but stores the events in column stores instead of creating event objects
+    @staticmethod
+    def _load_columns(employee_ids: list[str], time_min: str, time_max: str) -> dict[str, CheckinColumns]:
+        docs = frappe.get_all("Employee Checkin", fields=["name", "employee", "log_type", "time", "custom_is_break"],
+                              filters=[["employee", "in", employee_ids], ["time", ">=", time_min],
+                                       ["time", "<=", time_max]], order_by="time asc", as_list=True)
+
+        columns = {}
+
+        for name, employee_id, log_type, time, is_break in docs:
+            if employee_id not in columns:
+                columns[employee_id] = CheckinColumns()
+
+            columns[employee_id].append(name, time, log_type == "IN", is_break)
 
-        return CheckinList(events)
+        return columns
 
     def checkin(self, employee_id: str, log_type: str, is_break: bool):
         doc = frappe.new_doc("Employee Checkin")
@@ -1,11 +1,13 @@
 import datetime
 import enum
+from typing import Optional
 
 import frappe
 
-from hr_time.api.check_in.event import CheckinEvent
+from hr_time.api.check_in.day_state import DayState, DayStateRepository
 from hr_time.api.check_in.repository import CheckinRepository
-from hr_time.api.employee.repository import EmployeeRepository
+from hr_time.api.employee.repository import EmployeeRepository, Employee
+from hr_time.api.utils.container import services
 
 
 class State(enum.Enum):
@@ -64,28 +66,31 @@ class Action(enum.Enum):
 class CheckinService:
     employee: EmployeeRepository
     data: CheckinRepository
+    day_states: DayStateRepository
 
-    def __init__(self, employee: EmployeeRepository, data: CheckinRepository):
+    def __init__(self, employee: EmployeeRepository, data: CheckinRepository, day_states: DayStateRepository):
         super().__init__()
 
         self.employee = employee
         self.data = data
+        self.day_states = day_states
 
     @staticmethod
     def prod():
-        return CheckinService(EmployeeRepository(), CheckinRepository())
+        return services.get(CheckinService, lambda: CheckinService(
+            services.get(EmployeeRepository), services.get(CheckinRepository), services.get(DayStateRepository)))
 
     def get_current_status(self) -> CheckinStatus:
-        employee = self.employee.get_current()
+        return self.get_status(self.employee.get_current())
 
+    # Returns the status of the given employee
+    def get_status(self, employee: Optional[Employee]) -> CheckinStatus:
         if employee is None:
             return CheckinStatus(State.Unknown, False)
 
-        events = self.data.get(datetime.date.today(), employee.id)
-        state = self._event_to_state(events.get_latest())
-        had_break = events.has_break()
+        day_state = self._get_day_state(employee.id, datetime.date.today())
 
-        return CheckinStatus(state, had_break)
+        return CheckinStatus(self._day_state_to_state(day_state), day_state.had_break)
 
     # Checks in the current employee based on the given action
     def checkin(self, action: Action):
@@ -102,15 +107,21 @@ class CheckinService:
             case Action.endOfWork:
                 self.data.checkin(employee.id, "OUT", False)
 
+    # Returns the stored state of the given day. The day is replayed, if no state is stored (e.g. no checkin yet).
+    def _get_day_state(self, employee_id: str, date: datetime.date) -> DayState:
+        day_state = self.day_states.get(employee_id, date)
+
+        if day_state is None:
+            day_state = DayState.from_events(employee_id, date, self.data.get(date, employee_id).events)
+
+        return day_state
+
     @staticmethod
-    def _event_to_state(event: CheckinEvent) -> State:
-        if event is None:
-            return State.Out
+    def _day_state_to_state(day_state: DayState) -> State:
+        if day_state.is_in:
+            return State.In
 
-        if (not event.is_in) and event.is_break:
+        if day_state.is_break:
             return State.Break
 
-        if not event.is_in:
-            return State.Out
-
-        return State.In
+        return State.Out
@@ -0,0 +1,21 @@
+from hr_time.api.employee.repository import EmployeeRepository
+from hr_time.api.utils.container import services
+
+
+# Document event handlers of Employee (see hooks.py)
+
+def on_employee_change(doc, method=None):
+    repository = services.get(EmployeeRepository)
+    repository.clear_cache()
+
+    # Cached employee of the linked user (and the previously linked user) is outdated, e.g. by a changed user ID,
+    # grade or time model
+    previous = doc.get_doc_before_save()
+    repository.clear_user_cache([doc.user_id, None if previous is None else previous.user_id])
+
+
+# Called by frappe with the old and new name, the cached employee of the linked user still has the old ID
+def on_employee_rename(doc, method=None, old=None, new=None, merge=False):
+    repository = services.get(EmployeeRepository)
+    repository.clear_cache()
+    repository.clear_user_cache([doc.user_id])
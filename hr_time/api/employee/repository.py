@@ -4,6 +4,9 @@ from typing import Optional
 
 import frappe
 
+from hr_time.api.utils.cache import SiteCache
+from hr_time.api.utils.container import Lifetime, services
+
 
 class TimeModel(Enum):
     Undefined = 0
@@ -28,37 +31,106 @@ class Employee:
     # Employee joined company at this date
     join_date: datetime.date
 
+    # Last working day, None if the employee did not leave
+    relieving_date: Optional[datetime.date]
+
     def __init__(self, id: str, full_name: str, time_model: TimeModel, grade: str, date_of_birth: datetime.date,
-                 join_date: datetime.date):
+                 join_date: datetime.date, relieving_date: Optional[datetime.date] = None):
         self.id = id
         self.full_name = full_name
         self.time_model = time_model
         self.grade = grade
         self.date_of_birth = date_of_birth
         self.join_date = join_date
+        self.relieving_date = relieving_date
 
-    # Returns false if the Employees age is below 18 years
+    # Returns true if the Employees age is below 18 years at the given day (default: today)
     def is_minor(self, today: Optional[datetime.date] = None) -> bool:
         if today is None:
             today = datetime.date.today()
 
+        adult_date = self.get_adult_date()
+        return adult_date is not None and today < adult_date
+
+    # Returns the 18th birthday, None if the date of birth is unknown
+    def get_adult_date(self) -> Optional[datetime.date]:
+        if self.date_of_birth is None:
+            return None
+
         try:
-            birthday_18 = datetime.date(self.date_of_birth.year + 18, self.date_of_birth.month, self.date_of_birth.day)
+            return datetime.date(self.date_of_birth.year + 18, self.date_of_birth.month, self.date_of_birth.day)
         except ValueError:
             # Handle leap year
-            birthday_18 = datetime.date(self.date_of_birth.year + 18, self.date_of_birth.month, 28)
+            return datetime.date(self.date_of_birth.year + 18, self.date_of_birth.month, 28)
 
-        return today < birthday_18
+    # Returns the day after the last day to be processed, which is the given day at maximum
+    def get_processing_end(self, today: datetime.date) -> datetime.date:
+        if self.relieving_date is None:
+            return today
+
+        return min(today, self.relieving_date + datetime.timedelta(days=1))
 
     def get_url(self) -> str:
         return "/app/employee/" + self.id
 
 
+# Flextime employees, which are either active or have a relieving date
+class EmployeeDirectory:
+    employees: list[Employee]
+
+    # IDs of employees with status "Active"
+    active_ids: set[str]
+
+    # Random token, changed on each rebuild
+    version: str
+
+    def __init__(self, version: str):
+        self.employees = []
+        self.active_ids = set()
+        self.version = version
+
+    def insert(self, employee: Employee, is_active: bool):
+        self.employees.append(employee)
+
+        if is_active:
+            self.active_ids.add(employee.id)
+
+    # Returns the employees being active, or not relieved before the given day
+    def get_active(self, day: datetime.date) -> list[Employee]:
+        return [employee for employee in self.employees
+                if employee.id in self.active_ids or employee.relieving_date >= day]
+
+
+@services.provide(Lifetime.Site)
 class EmployeeRepository:
-    doc_fields = ["name", "employee_name", "custom_time_model", "grade", "date_of_birth", "date_of_joining"]
+    _cache_key = "employee_directory"
+    _user_cache_prefix = "employee_by_user:"
+
+    doc_fields = ["name", "employee_name", "custom_time_model", "grade", "date_of_birth", "date_of_joining",
+                  "relieving_date"]
+
+    cache: SiteCache
+
+    def __init__(self, cache: Optional[SiteCache] = None):
+        self.cache = SiteCache() if cache is None else cache
 
-    def get_all(self) -> list[Employee]:
-        docs_employees = frappe.get_all("Employee", fields=self.doc_fields)
+    # Returns all employees, or just the employees with the given IDs. Optionally filtered by time model and by
+    # being active (or not relieved before the given day).
+    def get_all(self, employee_ids: Optional[list[str]] = None, time_model: Optional[TimeModel] = None,
+                active_on: Optional[datetime.date] = None) -> list[Employee]:
+        filters = []
+        or_filters = None
+
+        if employee_ids is not None:
+            filters.append(["name", "in", employee_ids])
+
+        if time_model is not None:
+            filters.append(["custom_time_model", "=", self._time_model_to_doc(time_model)])
+
+        if active_on is not None:
+            or_filters = [["status", "=", "Active"], ["relieving_date", ">=", active_on]]
+
+        docs_employees = frappe.get_all("Employee", fields=self.doc_fields, filters=filters, or_filters=or_filters)
         employees = []
 
         for doc in docs_employees:
@@ -66,17 +138,61 @@ class EmployeeRepository:
 
         return employees
 
-    # Returns the Employee object of the current user
+    # Returns the flextime employees being active at the given day, answered from the site-wide cached directory
+    def get_flextime(self, day: datetime.date) -> list[Employee]:
+        return self.get_directory().get_active(day)
+
+    # Returns the site-wide cached directory of flextime employees, rebuilt after any employee has changed
+    def get_directory(self) -> EmployeeDirectory:
+        directory = self.cache.get(self._cache_key)
+
+        if directory is not None:
+            return directory
+
+        directory = EmployeeDirectory(frappe.generate_hash(length=10))
+        docs = frappe.get_all("Employee", fields=self.doc_fields + ["status"],
+                              filters=[["custom_time_model", "=", self._time_model_to_doc(TimeModel.Flextime)]],
+                              or_filters=[["status", "=", "Active"], ["relieving_date", "is", "set"]],
+                              order_by="name asc")
+
+        for doc in docs:
+            directory.insert(self._build_from_doc(doc), doc.status == "Active")
+
+        self.cache.set(self._cache_key, directory)
+        return directory
+
+    # Drops the cached directory, called by the document events of Employee
+    def clear_cache(self):
+        self.cache.delete(self._cache_key)
+
+    # Returns the Employee object of the current user. The employee is cached site-wide by user, until any employee
+    # linked to the user changes.
     def get_current(self) -> Optional[Employee]:
-        user_id = frappe.get_user().doc.email
+        user_id = frappe.session.user
+        employee = self.cache.get(self._user_cache_prefix + user_id)
+
+        if employee is not None:
+            # False is cached for users without employee
+            return employee or None
+
         docs = frappe.get_all("Employee", fields=self.doc_fields, filters={"user_id": user_id})
+        employee = self._build_from_doc(docs[0]) if docs else None
 
-        if not docs:
-            return None
+        self.cache.set(self._user_cache_prefix + user_id, employee or False)
+        return employee
 
-        return self._build_from_doc(docs[0])
+    # Drops the cached employee of the given users, called by the document events of Employee
+    def clear_user_cache(self, user_ids: list[str]):
+        for user_id in user_ids:
+            if user_id:
+                self.cache.delete(self._user_cache_prefix + user_id)
 
     @staticmethod
     def _build_from_doc(doc) -> Employee:
         time_model = TimeModel.Flextime if doc.custom_time_model == "Flextime account" else TimeModel.Undefined
-        return Employee(doc.name, doc.employee_name, time_model, doc.grade, doc.date_of_birth, doc.date_of_joining)
+        return Employee(doc.name, doc.employee_name, time_model, doc.grade, doc.date_of_birth, doc.date_of_joining,
+                        doc.relieving_date)
+
+    @staticmethod
+    def _time_model_to_doc(time_model: TimeModel) -> Optional[str]:
+        return "Flextime account" if time_model is TimeModel.Flextime else None
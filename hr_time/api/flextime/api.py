@@ -1,31 +1,55 @@
 import datetime
+import hashlib
+from typing import Optional
 
 import frappe
 
-from hr_time.api.check_in.service import CheckinService, State, Action
-from hr_time.api.employee.repository import EmployeeRepository, TimeModel
-from hr_time.api.flextime.processing import FlexTimeProcessingService
-from hr_time.api.flextime.stats import FlextimeStatisticsService
+from hr_time.api.check_in.day_state import DayStateRepository
+from hr_time.api.check_in.service import CheckinService, CheckinStatus, State, Action
+from hr_time.api.employee.repository import EmployeeRepository, TimeModel, Employee
+from hr_time.api.flextime.processing import FlexTimeProcessingService, ProcessingBudget
+from hr_time.api.flextime.repository import FlextimeStatusRepository
+from hr_time.api.flextime.stats import FlextimeStatisticsService, FlextimeBalance
+from hr_time.api.utils.container import services
+
+# Realtime event of navbar checkin status updates
+CHECKIN_STATUS_EVENT = "hr_time_checkin_status"
 
 
 @frappe.whitelist()
 def generate_daily_flextime_status():
-    return FlexTimeProcessingService.prod().process_daily_status()
+    shard_count = int(frappe.conf.get("hr_time_processing_shards") or 1)
+    shards = FlexTimeProcessingService.prod().get_due_shards(shard_count)
+
+    if shard_count <= 1:
+        return process_daily_flextime_status_shard(shards[0] if shards else [])
+
+    # Shards are processed by the workers of all nodes, leases prevent processing an employee twice
+    for shard in shards:
+        frappe.enqueue("hr_time.api.flextime.api.process_daily_flextime_status_shard", queue="long",
+                       employee_ids=shard)
+
+    return {"shards": len(shards)}
+
+
+# Background job processing the daily status of the given employees
+def process_daily_flextime_status_shard(employee_ids: list[str]):
+    skip_attendance_hooks = bool(frappe.conf.get("hr_time_skip_attendance_hooks"))
+
+    # Stays below the timeout of the default queue, remaining days are processed by the next run
+    budget = ProcessingBudget(float(frappe.conf.get("hr_time_processing_time_budget") or 240),
+                              int(frappe.conf.get("hr_time_processing_max_days") or 366))
+
+    # Number of processes calculating the daily status in parallel, e.g. for large backfills
+    workers = int(frappe.conf.get("hr_time_processing_workers") or 1)
+
+    return FlexTimeProcessingService.prod().process_shard(employee_ids, frappe.generate_hash(length=10),
+                                                          skip_attendance_hooks, budget, workers).to_dict()
 
 
 @frappe.whitelist()
 def render_number_card_flextime_time_balance():
-    balance = FlextimeStatisticsService.prod().get_balance()
-
-    return frappe.render_template("templates/number_card/flextime_account_balance.html", {
-        "time_balance_hours": frappe._('{0} hour(s)').format(balance.balance_hours),
-        "time_balance_minutes": frappe._('{0} minute(s)').format(balance.balance_minutes),
-        "trend_value": "{}H, {}m ({} %)".format(abs(balance.trend_hours), abs(balance.trend_minutes),
-                                                round(balance.trend_percent * 100)),
-        "trend_meta": frappe._("Within last month"),
-        "is_trend_positive": balance.trend_percent > 0,
-        "color": "" if balance.is_zero() else ("positive" if balance.balance_minutes > 0 else "negative")
-    })
+    return render_flextime_balance(FlextimeStatisticsService.prod().get_balance())
 
 
 @frappe.whitelist()
@@ -35,7 +59,7 @@ def render_number_card_checkin_status():
 
 @frappe.whitelist()
 def render_navbar_checkin_status():
-    employee = EmployeeRepository().get_current()
+    employee = services.get(EmployeeRepository).get_current()
 
     if employee is None:
         return ""
@@ -46,10 +70,72 @@ def render_navbar_checkin_status():
     return frappe.render_template("templates/navbar/checkin_status.html", get_checkin_status_template_data())
 
 
+# Pushes the navbar checkin status to the user of the given employee, called by the document events of checkins.
+# The initial status is loaded by get_checkin_dashboard(), the duration is counted up by the client.
+def publish_checkin_status(employee_id: str):
+    user_id = frappe.db.get_value("Employee", employee_id, "user_id")
+
+    if not user_id:
+        return
+
+    employees = services.get(EmployeeRepository).get_all([employee_id])
+
+    if not employees or employees[0].time_model is not TimeModel.Flextime:
+        return
+
+    frappe.publish_realtime(CHECKIN_STATUS_EVENT, get_navbar_checkin_status_data(employees[0]), user=user_id,
+                            after_commit=True)
+
+
 @frappe.whitelist()
 def get_easy_checkin_options():
-    status = CheckinService.prod().get_current_status()
+    return get_checkin_options(CheckinService.prod().get_current_status())
+
+
+# Returns the snapshot of the checkin dashboard of the current employee: navbar status, checkin status number card,
+# checkin options and rendered flextime balance. The snapshot is versioned by the state of its sources, so if the
+# given version is still current, just the version is returned without building the snapshot ("not modified").
+@frappe.whitelist()
+def get_checkin_dashboard(version: Optional[str] = None) -> dict:
+    employee = services.get(EmployeeRepository).get_current()
+    current_version = get_checkin_dashboard_version(employee)
 
+    if version == current_version:
+        return {"version": current_version, "modified": False}
+
+    status = CheckinService.prod().get_status(employee)
+    duration = 0 if employee is None else FlextimeStatisticsService.prod().get_duration(employee.id)
+    is_flextime = employee is not None and employee.time_model is TimeModel.Flextime
+
+    return {
+        "version": current_version,
+        "modified": True,
+        "status": get_navbar_checkin_status_data(employee, status, duration) if is_flextime else None,
+        "card": frappe.render_template("templates/number_card/checkin_status.html",
+                                       get_checkin_status_card_data(status, duration)),
+        "options": get_checkin_options(status),
+        "balance": None if employee is None else render_flextime_balance(
+            FlextimeStatisticsService.prod().get_employee_balance(employee.id))
+    }
+
+
+# Returns the version token of the dashboard snapshot, changed by any checkin (via the stored day state), any
+# processed or corrected day (via the flextime account), the employee, the day and the language.
+# The growing duration of the current state does not change the version, as it is counted up by the client.
+def get_checkin_dashboard_version(employee: Optional[Employee]) -> str:
+    sources = [frappe.local.lang, datetime.date.today().isoformat()]
+
+    if employee is not None:
+        account = services.get(FlextimeStatusRepository).get_account(employee.id)
+        modified = services.get(DayStateRepository).get_modified(employee.id)
+        sources += [employee.id, employee.time_model.name, str(modified),
+                    None if account is None else (str(account.last_processed_date), account.time_balance)]
+
+    return hashlib.sha1(repr(sources).encode()).hexdigest()[:16]
+
+
+# Returns the options of the checkin dialog based on the given status
+def get_checkin_options(status: CheckinStatus) -> dict:
     match status.state:
         case State.In:
             options = ["Break", "End of work"]
@@ -80,9 +166,40 @@ def submit_easy_checkin(action: str):
             raise ValueError("Unknown action given")
 
 
+# Returns the rendered status (without duration) along with the duration in seconds at the time of the response.
+# The duration is just growing while checked in or on break.
+def get_navbar_checkin_status_data(employee: Employee, status: Optional[CheckinStatus] = None,
+                                   duration: Optional[int] = None) -> dict:
+    state = (CheckinService.prod().get_status(employee) if status is None else status).state
+
+    return {
+        "html": frappe.render_template("templates/navbar/checkin_status.html", state.render()),
+        "duration": FlextimeStatisticsService.prod().get_duration(employee.id) if duration is None else duration,
+        "counting": state in [State.In, State.Break]
+    }
+
+
 def get_checkin_status_template_data() -> dict:
-    data = CheckinService.prod().get_current_status().state.render()
-    duration = str(datetime.timedelta(seconds=FlextimeStatisticsService.prod().get_current_duration())).split(":")
+    return get_checkin_status_card_data(CheckinService.prod().get_current_status(),
+                                        FlextimeStatisticsService.prod().get_current_duration())
+
 
-    data["label"] = data["label"] + ' (' + duration[0] + ':' + duration[1] + ')'
+# Returns the template data of the checkin status number card, labeled with the given duration in seconds
+def get_checkin_status_card_data(status: CheckinStatus, duration: int) -> dict:
+    data = status.state.render()
+    parts = str(datetime.timedelta(seconds=duration)).split(":")
+
+    data["label"] = data["label"] + ' (' + parts[0] + ':' + parts[1] + ')'
     return data
+
+
+def render_flextime_balance(balance: FlextimeBalance) -> str:
+    return frappe.render_template("templates/number_card/flextime_account_balance.html", {
+        "time_balance_hours": frappe._('{0} hour(s)').format(balance.balance_hours),
+        "time_balance_minutes": frappe._('{0} minute(s)').format(balance.balance_minutes),
+        "trend_value": "{}H, {}m ({} %)".format(abs(balance.trend_hours), abs(balance.trend_minutes),
+                                                round(balance.trend_percent * 100)),
+        "trend_meta": frappe._("Within last month"),
+        "is_trend_positive": balance.trend_percent > 0,
+        "color": "" if balance.is_zero() else ("positive" if balance.balance_minutes > 0 else "negative")
+    })
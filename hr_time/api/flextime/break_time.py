@@ -1,5 +1,11 @@
+import bisect
+from typing import Optional
+
 import frappe
 
+from hr_time.api.utils.cache import SiteCache
+from hr_time.api.utils.container import Lifetime, services
+
 
 class BreakTime:
     # break time is just valid if minimal working time (in seconds) is reached
@@ -13,6 +19,34 @@ class BreakTime:
         self.break_time = break_time
 
 
+# Compiled break time rules as immutable sorted threshold columns, looked up by bisection
+class BreakTimeTable:
+    # Sorted min. working times and corresponding break times
+    regular_thresholds: tuple[int, ...]
+    regular_breaks: tuple[int, ...]
+
+    # Same as regular, but just valid for minors
+    minor_thresholds: tuple[int, ...]
+    minor_breaks: tuple[int, ...]
+
+    def __init__(self, regular_times: list[BreakTime], minor_times: list[BreakTime]):
+        self.regular_thresholds = tuple(definition.min_working_time for definition in regular_times)
+        self.regular_breaks = tuple(definition.break_time for definition in regular_times)
+        self.minor_thresholds = tuple(definition.min_working_time for definition in minor_times)
+        self.minor_breaks = tuple(definition.break_time for definition in minor_times)
+
+    # Returns the break time in seconds based on total working time
+    def get_break_time(self, total_working_time: int, is_minor: bool) -> int:
+        if is_minor and self.minor_thresholds:
+            thresholds, breaks = self.minor_thresholds, self.minor_breaks
+        else:
+            thresholds, breaks = self.regular_thresholds, self.regular_breaks
+
+        # Last definition with min. working time reached
+        index = bisect.bisect_right(thresholds, total_working_time) - 1
+        return breaks[index] if index >= 0 else 0
+
+
 class BreakTimeDefinitions:
     # Sorted list of break time definitions
     regular_times: list[BreakTime]
@@ -20,48 +54,67 @@ class BreakTimeDefinitions:
     # Sorted list of break times valid just for minors
     minor_times: list[BreakTime]
 
+    # Compiled lookup table, rebuilt on next lookup after inserting definitions
+    _table: Optional[BreakTimeTable]
+
     def __init__(self):
         self.regular_times = []
         self.minor_times = []
+        self._table = None
 
     def insert(self, definition: BreakTime, is_minor: bool):
+        self._table = None
+
+        # Inserted after definitions with the same min. working time, same as a stable sort
         if is_minor:
-            self.minor_times.append(definition)
-            self.minor_times.sort(key=lambda x: x.min_working_time)
+            bisect.insort_right(self.minor_times, definition, key=lambda x: x.min_working_time)
             return
 
-        self.regular_times.append(definition)
-        self.regular_times.sort(key=lambda x: x.min_working_time)
+        bisect.insort_right(self.regular_times, definition, key=lambda x: x.min_working_time)
+
+    # Returns the compiled lookup table
+    def compile(self) -> BreakTimeTable:
+        if self._table is None:
+            self._table = BreakTimeTable(self.regular_times, self.minor_times)
+
+        return self._table
 
     # Returns the break time in seconds based on total working time
     def get_break_time(self, total_working_time: int, is_minor: bool) -> int:
-        if is_minor and self.minor_times:
-            return self._search_break_time(self.minor_times, total_working_time)
+        return self.compile().get_break_time(total_working_time, is_minor)
 
-        return self._search_break_time(self.regular_times, total_working_time)
 
-    @staticmethod
-    def _search_break_time(definitions: list[BreakTime], total_working_time: int) -> int:
-        break_time = 0
+@services.provide(Lifetime.Site)
+class BreakTimeRepository:
+    _cache_key = "break_time_definitions"
 
-        for definition in definitions:
-            if total_working_time < definition.min_working_time:
-                break
+    cache: SiteCache
 
-            break_time = definition.break_time
+    def __init__(self, cache: Optional[SiteCache] = None):
+        self.cache = SiteCache() if cache is None else cache
 
-        return break_time
+    # Returns the compiled definitions, cached site-wide until any definition changes
+    def get_definitions(self) -> BreakTimeDefinitions:
+        definitions = self.cache.get(self._cache_key)
 
+        if definitions is not None:
+            return definitions
 
-class BreakTimeRepository:
-    def get_definitions(self) -> BreakTimeDefinitions:
         definitions = BreakTimeDefinitions()
 
-        for doc in frappe.get_all("Break time definition", fields=['*']):
+        for doc in frappe.get_all("Break time definition",
+                                  fields=["min_working_time", "forced_break_time", "only_for_minors"]):
             definitions.insert(BreakTime(doc.min_working_time, doc.forced_break_time), doc.only_for_minors)
 
+        definitions.compile()
+        self.cache.set(self._cache_key, definitions)
+
         return definitions
 
+    # Drops the cached definitions, called by the document events of the doctype
+    def clear_cache(self):
+        self.cache.delete(self._cache_key)
+
     def create_default(self):
         # Adults: 6h work => 30m break time
         self._create_definition(21_600, 1_800, False)
@@ -0,0 +1,61 @@
+import itertools
+
+from hr_time.api.flextime.break_time import BreakTimeDefinitions, BreakTimeTable
+
+
+# Calculated values of several consecutive days, same order as the input columns
+class CalculatedDays:
+    # Forced deducted break time in seconds
+    break_time_deducted: list[int]
+
+    # Flextime delta in hours
+    flextime_delta: list[float]
+
+    # Running flextime balance in hours
+    time_balance: list[float]
+
+    def __init__(self, break_time_deducted: list[int], flextime_delta: list[float], time_balance: list[float]):
+        self.break_time_deducted = break_time_deducted
+        self.flextime_delta = flextime_delta
+        self.time_balance = time_balance
+
+
+# Calculates break time deduction, flextime delta and running balance of many days at once.
+# Results are identical to FlextimeDailyStatus.calculate() called day by day: the same expressions are evaluated per
+# day, break times are looked up in the compiled table and the balance is summed up in the same order.
+class DailyStatusCalculator:
+    # Compiled break time rules
+    table: BreakTimeTable
+
+    # Deducted break time in seconds, if no break was taken at all
+    deducted_time_on_no_break: int
+
+    def __init__(self, break_definition: BreakTimeDefinitions, deducted_time_on_no_break: int):
+        self.table = break_definition.compile()
+        self.deducted_time_on_no_break = deducted_time_on_no_break
+
+    def calculate(self, working_times: list[int], break_times: list[int], breaks_found: list[bool],
+                  target_working_times: list[int | float], minors: list[bool],
+                  previous_flextime_balance: float) -> CalculatedDays:
+        deducted = [self._get_deducted_time(working_time, break_time, break_found, is_minor)
+                    for working_time, break_time, break_found, is_minor
+                    in zip(working_times, break_times, breaks_found, minors)]
+
+        deltas = [(working_time - deducted_time - target_working_time) / 3600
+                  for working_time, deducted_time, target_working_time
+                  in zip(working_times, deducted, target_working_times)]
+
+        balances = list(itertools.accumulate(deltas, initial=previous_flextime_balance))[1:]
+
+        return CalculatedDays(deducted, deltas, balances)
+
+    def _get_deducted_time(self, working_time: int, break_time: int, break_found: bool, is_minor: bool) -> int:
+        min_break_time = self.table.get_break_time(working_time, is_minor)
+
+        if not break_found and (min_break_time > 0):
+            return self.deducted_time_on_no_break
+
+        if min_break_time > break_time:
+            return min_break_time - break_time
+
+        return 0
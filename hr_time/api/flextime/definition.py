@@ -3,6 +3,9 @@ from typing import Optional
 
 import frappe
 
+from hr_time.api.utils.cache import SiteCache
+from hr_time.api.utils.container import Lifetime, services
+
 
 # Flextime definition of a single weekday
 class WorkdayDefinition:
@@ -38,7 +41,8 @@ class WorkdayDefinition:
 
 
 class FlextimeDefinition:
-    days: dict[int, WorkdayDefinition]
+    # Workday definitions by ISO weekday, a tuple indexed by weekday after freeze()
+    days: dict[int, WorkdayDefinition] | tuple[Optional[WorkdayDefinition], ...]
 
     # This amount of time (in seconds) is deducted, if checked working time is insufficient
     forced_insufficient_break_time: int
@@ -54,6 +58,25 @@ class FlextimeDefinition:
     def insert(self, day: WorkdayDefinition):
         self.days[day.weekday] = day
 
+    # Makes the workday definitions read-only, as cached definitions are shared by all callers. A tuple is used (in
+    # contrast to a mapping proxy) as definitions are pickled by the site cache and for processing workers.
+    def freeze(self) -> 'FlextimeDefinition':
+        self.days = tuple(self.days.get(weekday) for weekday in range(7))
+        return self
+
+    @staticmethod
+    def create_from_doc(doc) -> 'FlextimeDefinition':
+        definition = FlextimeDefinition(doc.forced_insufficient_break_time)
+        definition.insert(WorkdayDefinition.create_from_doc(doc, 0, "monday"))
+        definition.insert(WorkdayDefinition.create_from_doc(doc, 1, "tuesday"))
+        definition.insert(WorkdayDefinition.create_from_doc(doc, 2, "wednesday"))
+        definition.insert(WorkdayDefinition.create_from_doc(doc, 3, "thursday"))
+        definition.insert(WorkdayDefinition.create_from_doc(doc, 4, "friday"))
+        definition.insert(WorkdayDefinition.create_from_doc(doc, 5, "saturday"))
+        definition.insert(WorkdayDefinition.create_from_doc(doc, 6, "sunday"))
+
+        return definition.freeze()
+
 
 DEFAULT_GRADE = "Standard full-time 40 hours"
 DEFAULT_WORKING_TIME = 28_800
@@ -61,36 +84,46 @@ DEFAULT_CORE_TIME_START = datetime.timedelta(hours=10)
 DEFAULT_CORE_TIME_END = datetime.timedelta(hours=15)
 
 
+@services.provide(Lifetime.Request)
 class FlextimeDefinitionRepository:
     _doc_type = "Flextime definition"
+    _cache_key = "flextime_definitions"
 
-    # Cache for loaded definitions by employee grade
-    definitions: [str, Optional[FlextimeDefinition]]
+    # Loaded definitions by employee grade, None until loaded
+    definitions: Optional[dict[str, FlextimeDefinition]]
+    cache: SiteCache
 
-    def __init__(self):
-        self.definitions = {}
+    def __init__(self, cache: Optional[SiteCache] = None):
+        self.definitions = None
+        self.cache = SiteCache() if cache is None else cache
 
+    # Returns the definition of the given grade, None if no definition exists
     def get_by_grade(self, grade: str) -> Optional[FlextimeDefinition]:
-        if grade in self.definitions:
-            return self.definitions[grade]
-
-        doc_definitions = frappe.get_all(self._doc_type, fields=["*"], filters={"name": grade})
-
-        if not doc_definitions:
-            self.definitions[grade] = None
-            return None
-
-        definition = FlextimeDefinition(doc_definitions[0].forced_insufficient_break_time)
-        definition.insert(WorkdayDefinition.create_from_doc(doc_definitions[0], 0, "monday"))
-        definition.insert(WorkdayDefinition.create_from_doc(doc_definitions[0], 1, "tuesday"))
-        definition.insert(WorkdayDefinition.create_from_doc(doc_definitions[0], 2, "wednesday"))
-        definition.insert(WorkdayDefinition.create_from_doc(doc_definitions[0], 3, "thursday"))
-        definition.insert(WorkdayDefinition.create_from_doc(doc_definitions[0], 4, "friday"))
-        definition.insert(WorkdayDefinition.create_from_doc(doc_definitions[0], 5, "saturday"))
-        definition.insert(WorkdayDefinition.create_from_doc(doc_definitions[0], 6, "sunday"))
-
-        self.definitions[grade] = definition
-        return definition
+        return self.get_all_by_grade().get(grade)
+
+    # Returns the definitions of all grades. The pre-built definitions are cached site-wide until any definition
+    # changes, so all grades are loaded at once.
+    def get_all_by_grade(self) -> dict[str, FlextimeDefinition]:
+        if self.definitions is not None:
+            return self.definitions
+
+        definitions = self.cache.get(self._cache_key)
+
+        if definitions is None:
+            definitions = {}
+
+            for doc in frappe.get_all(self._doc_type, fields=["*"]):
+                definitions[doc.name] = FlextimeDefinition.create_from_doc(doc)
+
+            self.cache.set(self._cache_key, definitions)
+
+        self.definitions = definitions
+        return definitions
+
+    # Drops the cached definitions, called by the document events of the doctype
+    def clear_cache(self):
+        self.definitions = None
+        self.cache.delete(self._cache_key)
 
     def create_default(self):
         if not frappe.get_all("Employee Grade", filters={"name": DEFAULT_GRADE}):
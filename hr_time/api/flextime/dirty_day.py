@@ -0,0 +1,68 @@
+import datetime
+from typing import Optional
+
+import frappe
+
+from hr_time.api.utils.container import Lifetime, services
+
+
+# Queue of already processed days, which need to be recalculated due to changed inputs
+@services.provide(Lifetime.Worker)
+class DirtyDayRepository:
+    # Queues the given days of the employee. Days not processed yet are skipped, as they are calculated by the
+    # regular processing anyway.
+    def mark(self, employee_id: str, dates: list[datetime.date]):
+        if not employee_id or not dates:
+            return
+
+        last_processed_date = frappe.db.get_value("Flextime account", employee_id, "last_processed_date")
+
+        if last_processed_date is None:
+            return
+
+        dates = sorted({date for date in dates if date <= last_processed_date})
+
+        if not dates:
+            return
+
+        now = frappe.utils.now()
+        user = frappe.session.user
+        values = []
+
+        for date in dates:
+            # Equal to naming expression "{employee}-{date}" of doctype, so each day is queued just once
+            values += [employee_id + "-" + date.isoformat(), now, now, user, user, 0, employee_id, date]
+
+        frappe.db.sql("""
+            INSERT IGNORE INTO `tabFlextime dirty day` (name, creation, modified, owner, modified_by, docstatus,
+                employee, date)
+            VALUES {rows}
+        """.format(rows=", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s)"] * len(dates))), values)
+
+    # Returns the queued days of all (or the given) employees, sorted by date and indexed by employee ID
+    def get_dirty_days(self, employee_ids: Optional[list[str]] = None) -> dict[str, list[datetime.date]]:
+        filters = None if employee_ids is None else [["employee", "in", employee_ids]]
+        docs = frappe.get_all("Flextime dirty day", fields=["employee", "date"], filters=filters,
+                              order_by="date asc")
+
+        days = {}
+
+        for doc in docs:
+            if doc.employee not in days:
+                days[doc.employee] = []
+
+            days[doc.employee].append(doc.date)
+
+        return days
+
+    # Returns the IDs of all employees with queued days
+    def get_employee_ids(self) -> list[str]:
+        docs = frappe.get_all("Flextime dirty day", fields=["employee"], group_by="employee", order_by="employee asc")
+        return [doc.employee for doc in docs]
+
+    # Removes the given days of the employee from the queue
+    def remove(self, employee_id: str, dates: list[datetime.date]):
+        if not dates:
+            return
+
+        frappe.db.delete("Flextime dirty day", {"employee": employee_id, "date": ["in", dates]})
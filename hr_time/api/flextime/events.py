@@ -0,0 +1,67 @@
+import datetime
+
+import frappe
+
+from hr_time.api.flextime.dirty_day import DirtyDayRepository
+from hr_time.api.holiday.repository import HolidayRepository
+from hr_time.api.utils.container import services
+
+
+# Document event handlers (see hooks.py), queueing already processed days with changed inputs for recalculation
+
+def on_checkin_change(doc, method=None):
+    repository = services.get(DirtyDayRepository)
+    previous = doc.get_doc_before_save()
+
+    # Day of the previous check-in time (or employee) is affected as well
+    if previous is not None and previous.time:
+        repository.mark(previous.employee, [frappe.utils.get_datetime(previous.time).date()])
+
+    repository.mark(doc.employee, [frappe.utils.get_datetime(doc.time).date()])
+
+
+def on_attendance_change(doc, method=None):
+    # Attendance records derived by the processing itself do not change the calculated day
+    if doc.flags.get("hr_time_derived"):
+        return
+
+    services.get(DirtyDayRepository).mark(doc.employee, [frappe.utils.getdate(doc.attendance_date)])
+
+
+def on_leave_application_change(doc, method=None):
+    repository = services.get(DirtyDayRepository)
+    previous = doc.get_doc_before_save()
+
+    # Days of the previous range (or employee) are affected as well
+    if previous is not None:
+        repository.mark(previous.employee, list(_get_dates(previous.from_date, previous.to_date)))
+
+    repository.mark(doc.employee, list(_get_dates(doc.from_date, doc.to_date)))
+
+
+def on_holiday_list_change(doc, method=None):
+    dates = {frappe.utils.getdate(holiday.holiday_date) for holiday in doc.get("holidays", [])}
+    previous = doc.get_doc_before_save()
+
+    # Just added and removed holidays are affected
+    if previous is not None:
+        dates ^= {frappe.utils.getdate(holiday.holiday_date) for holiday in previous.get("holidays", [])}
+
+    if not dates:
+        return
+
+    repository = services.get(DirtyDayRepository)
+
+    for employee_id in services.get(HolidayRepository).get_employee_ids(doc.name):
+        repository.mark(employee_id, list(dates))
+
+
+# Returns all days between from and to date (both inclusive)
+def _get_dates(from_date, to_date) -> set[datetime.date]:
+    if not from_date or not to_date:
+        return set()
+
+    start = frappe.utils.getdate(from_date)
+    end = frappe.utils.getdate(to_date)
+
+    return {start + datetime.timedelta(days=offset) for offset in range((end - start).days + 1)}
@@ -0,0 +1,186 @@
+import datetime
+from typing import Optional
+
+import frappe
+
+from hr_time.api.utils.cache import SiteCache
+from hr_time.api.utils.container import Lifetime, services
+
+
+# Daily flextime deltas of a single employee in seconds, indexed by a Fenwick tree (binary indexed tree).
+# Balance at any date and the sum between two dates are answered in O(log n), a correction of a single day is a
+# point update in O(log n) without touching the following days.
+class BalanceLedger:
+    # Day of index 0, None if the ledger is empty
+    start: Optional[datetime.date]
+
+    # Latest day with a delta
+    last_date: Optional[datetime.date]
+
+    # Sum of all deltas in seconds
+    total: int
+
+    # Delta in seconds by day offset
+    deltas: list[int]
+
+    # Fenwick tree over deltas (1-based, index 0 unused)
+    tree: list[int]
+
+    # Last processed date of the flextime account the ledger is in sync with
+    account_date: Optional[datetime.date]
+
+    # Account balance minus the sum of all deltas in seconds, taken when the ledger was loaded. Non-zero if the
+    # stored balances are not just the sum of the deltas (e.g. a carried-over opening balance).
+    offset: int
+
+    def __init__(self):
+        self.start = None
+        self.last_date = None
+        self.total = 0
+        self.deltas = []
+        self.tree = [0]
+        self.account_date = None
+        self.offset = 0
+
+    # Adds the given seconds to the delta of the given day
+    def add(self, date: datetime.date, seconds: int):
+        if self.start is None:
+            self.start = date
+        elif date < self.start:
+            self._rebuild(date, (self.start - date).days + len(self.deltas))
+
+        offset = (date - self.start).days
+
+        if offset >= len(self.deltas):
+            self._rebuild(self.start, max(offset + 1, 2 * len(self.deltas)))
+
+        self.deltas[offset] += seconds
+        self.total += seconds
+
+        if self.last_date is None or date > self.last_date:
+            self.last_date = date
+
+        index = offset + 1
+
+        while index < len(self.tree):
+            self.tree[index] += seconds
+            index += index & -index
+
+    # Returns the balance in seconds after the given day, i.e. the offset (e.g. an opening balance) plus the sum of
+    # all deltas up to this day (inclusive)
+    def balance_at(self, date: datetime.date) -> int:
+        if self.start is None or date < self.start:
+            return self.offset
+
+        index = min((date - self.start).days + 1, len(self.deltas))
+        balance = self.offset
+
+        while index > 0:
+            balance += self.tree[index]
+            index -= index & -index
+
+        return balance
+
+    # Returns the sum of deltas in seconds between the given days (both inclusive)
+    def sum_between(self, start: datetime.date, end: datetime.date) -> int:
+        if end < start:
+            return 0
+
+        return self.balance_at(end) - self.balance_at(start - datetime.timedelta(days=1))
+
+    def is_empty(self) -> bool:
+        return self.start is None
+
+    # Rebuilds the tree with the given start and capacity in O(n)
+    def _rebuild(self, start: datetime.date, capacity: int):
+        deltas = [0] * capacity
+        shift = (self.start - start).days
+        deltas[shift:shift + len(self.deltas)] = self.deltas
+
+        tree = [0] + deltas
+
+        for index in range(1, capacity + 1):
+            parent = index + (index & -index)
+
+            if parent <= capacity:
+                tree[parent] += tree[index]
+
+        self.start = start
+        self.deltas = deltas
+        self.tree = tree
+
+
+@services.provide(Lifetime.Site)
+class BalanceLedgerRepository:
+    _cache_prefix = "balance_ledger:"
+
+    cache: SiteCache
+
+    def __init__(self, cache: Optional[SiteCache] = None):
+        self.cache = SiteCache() if cache is None else cache
+
+    # Returns the ledger of the given employee. The site-wide cached ledger is just extended by new days, it is
+    # rebuilt if it does not match the flextime account anymore (e.g. after deleting statuses). The cache is just
+    # written if the ledger changed.
+    def get(self, employee_id: str) -> BalanceLedger:
+        account = frappe.db.get_value("Flextime account", employee_id, ["last_processed_date", "time_balance"],
+                                      as_dict=True)
+
+        if not account or account.last_processed_date is None:
+            return BalanceLedger()
+
+        ledger = self.cache.get(self._cache_prefix + employee_id)
+        changed = False
+
+        if ledger is not None and ledger.account_date is not None \
+                and ledger.account_date < account.last_processed_date:
+            self._load(ledger, employee_id, ledger.account_date)
+            ledger.account_date = account.last_processed_date
+            changed = True
+
+        if ledger is None or not self._matches(ledger, account):
+            ledger = BalanceLedger()
+            self._load(ledger, employee_id)
+
+            # The rebuilt ledger is the reference for this account, even if its balance is not the sum of deltas
+            ledger.account_date = account.last_processed_date
+            ledger.offset = to_seconds(account.time_balance) - ledger.total
+            changed = True
+
+        if changed:
+            self.cache.set(self._cache_prefix + employee_id, ledger)
+
+        return ledger
+
+    # Applies a correction of the given day (in hours) to the cached ledger, if existing
+    def add(self, employee_id: str, date: datetime.date, delta: float):
+        ledger = self.cache.get(self._cache_prefix + employee_id)
+
+        if ledger is None:
+            return
+
+        ledger.add(date, to_seconds(delta))
+        self.cache.set(self._cache_prefix + employee_id, ledger)
+
+    # Returns true if the ledger is in sync with the given account, allowing a rounding difference of one second
+    @staticmethod
+    def _matches(ledger: BalanceLedger, account) -> bool:
+        return ledger.account_date == account.last_processed_date and \
+            abs(ledger.total + ledger.offset - to_seconds(account.time_balance)) <= 1
+
+    # Adds the deltas of all submitted statuses (after the given date) to the ledger
+    @staticmethod
+    def _load(ledger: BalanceLedger, employee_id: str, after: Optional[datetime.date] = None):
+        filters = [["employee", "=", employee_id], ["docstatus", "=", 1]]
+
+        if after is not None:
+            filters.append(["date", ">", after])
+
+        for doc in frappe.get_all("Flextime daily status", fields=["date", "flextime_delta"], filters=filters,
+                                  order_by="date asc"):
+            ledger.add(doc.date, to_seconds(doc.flextime_delta))
+
+
+# Converts the given hours to seconds
+def to_seconds(hours: float) -> int:
+    return round(hours * 3600)
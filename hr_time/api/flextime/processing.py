@@ -1,15 +1,246 @@
 import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional, Union
 
 from hr_time.api import logger
-from hr_time.api.attendance.repository import AttendanceRepository, Status, Attendance
+from hr_time.api.attendance.repository import AttendanceRepository, Status, Attendance, AttendanceIndex
+from hr_time.api.check_in.list import CheckinList
 from hr_time.api.check_in.repository import CheckinRepository
 from hr_time.api.employee.repository import EmployeeRepository, TimeModel, Employee
 from hr_time.api.flextime.break_time import BreakTimeRepository, BreakTimeDefinitions
+from hr_time.api.flextime.calculator import DailyStatusCalculator
 from hr_time.api.flextime.definition import FlextimeDefinitionRepository, FlextimeDefinition
-from hr_time.api.flextime.repository import FlextimeStatusRepository, FlextimeDailyStatus
-from hr_time.api.holiday.repository import HolidayRepository
+from hr_time.api.flextime.dirty_day import DirtyDayRepository
+from hr_time.api.flextime.repository import FlextimeStatusRepository, FlextimeDailyStatus, FlextimeAccount
+from hr_time.api.flextime.target import TargetCalendar
+from hr_time.api.holiday.repository import HolidayRepository, HolidayCalendar
 from hr_time.api.utils.clock import Clock
-from hr_time.api.vacation.repository import VacationRepository
+from hr_time.api.utils.container import services
+from hr_time.api.vacation.repository import VacationRepository, ApprovedRequests
+
+# Max. number of daily status docs persisted by a single multi-row insert
+BULK_INSERT_SIZE = 500
+
+# Number of shards per worker process, smaller shards balance employees with different amounts of pending days
+SHARDS_PER_WORKER = 4
+
+# Lease duration in seconds on top of the time budget, covering the final flush of a run
+LEASE_MARGIN = 300
+
+# Lease duration in seconds of runs without time budget
+LEASE_DURATION_UNLIMITED = 3600
+
+# Max. difference in days between the starts of jobs prefetched together by a batch run
+PREFETCH_WINDOW_DAYS = 7
+
+
+# Limits of a single processing run. Remaining days are processed by the next run.
+class ProcessingBudget:
+    # Max. runtime in seconds, None for unlimited
+    time_limit: Optional[float]
+
+    # Max. number of days processed per employee, None for unlimited
+    max_days: Optional[int]
+
+    def __init__(self, time_limit: Optional[float] = None, max_days: Optional[int] = None):
+        self.time_limit = time_limit
+        self.max_days = max_days
+
+
+# Summary of a processing run
+class ProcessingResult:
+    # Number of created daily status docs
+    statuses: int
+
+    # Number of created attendance docs
+    attendances: int
+
+    # False if the run was stopped by its budget and days are left for the next run
+    completed: bool
+
+    def __init__(self):
+        self.statuses = 0
+        self.attendances = 0
+        self.completed = True
+
+    def to_dict(self) -> dict:
+        return {
+            "statuses": self.statuses,
+            "attendances": self.attendances,
+            "completed": self.completed
+        }
+
+
+# Pending processing of a single employee within a batch run
+class ProcessingJob:
+    employee: Employee
+    definition: FlextimeDefinition
+
+    # First day to be processed
+    start: datetime.date
+
+    # Flextime balance in hours before the first processed day
+    balance: float
+
+    # Day after the last processed day
+    end: datetime.date
+
+    def __init__(self, employee: Employee, definition: FlextimeDefinition, account: Optional[FlextimeAccount]):
+        self.employee = employee
+        self.definition = definition
+
+        if account is None:
+            self.start = employee.join_date
+            self.balance = 0
+        else:
+            self.start = account.last_processed_date + datetime.timedelta(days=1)
+            self.balance = account.time_balance
+
+        self.end = self.start
+
+    # Limits the processing up to the given day (exclusive), but to the given number of days at maximum
+    def limit(self, end: datetime.date, max_days: Optional[int]):
+        if max_days is not None:
+            end = min(end, self.start + datetime.timedelta(days=max_days))
+
+        self.end = max(self.start, end)
+
+
+# Splits the given jobs into groups of similar start, each group is prefetched by its own queries. So the range
+# loaded for all employees is not widened by a single employee with many pending days (e.g. a backfill from a join
+# date years ago). Groups are ordered by latest start first, so the regular daily work is done before any backfill
+# consumes the time budget. The order of jobs within a group is kept.
+def group_jobs(jobs: list[ProcessingJob]) -> list[list[ProcessingJob]]:
+    latest = max(job.start for job in jobs)
+    groups = {}
+
+    for job in jobs:
+        groups.setdefault((latest - job.start).days // PREFETCH_WINDOW_DAYS, []).append(job)
+
+    return [groups[key] for key in sorted(groups)]
+
+
+# Preloaded inputs of a batch run. Picklable, so the calculation can be done by worker processes.
+class ProcessingInputs:
+    break_times: BreakTimeDefinitions
+
+    # Checkin events by employee ID and day
+    checkins: dict[str, dict[datetime.date, CheckinList]]
+
+    attendances: AttendanceIndex
+    requests: ApprovedRequests
+
+    # Either the repository or the preloaded calendar, both answering is_holiday(day, employee_id)
+    holidays: Union[HolidayRepository, HolidayCalendar]
+
+    def __init__(self, break_times: BreakTimeDefinitions, checkins: dict[str, dict[datetime.date, CheckinList]],
+                 attendances: AttendanceIndex, requests: ApprovedRequests,
+                 holidays: Union[HolidayRepository, HolidayCalendar]):
+        self.break_times = break_times
+        self.checkins = checkins
+        self.attendances = attendances
+        self.requests = requests
+        self.holidays = holidays
+
+    # Returns the inputs just required by the given employees, used to reduce the data sent to worker processes
+    def select(self, employee_ids: list[str]) -> 'ProcessingInputs':
+        checkins = {employee_id: self.checkins[employee_id] for employee_id in employee_ids
+                    if employee_id in self.checkins}
+
+        return ProcessingInputs(self.break_times, checkins, self.attendances.select(employee_ids),
+                                self.requests.select(employee_ids), self.holidays)
+
+
+# Calculates the daily status of the given day. Pure function without any database access.
+def calculate_day(employee: Employee, day: datetime.date, break_time: BreakTimeDefinitions,
+                  definitions: FlextimeDefinition, calendar: TargetCalendar, events: CheckinList,
+                  flextime_balance: float) -> FlextimeDailyStatus:
+    status = prepare_day(employee, day, calendar, events)
+
+    status.calculate(break_time, definitions.forced_insufficient_break_time, calendar.is_minor(day), flextime_balance)
+    logger.info("New flextime balance: " + str(status.time_balance))
+
+    return status
+
+
+# Returns the daily status of the given day with target working time and durations, but without calculated values
+def prepare_day(employee: Employee, day: datetime.date, calendar: TargetCalendar,
+                events: CheckinList) -> FlextimeDailyStatus:
+    logger.info(employee.id + ": Processing day " + day.isoformat())
+
+    status = FlextimeDailyStatus(
+        employee.id,
+        day,
+        calendar.get_target_working_time(day)
+    )
+
+    # Durations are paired on integer columns, objects are just created when persisting the status
+    durations = events.get_duration_columns()
+    logger.info("Found " + str(len(durations)) + " durations")
+
+    status.insert_durations(durations)
+
+    return status
+
+
+# Returns the attendance record based on the given daily status, None if no attendance is required
+def derive_attendance(flextime_status: FlextimeDailyStatus) -> Optional[Attendance]:
+    if flextime_status.target_working_time == 0:
+        return None
+
+    if flextime_status.total_working_hours > 0:
+        status = Status.Present
+    else:
+        status = Status.Absent
+
+    return Attendance(flextime_status.employee_id, flextime_status.date, status, None)
+
+
+# Calculates the pending days of the given job one by one. Yields the daily status along with the attendance record
+# to be created, which is None if an attendance record is already existing or not required.
+def calculate_job(job: ProcessingJob, inputs: ProcessingInputs) -> Iterator[tuple[FlextimeDailyStatus,
+                                                                                  Optional[Attendance]]]:
+    checkins = inputs.checkins.get(job.employee.id, {})
+    calendar = TargetCalendar.build(job.employee, job.definition, job.start, job.end, inputs.holidays,
+                                    inputs.attendances, inputs.requests)
+    current_day = job.start
+    statuses = []
+    derive = []
+
+    while current_day < job.end:
+        events = checkins.get(current_day, CheckinList([]))
+
+        statuses.append(prepare_day(job.employee, current_day, calendar, events))
+        derive.append(inputs.attendances.get(job.employee.id, current_day) is None)
+
+        current_day += datetime.timedelta(days=1)
+
+    # Values of all days are calculated at once, as the balance is a running sum
+    sums = [status.get_duration_sums() for status in statuses]
+    calculator = DailyStatusCalculator(inputs.break_times, job.definition.forced_insufficient_break_time)
+    days = calculator.calculate([working_time for working_time, _, _ in sums],
+                                [break_time for _, break_time, _ in sums],
+                                [break_found for _, _, break_found in sums],
+                                [status.target_working_time for status in statuses],
+                                [calendar.is_minor(status.date) for status in statuses], job.balance)
+
+    if statuses:
+        logger.info(job.employee.id + ": Calculated " + str(len(statuses)) + " days, new flextime balance: "
+                    + str(days.time_balance[-1]))
+
+    for index, status in enumerate(statuses):
+        status.total_working_hours = sums[index][0]
+        status.break_time_deducted = days.break_time_deducted[index]
+        status.flextime_delta = days.flextime_delta[index]
+        status.time_balance = days.time_balance[index]
+
+        yield status, derive_attendance(status) if derive[index] else None
+
+
+# Entry point of worker processes, returns the calculated days of each job
+def calculate_shard(jobs: list[ProcessingJob],
+                    inputs: ProcessingInputs) -> list[list[tuple[FlextimeDailyStatus, Optional[Attendance]]]]:
+    return [list(calculate_job(job, inputs)) for job in jobs]
 
 
 # Service for processing flextime account status
@@ -24,11 +255,12 @@ class FlexTimeProcessingService:
     attendance: AttendanceRepository
     vacation: VacationRepository
     checkin: CheckinRepository
+    dirty_days: DirtyDayRepository
 
     def __init__(self, clock: Clock, daily_status: FlextimeStatusRepository, employee: EmployeeRepository,
                  definitions: FlextimeDefinitionRepository, break_times: BreakTimeRepository,
                  holidays: HolidayRepository, attendance: AttendanceRepository, vacation: VacationRepository,
-                 checkin: CheckinRepository):
+                 checkin: CheckinRepository, dirty_days: DirtyDayRepository):
         self.attendance = attendance
         self.vacation = vacation
         self.clock = clock
@@ -38,102 +270,355 @@ class FlexTimeProcessingService:
         self.break_times = break_times
         self.holidays = holidays
         self.checkin = checkin
+        self.dirty_days = dirty_days
 
-    # Creates an instance for productive usage
+    # Returns the shared instance of the current request for productive usage
     @staticmethod
     def prod():
-        return FlexTimeProcessingService(Clock(), FlextimeStatusRepository(), EmployeeRepository(),
-                                         FlextimeDefinitionRepository(), BreakTimeRepository(), HolidayRepository(),
-                                         AttendanceRepository(), VacationRepository(), CheckinRepository())
+        return services.get(FlexTimeProcessingService, lambda: FlexTimeProcessingService(
+            services.get(Clock), services.get(FlextimeStatusRepository), services.get(EmployeeRepository),
+            services.get(FlextimeDefinitionRepository), services.get(BreakTimeRepository),
+            services.get(HolidayRepository), services.get(AttendanceRepository), services.get(VacationRepository),
+            services.get(CheckinRepository), services.get(DirtyDayRepository)))
 
     # Starts the processing/generation of daily flextime status documents
     def process_daily_status(self):
-        employees = self.employee.get_all()
+        employees = self.employee.get_all(time_model=TimeModel.Flextime)
         break_times = self.break_times.get_definitions()
 
         for employee in employees:
             logger.info("Starting flextime processing of employee " + employee.id)
+            definition = self._get_definition(employee)
 
-            if employee.time_model is not TimeModel.Flextime:
-                logger.info("Skipping employee " + employee.id + ", as time model is not flextime")
+            if definition is None:
                 continue
 
-            definition = self.definitions.get_by_grade(employee.grade)
+            self._process_employee(employee, break_times, definition)
+
+    # Same as process_daily_status(), but loads the inputs of all employees with a constant number of grouped
+    # queries instead of querying per employee and day. Derived attendance records are collected and written in
+    # chunks, optionally without running ERPNext document hooks.
+    # Each chunk is committed, so a run stopped by the given budget (or a job timeout) is resumed by the next run
+    # from the flextime accounts.
+    # With more than one worker, the calculation is distributed to a process pool. All reads and writes are still
+    # done by the calling process.
+    # Processing can be restricted to the given employees.
+    def process_daily_status_batch(self, skip_attendance_hooks: bool = False,
+                                   budget: Optional[ProcessingBudget] = None, workers: int = 1,
+                                   employee_ids: Optional[list[str]] = None) -> ProcessingResult:
+        budget = ProcessingBudget() if budget is None else budget
+        started = self.clock.monotonic()
+        result = ProcessingResult()
+        today = self.clock.date_today()
+
+        # Cheap pre-check, as just the first run of a day finds any work
+        due_employee_ids = self.daily_status.get_due_employee_ids(today, employee_ids)
+
+        if not due_employee_ids:
+            logger.info("Flextime status of all employees is already up to date")
+            return result
+
+        accounts = self.daily_status.get_accounts(due_employee_ids)
+        jobs = []
+
+        for employee in self.employee.get_all(due_employee_ids):
+            definition = self._get_definition(employee)
 
             if definition is None:
-                logger.info(
-                    "Skipping employee " + employee.id + ", as no flextime definition was found for grade " + str(
-                        employee.grade))
                 continue
 
-            self._process_employee(employee, break_times, definition)
+            job = ProcessingJob(employee, definition, accounts.get(employee.id))
 
-    def _process_employee(self, employee: Employee, break_time: BreakTimeDefinitions, definitions: FlextimeDefinition):
-        current_day = self.daily_status.get_latest_status_date(employee)
+            # Employees are processed up to their relieving date
+            end = employee.get_processing_end(today)
 
-        if current_day is None:
-            current_day = employee.join_date
-        else:
-            current_day += datetime.timedelta(days=1)
+            if job.start >= end:
+                logger.info(employee.id + ": Flextime status is already up to date")
+                continue
 
-        flextime_balance = self.daily_status.get_flextime_balance(employee.id)
-        logger.info(employee.id + ": Found current flextime balance of " + str(flextime_balance) + " hours")
+            job.limit(end, budget.max_days)
+
+            if job.end < end:
+                result.completed = False
+
+            jobs.append(job)
+
+        if not jobs:
+            logger.info("Flextime status of all employees is already up to date")
+            return result
+
+        break_times = self.break_times.get_definitions()
+
+        # Statuses and attendance records are persisted in chunks by using multi-row inserts
+        pending_statuses = []
+        pending_attendances = []
+        stopped = False
+
+        for index, group in enumerate(group_jobs(jobs)):
+            # Further groups are just prefetched within the budget
+            if index > 0 and self._is_exceeded(budget, started):
+                logger.info("Stopping flextime processing, as time budget is exceeded")
+                result.completed = False
+                break
+
+            start = min(job.start for job in group)
+            end = max(job.end for job in group) - datetime.timedelta(days=1)
+            employee_ids = [job.employee.id for job in group]
 
-        while current_day < self.clock.date_today():
-            logger.info(employee.id + ": Processing day " + current_day.isoformat())
-
-            attendance = self.attendance.get(employee.id, current_day)
-            target_working_time = definitions.get_for_weekday(current_day.weekday()).working_time
-
-            if self.holidays.is_holiday(current_day):
-                target_working_time = 0
-                logger.info("Detected " + str(current_day) + " as holiday and set target working time to zero")
-            elif attendance is not None and attendance.status is Status.OnLeave:
-                request = self.vacation.get_approved_request(employee.id, current_day)
-
-                if request is None:
-                    target_working_time = 0
-                    logger.info("Detected " + str(current_day) + " as regular leave, but found no vacation request")
-                elif request.is_half_day:
-                    target_working_time /= 2
-                    logger.info("Detected " + str(current_day) + " as regular leave with half-day vacation request")
-                else:
-                    target_working_time = 0
-                    logger.info("Detected " + str(current_day) + " as regular leave with full-day vacation request")
+            logger.info("Processing " + str(len(group)) + " employees from " + start.isoformat() + " to "
+                        + end.isoformat())
+
+            checkins = self.checkin.get_range_by_employee(start, end, employee_ids)
+            attendances = self.attendance.get_range(employee_ids, start, end)
+            requests = self._get_approved_requests(attendances, start, end)
+
+            if workers > 1 and len(group) > 1:
+                inputs = ProcessingInputs(break_times, checkins, attendances, requests, self.holidays.get_calendar())
+                calculated = self._calculate_parallel(group, inputs, workers)
             else:
-                logger.info("Set target working time to " + str(target_working_time))
+                inputs = ProcessingInputs(break_times, checkins, attendances, requests, self.holidays)
+                calculated = (calculate_job(job, inputs) for job in group)
+
+            for job, days in zip(group, calculated):
+                if self._is_exceeded(budget, started):
+                    logger.info("Stopping flextime processing, as time budget is exceeded")
+                    result.completed = False
+                    stopped = True
+                    break
+
+                for status, attendance in days:
+                    pending_statuses.append(status)
+
+                    if attendance is not None:
+                        pending_attendances.append(attendance)
+
+                    if len(pending_statuses) >= BULK_INSERT_SIZE:
+                        self._flush(result, pending_statuses, pending_attendances, skip_attendance_hooks)
+                        pending_statuses = []
+                        pending_attendances = []
+
+                    next_day = status.date + datetime.timedelta(days=1)
+
+                    if next_day < job.end and self._is_exceeded(budget, started):
+                        logger.info(job.employee.id + ": Stopping before " + next_day.isoformat()
+                                    + ", as time budget is exceeded")
+                        result.completed = False
+                        break
+
+            # Stops the calculation of remaining jobs, if stopped by the budget
+            calculated.close()
+
+            if stopped:
+                break
+
+        self._flush(result, pending_statuses, pending_attendances, skip_attendance_hooks)
+        logger.info("Created " + str(result.statuses) + " daily status and " + str(result.attendances)
+                    + " attendance docs" + ("" if result.completed else ", remaining days are processed next run"))
+
+        return result
+
+    # Recalculates the queued days (e.g. changed by late checkins, corrected attendance or leave applications) of all
+    # (or the given) employees. Just the affected days are recalculated, the balance of all following days is
+    # shifted by the difference. Returns the number of recalculated days.
+    def process_dirty_days(self, employee_ids: Optional[list[str]] = None) -> int:
+        dirty_days = self.dirty_days.get_dirty_days(employee_ids)
+
+        if not dirty_days:
+            return 0
+
+        accounts = self.daily_status.get_accounts(list(dirty_days))
+        jobs = []
+
+        for employee in self.employee.get_all(list(dirty_days)):
+            definition = self._get_definition(employee)
+            account = accounts.get(employee.id)
+
+            if definition is None or account is None:
+                self.dirty_days.remove(employee.id, dirty_days[employee.id])
+                continue
+
+            jobs.append((employee, definition, account))
+
+        if not jobs:
+            return 0
+
+        start = min(dirty_days[employee.id][0] for employee, _, _ in jobs)
+        end = max(dirty_days[employee.id][-1] for employee, _, _ in jobs)
+        employee_ids = [employee.id for employee, _, _ in jobs]
+
+        break_times = self.break_times.get_definitions()
+        checkins = self.checkin.get_range_by_employee(start, end, employee_ids)
+        attendances = self.attendance.get_range(employee_ids, start, end)
+        requests = self._get_approved_requests(attendances, start, end)
+        count = 0
+
+        for employee, definition, account in jobs:
+            dates = dirty_days[employee.id]
+            booked = self.daily_status.get_booked_statuses(employee.id, dates)
+            employee_checkins = checkins.get(employee.id, {})
+            calendar = TargetCalendar.build(employee, definition, dates[0], dates[-1] + datetime.timedelta(days=1),
+                                            self.holidays, attendances, requests)
+
+            # Balance shift caused by the already recalculated days, not yet reflected by the booked statuses
+            shift = 0
+            recalculated = 0
+
+            for day in dates:
+                if day > account.last_processed_date or day not in booked:
+                    continue
+
+                previous = booked[day]
+                status = calculate_day(employee, day, break_times, definition, calendar,
+                                       employee_checkins.get(day, CheckinList([])),
+                                       previous.get_previous_balance() + shift)
+                delta = status.time_balance - (previous.time_balance + shift)
+
+                self.daily_status.correct(previous.name, status)
+
+                if delta:
+                    self.daily_status.shift_balances(employee.id, day, delta)
+                    shift += delta
 
-            status = FlextimeDailyStatus(
-                employee.id,
-                current_day,
-                target_working_time
-            )
+                recalculated += 1
 
-            durations = self.checkin.get(current_day, employee.id).get_durations()
-            logger.info("Found " + str(len(durations)) + " durations")
+            logger.info(employee.id + ": Recalculated " + str(recalculated) + " days, balance changed by "
+                        + str(shift) + " hours")
 
-            for duration in durations:
-                status.insert_duration(duration)
+            self.dirty_days.remove(employee.id, dates)
+            self.daily_status.commit()
+            count += recalculated
 
-            status.calculate(break_time, definitions.forced_insufficient_break_time, employee.is_minor(),
-                             flextime_balance)
+        return count
+
+    # Returns the due employees and the employees with queued days, split into the given number of shards at maximum
+    def get_due_shards(self, count: int) -> list[list[str]]:
+        employee_ids = sorted(set(self.daily_status.get_due_employee_ids(self.clock.date_today()))
+                              | set(self.dirty_days.get_employee_ids()))
+
+        # Round-robin, so employees joined at the same time (sequential IDs) are spread across all shards
+        shards = [employee_ids[index::count] for index in range(max(count, 1))]
+
+        return [shard for shard in shards if shard]
+
+    # Processes the given employees like process_daily_status_batch(), but just the ones not leased by another
+    # worker. Leases are released at the end, expired leases of crashed workers are taken over.
+    def process_shard(self, employee_ids: list[str], owner: str, skip_attendance_hooks: bool = False,
+                      budget: Optional[ProcessingBudget] = None, workers: int = 1) -> ProcessingResult:
+        budget = ProcessingBudget() if budget is None else budget
+        duration = LEASE_DURATION_UNLIMITED if budget.time_limit is None else int(budget.time_limit) + LEASE_MARGIN
+
+        leased = self.daily_status.acquire_leases(employee_ids, owner, duration)
+
+        if len(leased) < len(employee_ids):
+            logger.info("Skipping " + str(len(employee_ids) - len(leased)) + " employees leased by other workers")
+
+        if not leased:
+            return ProcessingResult()
+
+        try:
+            self.process_dirty_days(leased)
+            return self.process_daily_status_batch(skip_attendance_hooks, budget, workers, leased)
+        finally:
+            self.daily_status.release_leases(leased, owner)
+
+    # Calculates the given jobs by a pool of worker processes. Yields the calculated days per job in the given order.
+    @staticmethod
+    def _calculate_parallel(jobs: list[ProcessingJob], inputs: ProcessingInputs,
+                            workers: int) -> Iterator[list[tuple[FlextimeDailyStatus, Optional[Attendance]]]]:
+        shard_size = -(-len(jobs) // (workers * SHARDS_PER_WORKER))
+        shards = [jobs[index:index + shard_size] for index in range(0, len(jobs), shard_size)]
+
+        logger.info("Calculating " + str(len(shards)) + " shards by " + str(workers) + " worker processes")
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+        try:
+            futures = [executor.submit(calculate_shard, shard, inputs.select([job.employee.id for job in shard]))
+                       for shard in shards]
+
+            for future in futures:
+                yield from future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # Persists the given statuses and attendance records by bulk inserts
+    def _flush(self, result: ProcessingResult, statuses: list[FlextimeDailyStatus], attendances: list[Attendance],
+               skip_attendance_hooks: bool):
+        self.daily_status.add_all(statuses)
+        result.statuses += len(statuses)
+
+        result.attendances += self.attendance.create_all(attendances, skip_attendance_hooks, BULK_INSERT_SIZE)
+
+        # Accounts are updated along with the statuses, so committing records the progress of the run
+        self.daily_status.commit()
+
+    # Returns true if the runtime limit of the given budget is reached
+    def _is_exceeded(self, budget: ProcessingBudget, started: float) -> bool:
+        return budget.time_limit is not None and self.clock.monotonic() - started >= budget.time_limit
+
+    # Returns the approved leave applications within the given range. Just employees with leave attendance records
+    # are queried, as requests are only relevant for days on leave.
+    def _get_approved_requests(self, attendances: AttendanceIndex, start: datetime.date,
+                               end: datetime.date) -> ApprovedRequests:
+        employee_ids = attendances.get_employees_on_leave()
+
+        if not employee_ids:
+            return ApprovedRequests()
+
+        return self.vacation.get_approved_requests(employee_ids, start, end)
+
+    # Returns the flextime definition of the given employee, None if the employee is not processed at all
+    def _get_definition(self, employee: Employee) -> Optional[FlextimeDefinition]:
+        if employee.time_model is not TimeModel.Flextime:
+            logger.info("Skipping employee " + employee.id + ", as time model is not flextime")
+            return None
+
+        definition = self.definitions.get_by_grade(employee.grade)
+
+        if definition is None:
+            logger.info(
+                "Skipping employee " + employee.id + ", as no flextime definition was found for grade " + str(
+                    employee.grade))
+
+        return definition
+
+    def _process_employee(self, employee: Employee, break_time: BreakTimeDefinitions, definitions: FlextimeDefinition):
+        # Start date and balance are resumed from the account head
+        job = ProcessingJob(employee, definitions, self.daily_status.get_account(employee.id))
+        current_day = job.start
+
+        # Employees are processed up to their relieving date
+        today = employee.get_processing_end(self.clock.date_today())
+
+        if current_day >= today:
+            logger.info(employee.id + ": Flextime status is already up to date")
+            return
+
+        flextime_balance = job.balance
+        logger.info(employee.id + ": Found current flextime balance of " + str(flextime_balance) + " hours")
+
+        # All checkin events and attendance records of the pending days are loaded at once
+        end = today - datetime.timedelta(days=1)
+        checkins = self.checkin.get_range(current_day, end, employee.id)
+        attendances = self.attendance.get_range([employee.id], current_day, end)
+        requests = self._get_approved_requests(attendances, current_day, end)
+        calendar = TargetCalendar.build(employee, definitions, current_day, today, self.holidays, attendances,
+                                        requests)
+
+        while current_day < today:
+            events = checkins.get(current_day, CheckinList([]))
+
+            status = calculate_day(employee, current_day, break_time, definitions, calendar, events,
+                                   flextime_balance)
             self.daily_status.add(status)
 
-            if attendance is None:
+            if attendances.get(employee.id, current_day) is None:
                 self._create_attendance(status)
 
             flextime_balance = status.time_balance
-            logger.info("New flextime balance: " + str(flextime_balance))
-
             current_day += datetime.timedelta(days=1)
 
     def _create_attendance(self, flextime_status: FlextimeDailyStatus):
-        if flextime_status.target_working_time == 0:
-            return
-
-        if flextime_status.total_working_hours > 0:
-            status = Status.Present
-        else:
-            status = Status.Absent
+        attendance = derive_attendance(flextime_status)
 
-        self.attendance.create(Attendance(flextime_status.employee_id, flextime_status.date, status, None))
+        if attendance is not None:
+            self.attendance.create(attendance)
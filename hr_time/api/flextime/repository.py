@@ -1,4 +1,6 @@
 import datetime
+import re
+from array import array
 from enum import Enum
 from typing import Optional
 
@@ -7,6 +9,8 @@ import frappe
 from hr_time.api.check_in.event import CheckinEvent
 from hr_time.api.employee.repository import Employee
 from hr_time.api.flextime.break_time import BreakTimeDefinitions
+from hr_time.api.flextime.ledger import BalanceLedgerRepository
+from hr_time.api.utils.container import Lifetime, services
 
 
 class DurationType(Enum):
@@ -56,6 +60,79 @@ class CheckinDuration:
         )
 
 
+# Durations of a day as parallel integer columns, CheckinDuration objects are just created on demand
+class DurationColumns:
+    # Start as seconds of day
+    starts: array
+
+    # End as seconds of day
+    ends: array
+
+    # Duration in seconds, same as CheckinDuration.total_time
+    totals: array
+
+    # 1 if break duration, 0 if working duration
+    breaks: array
+
+    # Indexes of the first and second event in event_ids
+    firsts: array
+    seconds: array
+
+    # Event IDs of the column store the durations were built from
+    event_ids: list[str]
+
+    # Total working time in seconds
+    work_time: int
+
+    # Total break time in seconds
+    break_time: int
+
+    def __init__(self, event_ids: list[str]):
+        self.starts = array("l")
+        self.ends = array("l")
+        self.totals = array("l")
+        self.breaks = array("B")
+        self.firsts = array("l")
+        self.seconds = array("l")
+        self.event_ids = event_ids
+        self.work_time = 0
+        self.break_time = 0
+
+    def append(self, start: int, end: int, is_break: bool, first: int, second: int):
+        # Equal to timedelta.seconds of the difference, i.e. durations across midnight wrap around
+        total = (end - start) % 86400
+
+        self.starts.append(start)
+        self.ends.append(end)
+        self.totals.append(total)
+        self.breaks.append(1 if is_break else 0)
+        self.firsts.append(first)
+        self.seconds.append(second)
+
+        if is_break:
+            self.break_time += total
+        else:
+            self.work_time += total
+
+    def has_break(self) -> bool:
+        return 1 in self.breaks
+
+    # Creates the duration objects, e.g. for persisting them
+    def materialize(self) -> list[CheckinDuration]:
+        durations = []
+
+        for index in range(len(self.starts)):
+            durations.append(CheckinDuration(datetime.timedelta(seconds=self.starts[index]),
+                                             datetime.timedelta(seconds=self.ends[index]),
+                                             DurationType.BREAK if self.breaks[index] else DurationType.WORK,
+                                             self.event_ids[self.firsts[index]], self.event_ids[self.seconds[index]]))
+
+        return durations
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
 class FlextimeDailyStatus:
     # ID of employee
     employee_id: str
@@ -78,8 +155,11 @@ class FlextimeDailyStatus:
     # Delta = total_working_hours - break_time_deducted - target_working_time
     flextime_delta: float
 
-    # List of single checkin/checkout events
-    durations: list[CheckinDuration]
+    # List of single checkin/checkout events, see durations
+    _durations: list[CheckinDuration]
+
+    # Inserted durations not materialized yet
+    _duration_columns: list[DurationColumns]
 
     def __init__(self, employee_id: str, date: datetime.date, target_working_time: int):
         self.employee_id = employee_id
@@ -89,27 +169,53 @@ class FlextimeDailyStatus:
         self.time_balance = 0
         self.target_working_time = target_working_time
         self.flextime_delta = 0
-        self.durations = []
+        self._durations = []
+        self._duration_columns = []
+
+    # List of single checkin/checkout events. Durations inserted as columns are materialized on first access.
+    @property
+    def durations(self) -> list[CheckinDuration]:
+        for columns in self._duration_columns:
+            self._durations += columns.materialize()
+
+        self._duration_columns = []
+        return self._durations
 
     def insert_duration(self, duration: CheckinDuration):
         self.durations.append(duration)
 
-    # Calculates the status values based on durations
-    def calculate(self, break_definition: BreakTimeDefinitions, deducted_time_on_no_break: int, is_minor: bool,
-                  previous_flextime_balance: float):
-        self.break_time_deducted = 0
-        self.total_working_hours = 0
+    # Inserts durations without creating objects, they are appended to the already inserted ones
+    def insert_durations(self, columns: DurationColumns):
+        self._duration_columns.append(columns)
+
+    # Returns working time and break time in seconds and whether any break duration exists
+    def get_duration_sums(self) -> tuple[int, int, bool]:
+        working_time = 0
         checked_break_time = 0
 
         break_found = False
 
-        for duration in self.durations:
+        for duration in self._durations:
             match duration.duration_type:
                 case DurationType.BREAK:
                     checked_break_time += duration.total_time
                     break_found = True
                 case DurationType.WORK:
-                    self.total_working_hours += duration.total_time
+                    working_time += duration.total_time
+
+        # Sums of not materialized durations are taken from the columns
+        for columns in self._duration_columns:
+            checked_break_time += columns.break_time
+            working_time += columns.work_time
+            break_found = break_found or columns.has_break()
+
+        return working_time, checked_break_time, break_found
+
+    # Calculates the status values based on durations
+    def calculate(self, break_definition: BreakTimeDefinitions, deducted_time_on_no_break: int, is_minor: bool,
+                  previous_flextime_balance: float):
+        self.break_time_deducted = 0
+        self.total_working_hours, checked_break_time, break_found = self.get_duration_sums()
 
         min_break_time = break_definition.get_break_time(self.total_working_hours, is_minor)
 
@@ -122,37 +228,198 @@ class FlextimeDailyStatus:
         self.time_balance = previous_flextime_balance + self.flextime_delta
 
 
+# Balance values of an already persisted daily status
+class BookedStatus:
+    name: str
+    date: datetime.date
+
+    # Flextime delta of the day in hours
+    flextime_delta: float
+
+    # Flextime balance in hours after the day
+    time_balance: float
+
+    def __init__(self, name: str, date: datetime.date, flextime_delta: float, time_balance: float):
+        self.name = name
+        self.date = date
+        self.flextime_delta = flextime_delta
+        self.time_balance = time_balance
+
+    # Returns the flextime balance in hours before the day
+    def get_previous_balance(self) -> float:
+        return self.time_balance - self.flextime_delta
+
+
+# Processing head of an employee, storing date and balance of the latest daily status
+class FlextimeAccount:
+    employee_id: str
+
+    # Date of the latest daily status
+    last_processed_date: datetime.date
+
+    # Flextime balance in hours after the last processed date
+    time_balance: float
+
+    def __init__(self, employee_id: str, last_processed_date: datetime.date, time_balance: float):
+        self.employee_id = employee_id
+        self.last_processed_date = last_processed_date
+        self.time_balance = time_balance
+
+
+@services.provide(Lifetime.Worker)
 class FlextimeStatusRepository:
+    # Fields set by frappe for every document, used for bulk inserts
+    _standard_fields = ["name", "creation", "modified", "owner", "modified_by", "docstatus"]
+
     # Returns the date of the latest daily status, None in case no status doc is existing at all
     def get_latest_status_date(self, employee: Employee) -> Optional[datetime.date]:
-        docs = frappe.get_all("Flextime daily status", fields=["date"], filters={"employee": employee.id},
-                              order_by="date desc", limit=1)
+        account = self.get_account(employee.id)
 
-        if not docs:
+        if account is None:
             return None
 
-        return docs[0].date
+        return account.last_processed_date
 
     # Returns the flextime balance in hours
     def get_flextime_balance(self, employee_id: str) -> float:
-        docs = frappe.get_all("Flextime daily status", fields=["time_balance"], filters={"employee": employee_id},
-                              order_by="date desc", limit=1)
+        account = self.get_account(employee_id)
 
-        if not docs:
+        if account is None:
             return 0
 
-        return docs[0].time_balance
+        return account.time_balance
 
-    # Returns the flextime balance by the given date
-    def get_balance_by_date(self, employee_id: str, date: datetime.date) -> Optional[float]:
-        docs = frappe.get_all("Flextime daily status", fields=["time_balance"],
-                              filters={"employee": employee_id, "date": date.isoformat()},
-                              order_by="date desc", limit=1)
+    # Returns the flextime account of the given employee by primary key, None if no status was processed yet
+    def get_account(self, employee_id: str) -> Optional[FlextimeAccount]:
+        doc = frappe.db.get_value("Flextime account", employee_id, ["last_processed_date", "time_balance"],
+                                  as_dict=True)
+
+        if not doc or doc.last_processed_date is None:
+            return None
+
+        return FlextimeAccount(employee_id, doc.last_processed_date, doc.time_balance)
+
+    # Returns the flextime accounts of all (or the given) employees with a single query, indexed by employee ID.
+    # Employees without any processed status are not included.
+    def get_accounts(self, employee_ids: Optional[list[str]] = None) -> dict[str, FlextimeAccount]:
+        filters = [["last_processed_date", "is", "set"]]
+
+        if employee_ids is not None:
+            filters.append(["employee", "in", employee_ids])
+
+        docs = frappe.get_all("Flextime account", fields=["employee", "last_processed_date", "time_balance"],
+                              filters=filters)
+
+        return {doc.employee: FlextimeAccount(doc.employee, doc.last_processed_date, doc.time_balance)
+                for doc in docs}
+
+    # Moves the account of the given employee forward to the given status
+    def update_account(self, employee_id: str, date: datetime.date, time_balance: float):
+        self._upsert_accounts([FlextimeAccount(employee_id, date, time_balance)])
+
+    # Returns the IDs of all flextime employees with at least one unprocessed day before the given date.
+    # Answered by a single query on the indexed account watermark.
+    # Optionally restricted to the given employees.
+    def get_due_employee_ids(self, today: datetime.date, employee_ids: Optional[list[str]] = None) -> list[str]:
+        if employee_ids is not None and not employee_ids:
+            return []
+
+        values = {"today": today, "yesterday": today - datetime.timedelta(days=1)}
+        employee_filter = ""
+
+        if employee_ids is not None:
+            values["employee_ids"] = tuple(employee_ids)
+            employee_filter = "AND employee.name IN %(employee_ids)s"
+
+        docs = frappe.db.sql("""
+            SELECT employee.name
+            FROM `tabEmployee` employee
+            LEFT JOIN `tabFlextime account` account ON account.name = employee.name
+            WHERE employee.custom_time_model = 'Flextime account'
+                AND employee.date_of_joining < %(today)s
+                AND (employee.status = 'Active' OR employee.relieving_date IS NOT NULL)
+                AND (account.last_processed_date IS NULL OR account.last_processed_date < %(yesterday)s)
+                AND (employee.relieving_date IS NULL OR account.last_processed_date IS NULL
+                    OR account.last_processed_date < employee.relieving_date)
+                {employee_filter}
+            ORDER BY employee.name
+        """.format(employee_filter=employee_filter), values, as_dict=True)
+
+        return [doc.name for doc in docs]
+
+    # Leases the accounts of the given employees to the given owner for the given number of seconds. Accounts leased
+    # by other owners are skipped, unless their lease is expired. Returns the IDs of the successfully leased
+    # employees. The lease is committed immediately, so it is visible to other workers.
+    def acquire_leases(self, employee_ids: list[str], owner: str, duration: int) -> list[str]:
+        if not employee_ids:
+            return []
+
+        # Employees without processed status do not have an account yet
+        now = frappe.utils.now()
+        user = frappe.session.user
+        employee_names = self._get_employee_names(employee_ids)
+        values = []
+
+        for employee_id in employee_ids:
+            values += [employee_id, now, now, user, user, 0, employee_id, employee_names.get(employee_id), 0]
+
+        frappe.db.sql("""
+            INSERT IGNORE INTO `tabFlextime account` (name, creation, modified, owner, modified_by, docstatus, employee,
+                employee_name, time_balance)
+            VALUES {rows}
+        """.format(rows=", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(employee_ids))), values)
+
+        # Single atomic update, so each account is leased by one owner at maximum
+        frappe.db.sql("""
+            UPDATE `tabFlextime account`
+            SET lease_owner = %(owner)s, lease_expires = NOW() + INTERVAL %(duration)s SECOND
+            WHERE name IN %(employee_ids)s
+                AND (lease_owner IS NULL OR lease_owner = %(owner)s OR lease_expires IS NULL OR lease_expires < NOW())
+        """, {"owner": owner, "duration": duration, "employee_ids": tuple(employee_ids)})
+
+        frappe.db.commit()
+
+        docs = frappe.get_all("Flextime account", fields=["name"],
+                              filters=[["name", "in", employee_ids], ["lease_owner", "=", owner]], order_by="name asc")
+
+        return [doc.name for doc in docs]
+
+    # Releases the leases of the given owner
+    def release_leases(self, employee_ids: list[str], owner: str):
+        if not employee_ids:
+            return
+
+        frappe.db.sql("""
+            UPDATE `tabFlextime account`
+            SET lease_owner = NULL, lease_expires = NULL
+            WHERE name IN %(employee_ids)s AND lease_owner = %(owner)s
+        """, {"owner": owner, "employee_ids": tuple(employee_ids)})
+
+        frappe.db.commit()
+
+    # Rebuilds the account of the given employee from the latest submitted daily status, e.g. after a status
+    # got cancelled or deleted. The account is removed, if no submitted status is left.
+    def reset_account(self, employee_id: str):
+        docs = frappe.get_all("Flextime daily status", fields=["date", "time_balance"],
+                              filters={"employee": employee_id, "docstatus": 1}, order_by="date desc", limit=1)
 
         if not docs:
+            frappe.db.delete("Flextime account", {"name": employee_id})
+            return
+
+        self._upsert_accounts([FlextimeAccount(employee_id, docs[0].date, docs[0].time_balance)], force=True)
+
+    # Returns the flextime balance in hours after the given date, answered by the balance ledger of the employee.
+    # Days without status (e.g. gaps) have the balance of the previous status, days before the first status the
+    # opening balance (if any, otherwise zero).
+    # None in case no status doc is existing at all.
+    def get_balance_by_date(self, employee_id: str, date: datetime.date) -> Optional[float]:
+        ledger = services.get(BalanceLedgerRepository).get(employee_id)
+
+        if ledger.is_empty():
             return None
 
-        return docs[0].time_balance
+        return ledger.balance_at(date) / 3600
 
     # Saves a new daily status
     def add(self, status: FlextimeDailyStatus):
@@ -164,6 +431,9 @@ class FlextimeStatusRepository:
         parent.time_balance = status.time_balance
         parent.target_working_time = status.target_working_time
         parent.flextime_delta = status.flextime_delta
+
+        # Recalculation of a cancelled day is named as its amendment by frappe, e.g. "{employee}-{date}-1"
+        parent.amended_from = self._get_cancelled_names([status]).get((status.employee_id, status.date))
         parent.save()
 
         for duration in status.durations:
@@ -178,4 +448,184 @@ class FlextimeStatusRepository:
 
         # parent = frappe.get_doc("Flextime daily status", parent.name)
         parent.load_from_db()
+        # Account is updated by the on_submit hook of the doctype within the same transaction
         parent.submit()
+
+    # Saves the given daily status in submitted state by using multi-row inserts for parent and child docs.
+    # In contrast to add() no document hooks are executed.
+    def add_all(self, statuses: list[FlextimeDailyStatus]):
+        if not statuses:
+            return
+
+        now = frappe.utils.now()
+        user = frappe.session.user
+        employee_names = self._get_employee_names(list({status.employee_id for status in statuses}))
+        cancelled_names = self._get_cancelled_names(statuses)
+
+        parents = []
+        children = []
+
+        for status in statuses:
+            if not status.employee_id or status.date is None:
+                raise ValueError("Daily status requires employee and date")
+
+            # Equal to naming expression "{employee}-{date}" of doctype, recalculated cancelled days are amendments
+            amended_from = cancelled_names.get((status.employee_id, status.date))
+            name = status.employee_id + "-" + status.date.isoformat() if amended_from is None \
+                else get_amended_name(amended_from)
+
+            parents.append((name, now, now, user, user, 1, status.employee_id, employee_names.get(status.employee_id),
+                            status.date, status.total_working_hours, status.break_time_deducted, status.time_balance,
+                            status.target_working_time, status.flextime_delta, amended_from))
+
+            children += self._build_duration_rows(name, status, now, user)
+
+        frappe.db.bulk_insert("Flextime daily status", self._standard_fields + [
+            "employee", "employee_name", "date", "total_working_hours", "break_time_deducted", "time_balance",
+            "target_working_time", "flextime_delta", "amended_from"
+        ], parents)
+
+        self._insert_duration_rows(children)
+
+        # Latest status per employee becomes the new account head, written in the same transaction
+        accounts = {}
+
+        for status in statuses:
+            account = accounts.get(status.employee_id)
+
+            if account is None or account.last_processed_date < status.date:
+                accounts[status.employee_id] = FlextimeAccount(status.employee_id, status.date, status.time_balance)
+
+        self._upsert_accounts(list(accounts.values()), employee_names)
+
+    # Creates or updates the accounts by a single multi-row upsert. Unless forced, accounts are never moved back
+    # to an earlier date.
+    def _upsert_accounts(self, accounts: list[FlextimeAccount], employee_names: Optional[dict[str, str]] = None,
+                         force: bool = False):
+        if not accounts:
+            return
+
+        if employee_names is None:
+            employee_names = self._get_employee_names([account.employee_id for account in accounts])
+
+        now = frappe.utils.now()
+        user = frappe.session.user
+        values = []
+
+        for account in accounts:
+            values += [account.employee_id, now, now, user, user, 0, account.employee_id,
+                       employee_names.get(account.employee_id), account.last_processed_date, account.time_balance]
+
+        condition = "1" if force else \
+            "last_processed_date IS NULL OR VALUES(last_processed_date) >= last_processed_date"
+
+        # Balance is updated first, as the condition refers to the previous date
+        frappe.db.sql("""
+            INSERT INTO `tabFlextime account` (name, creation, modified, owner, modified_by, docstatus, employee,
+                employee_name, last_processed_date, time_balance)
+            VALUES {rows}
+            ON DUPLICATE KEY UPDATE
+                time_balance = IF({condition}, VALUES(time_balance), time_balance),
+                last_processed_date = IF({condition}, VALUES(last_processed_date), last_processed_date),
+                modified = VALUES(modified), modified_by = VALUES(modified_by)
+        """.format(rows=", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(accounts)),
+                   condition=condition), values)
+
+    # Returns the persisted statuses of the given employee and days, indexed by date
+    def get_booked_statuses(self, employee_id: str, dates: list[datetime.date]) -> dict[datetime.date, BookedStatus]:
+        if not dates:
+            return {}
+
+        docs = frappe.get_all("Flextime daily status", fields=["name", "date", "flextime_delta", "time_balance"],
+                              filters=[["employee", "=", employee_id], ["date", "in", dates], ["docstatus", "=", 1]])
+
+        return {doc.date: BookedStatus(doc.name, doc.date, doc.flextime_delta, doc.time_balance) for doc in docs}
+
+    # Overwrites the persisted (submitted) status with the given recalculated one, including its durations
+    def correct(self, name: str, status: FlextimeDailyStatus):
+        now = frappe.utils.now()
+        user = frappe.session.user
+
+        frappe.db.sql("""
+            UPDATE `tabFlextime daily status`
+            SET total_working_hours = %s, break_time_deducted = %s, time_balance = %s, target_working_time = %s,
+                flextime_delta = %s, modified = %s, modified_by = %s
+            WHERE name = %s
+        """, (status.total_working_hours, status.break_time_deducted, status.time_balance,
+              status.target_working_time, status.flextime_delta, now, user, name))
+
+        frappe.db.delete("Checkin duration", {"parent": name, "parenttype": "Flextime daily status"})
+        self._insert_duration_rows(self._build_duration_rows(name, status, now, user))
+
+    # Shifts the balance of all statuses after the given date and of the account by the given hours.
+    # Stored balances are still rewritten by a single set-based update, as the balance of each status is shown in
+    # the desk and read back by reset_account() and the recalculation of queued days. Balance lookups by date are
+    # answered by the balance ledger, which is corrected by a point update of the day.
+    def shift_balances(self, employee_id: str, date: datetime.date, delta: float):
+        frappe.db.sql("""
+            UPDATE `tabFlextime daily status`
+            SET time_balance = time_balance + %s
+            WHERE employee = %s AND date > %s AND docstatus = 1
+        """, (delta, employee_id, date))
+
+        frappe.db.sql("""
+            UPDATE `tabFlextime account`
+            SET time_balance = time_balance + %s
+            WHERE name = %s AND last_processed_date >= %s
+        """, (delta, employee_id, date))
+
+        # Change of the balance after the day equals the change of its delta
+        services.get(BalanceLedgerRepository).add(employee_id, date, delta)
+
+    # Commits the current transaction
+    @staticmethod
+    def commit():
+        frappe.db.commit()
+
+    # Returns the rows of the durations of the given status, in the order of _insert_duration_rows()
+    @staticmethod
+    def _build_duration_rows(name: str, status: FlextimeDailyStatus, now: str, user: str) -> list[tuple]:
+        rows = []
+
+        for idx, duration in enumerate(status.durations, start=1):
+            rows.append((frappe.generate_hash(length=10), now, now, user, user, 1, name, "Flextime daily status",
+                         "checkin_list", idx, duration.start, duration.end, duration.total_time,
+                         "Work time" if duration.duration_type is DurationType.WORK else "Break time",
+                         duration.event_first, duration.event_second))
+
+        return rows
+
+    def _insert_duration_rows(self, rows: list[tuple]):
+        frappe.db.bulk_insert("Checkin duration", self._standard_fields + [
+            "parent", "parenttype", "parentfield", "idx", "time_checkin", "time_checkout", "total_time", "type",
+            "checkin", "checkout"
+        ], rows)
+
+    # Returns the name of the latest cancelled status of each day of the given statuses, indexed by employee ID and
+    # date. Cancelled statuses keep their name, so recalculated days must not reuse it.
+    @staticmethod
+    def _get_cancelled_names(statuses: list[FlextimeDailyStatus]) -> dict[tuple[str, datetime.date], str]:
+        employee_ids = list({status.employee_id for status in statuses})
+        dates = list({status.date for status in statuses})
+
+        docs = frappe.get_all("Flextime daily status", fields=["name", "employee", "date"],
+                              filters=[["employee", "in", employee_ids], ["date", "in", dates], ["docstatus", "=", 2]],
+                              order_by="creation asc")
+
+        return {(doc.employee, doc.date): doc.name for doc in docs}
+
+    # Returns the full names by employee ID
+    @staticmethod
+    def _get_employee_names(employee_ids: list[str]) -> dict[str, str]:
+        docs = frappe.get_all("Employee", fields=["name", "employee_name"], filters=[["name", "in", employee_ids]])
+        return {doc.name: doc.employee_name for doc in docs}
+
+
+# Returns the name of the amendment of the given cancelled status, same as frappe's naming of amended documents:
+# "{name}-1" for an original status ending with its date, the counter is increased for an amended one
+def get_amended_name(amended_from: str) -> str:
+    if re.search(r"\d{4}-\d{2}-\d{2}$", amended_from):
+        return amended_from + "-1"
+
+    prefix, _, counter = amended_from.rpartition("-")
+    return prefix + "-" + str(int(counter) + 1)
@@ -1,10 +1,12 @@
 import datetime
 import math
 
+from hr_time.api.check_in.day_state import DayState, DayStateRepository
 from hr_time.api.check_in.repository import CheckinRepository
 from hr_time.api.employee.repository import EmployeeRepository
 from hr_time.api.flextime.repository import FlextimeStatusRepository
 from hr_time.api.utils.clock import Clock
+from hr_time.api.utils.container import services
 
 
 class FlextimeBalance:
@@ -60,19 +62,23 @@ class FlextimeStatisticsService:
     employee: EmployeeRepository
     status: FlextimeStatusRepository
     checkin: CheckinRepository
+    day_states: DayStateRepository
 
     def __init__(self, clock: Clock, employee: EmployeeRepository, status: FlextimeStatusRepository,
-                 checkin: CheckinRepository):
+                 checkin: CheckinRepository, day_states: DayStateRepository):
         super().__init__()
 
         self.clock = clock
         self.employee = employee
         self.status = status
         self.checkin = checkin
+        self.day_states = day_states
 
     @staticmethod
     def prod():
-        return FlextimeStatisticsService(Clock(), EmployeeRepository(), FlextimeStatusRepository(), CheckinRepository())
+        return services.get(FlextimeStatisticsService, lambda: FlextimeStatisticsService(
+            services.get(Clock), services.get(EmployeeRepository), services.get(FlextimeStatusRepository),
+            services.get(CheckinRepository), services.get(DayStateRepository)))
 
     def get_balance(self) -> FlextimeBalance:
         employee = self.employee.get_current()
@@ -80,8 +86,12 @@ class FlextimeStatisticsService:
         if employee is None:
             return FlextimeBalance(0, 0)
 
-        current = self.status.get_flextime_balance(employee.id)
-        last_month = self.status.get_balance_by_date(employee.id, datetime.date.today() - datetime.timedelta(days=30))
+        return self.get_employee_balance(employee.id)
+
+    # Returns the current balance of the given employee along with the trend of the last 30 days
+    def get_employee_balance(self, employee_id: str) -> FlextimeBalance:
+        current = self.status.get_flextime_balance(employee_id)
+        last_month = self.status.get_balance_by_date(employee_id, datetime.date.today() - datetime.timedelta(days=30))
 
         if last_month is None:
             trend = 0
@@ -97,20 +107,15 @@ class FlextimeStatisticsService:
         if employee is None:
             return 0
 
-        events = self.checkin.get(self.clock.date_today(), employee.id)
-        events.close_current(self.clock)
-
-        durations = events.get_durations()
-        if not durations:
-            return 0
-
-        current_type = durations[-1].duration_type
-        total_seconds = 0
+        return self.get_duration(employee.id)
 
-        for duration in durations:
-            if duration.duration_type != current_type:
-                continue
+    # Returns the total duration of the current status of the given employee this day in seconds
+    def get_duration(self, employee_id: str) -> int:
+        today = self.clock.date_today()
+        day_state = self.day_states.get(employee_id, today)
 
-            total_seconds += duration.total_time
+        # Day is replayed, if no state is stored (e.g. no checkin yet)
+        if day_state is None:
+            day_state = DayState.from_events(employee_id, today, self.checkin.get(today, employee_id).events)
 
-        return total_seconds
+        return day_state.get_current_duration(self.clock.now())
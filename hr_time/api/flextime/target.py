@@ -0,0 +1,110 @@
+import datetime
+from array import array
+from enum import Enum
+from typing import Union
+
+from hr_time.api import logger
+from hr_time.api.attendance.repository import AttendanceIndex, Status
+from hr_time.api.employee.repository import Employee
+from hr_time.api.flextime.definition import FlextimeDefinition
+from hr_time.api.holiday.repository import HolidayRepository, HolidayCalendar
+from hr_time.api.vacation.repository import ApprovedRequests
+
+
+class DayType(Enum):
+    Workday = 0
+    Holiday = 1
+    Leave = 2
+    HalfDayLeave = 3
+
+
+# Target working time, day type and minor flag of a single employee for consecutive days, stored as parallel columns
+# indexed by the day offset to start
+class TargetCalendar:
+    employee_id: str
+
+    # Day of index 0
+    start: datetime.date
+
+    # Target working time in seconds
+    targets: array
+
+    # DayType values
+    day_types: array
+
+    # 1 if the employee is below 18 years at this day
+    minors: array
+
+    def __init__(self, employee_id: str, start: datetime.date):
+        self.employee_id = employee_id
+        self.start = start
+        self.targets = array("d")
+        self.day_types = array("B")
+        self.minors = array("B")
+
+    # Builds the calendar of the days from start (inclusive) to end (exclusive). Holidays take precedence over leave
+    # attendance records, half-day leave applications halve the target working time of the weekday.
+    @staticmethod
+    def build(employee: Employee, definition: FlextimeDefinition, start: datetime.date, end: datetime.date,
+              holidays: Union[HolidayRepository, HolidayCalendar], attendances: AttendanceIndex,
+              requests: ApprovedRequests) -> 'TargetCalendar':
+        calendar = TargetCalendar(employee.id, start)
+        working_times = [definition.get_for_weekday(weekday).working_time for weekday in range(7)]
+        adult_date = employee.get_adult_date()
+        day = start
+
+        while day < end:
+            target_working_time = working_times[day.weekday()]
+            day_type = DayType.Workday
+            attendance = attendances.get(employee.id, day)
+
+            if holidays.is_holiday(day, employee.id):
+                target_working_time = 0
+                day_type = DayType.Holiday
+                logger.info("Detected " + str(day) + " as holiday and set target working time to zero")
+            elif attendance is not None and attendance.status is Status.OnLeave:
+                request = requests.get_approved_request(employee.id, day)
+                day_type = DayType.Leave
+
+                if request is None:
+                    target_working_time = 0
+                    logger.info("Detected " + str(day) + " as regular leave, but found no vacation request")
+                elif request.is_half_day:
+                    target_working_time /= 2
+                    day_type = DayType.HalfDayLeave
+                    logger.info("Detected " + str(day) + " as regular leave with half-day vacation request")
+                else:
+                    target_working_time = 0
+                    logger.info("Detected " + str(day) + " as regular leave with full-day vacation request")
+
+            calendar.append(target_working_time, day_type, adult_date is not None and day < adult_date)
+            day += datetime.timedelta(days=1)
+
+        return calendar
+
+    def append(self, target_working_time: int | float, day_type: DayType, is_minor: bool):
+        self.targets.append(target_working_time)
+        self.day_types.append(day_type.value)
+        self.minors.append(1 if is_minor else 0)
+
+    # Returns the target working time in seconds, which is just fractional for odd half-day targets
+    def get_target_working_time(self, day: datetime.date) -> int | float:
+        target_working_time = self.targets[self._index(day)]
+        return int(target_working_time) if target_working_time.is_integer() else target_working_time
+
+    def get_day_type(self, day: datetime.date) -> DayType:
+        return DayType(self.day_types[self._index(day)])
+
+    def is_minor(self, day: datetime.date) -> bool:
+        return bool(self.minors[self._index(day)])
+
+    def _index(self, day: datetime.date) -> int:
+        index = (day - self.start).days
+
+        if index < 0 or index >= len(self.targets):
+            raise IndexError(str(day) + " is not covered by target calendar of employee " + self.employee_id)
+
+        return index
+
+    def __len__(self) -> int:
+        return len(self.targets)
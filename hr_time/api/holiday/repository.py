@@ -3,26 +3,146 @@ from typing import Optional
 
 import frappe
 
+from hr_time.api.utils.cache import SiteCache
+from hr_time.api.utils.container import Lifetime, services
 
+
+# Holidays of all holiday lists, stored as one bitmap per list and year (one bit per day of year)
+class HolidayCalendar:
+    # Bitmaps by holiday list name and year
+    bitmaps: dict[str, dict[int, bytearray]]
+
+    # Union of all holiday lists, by year
+    merged: dict[int, bytearray]
+
+    # Assigned holiday list by employee ID
+    employee_lists: dict[str, str]
+
+    # Modification state of the source docs, used to detect outdated calendars
+    version: tuple
+
+    def __init__(self, version: tuple):
+        self.bitmaps = {}
+        self.merged = {}
+        self.employee_lists = {}
+        self.version = version
+
+    def insert(self, holiday_list: str, day: datetime.date):
+        if holiday_list not in self.bitmaps:
+            self.bitmaps[holiday_list] = {}
+
+        self._set_bit(self.bitmaps[holiday_list], day)
+        self._set_bit(self.merged, day)
+
+    def assign(self, employee_id: str, holiday_list: str):
+        self.employee_lists[employee_id] = holiday_list
+
+    # Returns the holiday list of the given employee, None if no list is assigned
+    def get_holiday_list(self, employee_id: str) -> Optional[str]:
+        return self.employee_lists.get(employee_id)
+
+    # Returns true if the given day is a holiday of the employees holiday list.
+    # Any holiday list is considered, if no employee is given or the employee has no assigned holiday list.
+    def is_holiday(self, day: datetime.date, employee_id: Optional[str] = None) -> bool:
+        holiday_list = None if employee_id is None else self.get_holiday_list(employee_id)
+
+        if holiday_list is None:
+            return self._get_bit(self.merged, day)
+
+        return self._get_bit(self.bitmaps.get(holiday_list, {}), day)
+
+    @staticmethod
+    def _set_bit(bitmaps: dict[int, bytearray], day: datetime.date):
+        if day.year not in bitmaps:
+            bitmaps[day.year] = bytearray(46)
+
+        index = day.timetuple().tm_yday - 1
+        bitmaps[day.year][index >> 3] |= 1 << (index & 7)
+
+    @staticmethod
+    def _get_bit(bitmaps: dict[int, bytearray], day: datetime.date) -> bool:
+        bitmap = bitmaps.get(day.year)
+
+        if bitmap is None:
+            return False
+
+        index = day.timetuple().tm_yday - 1
+        return bool(bitmap[index >> 3] & (1 << (index & 7)))
+
+
+@services.provide(Lifetime.Request)
 class HolidayRepository:
-    holidays: Optional[set[datetime.date]]
+    _cache_key = "holiday_calendar"
+
+    calendar: Optional[HolidayCalendar]
+    cache: SiteCache
+
+    def __init__(self, cache: Optional[SiteCache] = None):
+        self.calendar = None
+        self.cache = SiteCache() if cache is None else cache
+
+    # Returns true if the given day is a holiday (of the employees holiday list, if given)
+    def is_holiday(self, day: datetime.date, employee_id: Optional[str] = None) -> bool:
+        return self.get_calendar().is_holiday(day, employee_id)
+
+    # Returns the site-wide cached calendar, which is just rebuilt if any holiday list or assignment has changed
+    def get_calendar(self) -> HolidayCalendar:
+        if self.calendar is not None:
+            return self.calendar
+
+        version = self._get_version()
+        calendar = self.cache.get(self._cache_key)
+
+        if calendar is None or calendar.version != version:
+            calendar = self._build(version)
+            self.cache.set(self._cache_key, calendar)
+
+        self.calendar = calendar
+        return calendar
+
+    # Returns the IDs of all employees using the given holiday list, either directly or as company default
+    @staticmethod
+    def get_employee_ids(holiday_list: str) -> list[str]:
+        docs = frappe.db.sql("""
+            SELECT employee.name
+            FROM `tabEmployee` employee
+            LEFT JOIN `tabCompany` company ON company.name = employee.company
+            WHERE COALESCE(NULLIF(employee.holiday_list, ''), company.default_holiday_list) = %s
+        """, (holiday_list,), as_dict=True)
+
+        return [doc.name for doc in docs]
+
+    @staticmethod
+    def _get_version() -> tuple:
+        lists = frappe.get_all("Holiday List", fields=["name", "modified"], order_by="name asc")
+        assignments = frappe.db.sql("SELECT (SELECT MAX(modified) FROM `tabEmployee`), "
+                                    "(SELECT MAX(modified) FROM `tabCompany`)")
+
+        return tuple((doc.name, str(doc.modified)) for doc in lists) + tuple(str(value) for value in assignments[0])
 
-    def __init__(self):
-        self.holidays = None
+    @staticmethod
+    def _build(version: tuple) -> HolidayCalendar:
+        calendar = HolidayCalendar(version)
 
-    # Returns true if the given day is a flextime
-    def is_holiday(self, day: datetime.date) -> bool:
-        if self.holidays is None:
-            self._load()
+        holidays = frappe.db.sql("""
+            SELECT holiday.parent, holiday.holiday_date
+            FROM `tabHoliday` holiday
+            INNER JOIN `tabHoliday List` list ON list.name = holiday.parent
+            WHERE holiday.parenttype = 'Holiday List'
+        """, as_dict=True)
 
-        return day in self.holidays
+        for holiday in holidays:
+            calendar.insert(holiday.parent, holiday.holiday_date)
 
-    def _load(self):
-        self.holidays = set()
-        lists = frappe.get_all("Holiday List", fields="*")
+        # Employees without own holiday list are using the default list of the company
+        assignments = frappe.db.sql("""
+            SELECT employee.name, COALESCE(NULLIF(employee.holiday_list, ''), company.default_holiday_list) AS list
+            FROM `tabEmployee` employee
+            LEFT JOIN `tabCompany` company ON company.name = employee.company
+        """, as_dict=True)
 
-        for list in lists:
-            days = frappe.get_all('Holiday', fields=['*'], filters=[['parent', 'in', list.name]])
+        for assignment in assignments:
+            if assignment.list:
+                calendar.assign(assignment.name, assignment.list)
 
-            for day in days:
-                self.holidays.add(day.holiday_date)
+        return calendar
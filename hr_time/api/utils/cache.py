@@ -0,0 +1,45 @@
+from typing import Any, Optional
+
+import frappe
+
+# In-process fallback, used if no frappe cache is available (e.g. unit tests)
+_local_cache = {}
+
+
+# Site-wide cache based on frappe cache (Redis)
+class SiteCache:
+    _prefix = "hr_time:"
+
+    # Returns the cached value, None if not existing
+    def get(self, key: str) -> Optional[Any]:
+        cache = self._get_frappe_cache()
+
+        if cache is None:
+            return _local_cache.get(key)
+
+        return cache.get_value(self._prefix + key)
+
+    def set(self, key: str, value: Any):
+        cache = self._get_frappe_cache()
+
+        if cache is None:
+            _local_cache[key] = value
+            return
+
+        cache.set_value(self._prefix + key, value)
+
+    def delete(self, key: str):
+        cache = self._get_frappe_cache()
+
+        if cache is None:
+            _local_cache.pop(key, None)
+            return
+
+        cache.delete_value(self._prefix + key)
+
+    @staticmethod
+    def _get_frappe_cache():
+        if not hasattr(frappe, "cache"):
+            return None
+
+        return frappe.cache()
@@ -1,9 +1,17 @@
 import datetime
+import time
 
+from hr_time.api.utils.container import Lifetime, services
 
+
+@services.provide(Lifetime.Worker)
 class Clock:
     def date_today(self) -> datetime.date:
         return datetime.date.today()
 
     def now(self) -> datetime.datetime:
         return datetime.datetime.now()
+
+    # Monotonic time in seconds, just meaningful for measuring durations
+    def monotonic(self) -> float:
+        return time.monotonic()
@@ -0,0 +1,98 @@
+from enum import Enum
+from typing import Any, Callable, Optional
+
+import frappe
+
+# In-process fallback of the request scope, used if no frappe request is available (e.g. unit tests)
+_local_request = {}
+
+
+class Lifetime(Enum):
+    # Shared within a single request or background job, e.g. repositories holding in-instance caches
+    Request = 0
+
+    # Shared by all requests and sites of the worker process, just for stateless objects
+    Worker = 1
+
+    # Shared by all requests of the same site within the worker process
+    Site = 2
+
+
+# Hands out shared instances of repositories and services, which are constructed on first use.
+# Lifetimes are declared once per class with provide(), undeclared classes are request-scoped.
+class ServiceContainer:
+    _request_attribute = "hr_time_services"
+
+    lifetimes: dict[type, Lifetime]
+
+    # Instances injected by tests, taking precedence over all scopes
+    overrides: dict[type, Any]
+
+    worker: dict[type, Any]
+    sites: dict[Optional[str], dict[type, Any]]
+
+    def __init__(self):
+        self.lifetimes = {}
+        self.overrides = {}
+        self.worker = {}
+        self.sites = {}
+
+    # Class decorator, declaring the lifetime of the decorated class
+    def provide(self, lifetime: Lifetime):
+        def register(cls: type) -> type:
+            self.lifetimes[cls] = lifetime
+            return cls
+
+        return register
+
+    # Returns the shared instance of the given class, constructed by the given factory (default constructor if None)
+    def get(self, key: type, factory: Optional[Callable[[], Any]] = None) -> Any:
+        if key in self.overrides:
+            return self.overrides[key]
+
+        scope = self._get_scope(self.lifetimes.get(key, Lifetime.Request))
+
+        if key not in scope:
+            scope[key] = key() if factory is None else factory()
+
+        return scope[key]
+
+    # Replaces the instance of the given class, until reset() is called
+    def override(self, key: type, instance: Any):
+        self.overrides[key] = instance
+
+    # Drops all overrides and shared instances
+    def reset(self):
+        self.overrides = {}
+        self.worker = {}
+        self.sites = {}
+        _local_request.clear()
+
+        if self._has_request():
+            setattr(frappe.local, self._request_attribute, {})
+
+    def _get_scope(self, lifetime: Lifetime) -> dict[type, Any]:
+        match lifetime:
+            case Lifetime.Worker:
+                return self.worker
+            case Lifetime.Site:
+                return self.sites.setdefault(getattr(frappe.local, "site", None) if self._has_request() else None, {})
+
+        if not self._has_request():
+            return _local_request
+
+        # frappe.local is released after each request and job, so the scope ends with it
+        scope = getattr(frappe.local, self._request_attribute, None)
+
+        if scope is None:
+            scope = {}
+            setattr(frappe.local, self._request_attribute, scope)
+
+        return scope
+
+    @staticmethod
+    def _has_request() -> bool:
+        return hasattr(frappe, "local")
+
+
+services = ServiceContainer()
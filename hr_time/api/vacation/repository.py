@@ -1,8 +1,11 @@
+import bisect
 import datetime
 from typing import Optional
 
 import frappe
 
+from hr_time.api.utils.container import Lifetime, services
+
 
 class Request:
     is_half_day: bool
@@ -11,6 +14,109 @@ class Request:
         self.is_half_day = is_half_day
 
 
+# Approved leave application of a single employee
+class LeaveApplication:
+    from_date: datetime.date
+
+    # Last day of leave (inclusive)
+    to_date: datetime.date
+
+    is_half_day: bool
+
+    # Day of the half-day leave. If None, the half-day flag applies to all days.
+    half_day_date: Optional[datetime.date]
+
+    def __init__(self, from_date: datetime.date, to_date: datetime.date, is_half_day: bool,
+                 half_day_date: Optional[datetime.date] = None):
+        self.from_date = from_date
+        self.to_date = to_date
+        self.is_half_day = is_half_day
+        self.half_day_date = half_day_date
+
+    def covers(self, date: datetime.date) -> bool:
+        return self.from_date <= date <= self.to_date
+
+    # Returns true if just half of the given day is on leave
+    def is_half_day_on(self, date: datetime.date) -> bool:
+        if not self.is_half_day:
+            return False
+
+        return self.half_day_date is None or self.half_day_date == date
+
+
+# Preloaded approved leave applications of several employees.
+# Per employee, applications get sorted by start date on first lookup, so lookups are done by bisection.
+class ApprovedRequests:
+    # Leave applications by employee ID
+    applications: dict[str, list[LeaveApplication]]
+
+    # Start dates by employee ID, same order as applications
+    _starts: dict[str, list[datetime.date]]
+
+    # Latest end date of all applications up to the same index, by employee ID
+    _max_ends: dict[str, list[datetime.date]]
+
+    def __init__(self):
+        self.applications = {}
+        self._starts = {}
+        self._max_ends = {}
+
+    def insert(self, employee_id: str, application: LeaveApplication):
+        if employee_id not in self.applications:
+            self.applications[employee_id] = []
+
+        self.applications[employee_id].append(application)
+
+        # Index gets rebuilt on next lookup
+        self._starts.pop(employee_id, None)
+
+    # Same as VacationRepository.get_approved_request(), but answered from the preloaded applications
+    def get_approved_request(self, employee_id: str, date: datetime.date) -> Optional[Request]:
+        if employee_id not in self.applications:
+            return None
+
+        if employee_id not in self._starts:
+            self._build(employee_id)
+
+        applications = self.applications[employee_id]
+        max_ends = self._max_ends[employee_id]
+
+        # Latest application starting on or before the given date
+        index = bisect.bisect_right(self._starts[employee_id], date) - 1
+
+        # Approved applications do not overlap usually, so the loop ends after the first iteration in most cases
+        while index >= 0 and max_ends[index] >= date:
+            if applications[index].covers(date):
+                return Request(applications[index].is_half_day_on(date))
+
+            index -= 1
+
+        return None
+
+    # Returns a new instance just containing the applications of the given employees
+    def select(self, employee_ids: list[str]) -> 'ApprovedRequests':
+        requests = ApprovedRequests()
+
+        for employee_id in employee_ids:
+            for application in self.applications.get(employee_id, []):
+                requests.insert(employee_id, application)
+
+        return requests
+
+    def _build(self, employee_id: str):
+        applications = self.applications[employee_id]
+        applications.sort(key=lambda application: application.from_date)
+
+        max_ends = []
+
+        for application in applications:
+            max_ends.append(application.to_date if not max_ends else max(max_ends[-1], application.to_date))
+
+        self._starts[employee_id] = [application.from_date for application in applications]
+        self._max_ends[employee_id] = max_ends
+
+
+@services.provide(Lifetime.Worker)
 class VacationRepository:
     # Returns approved requests
     def get_approved_request(self, employee_id: str, date: datetime.date) -> Optional[Request]:
@@ -22,3 +128,19 @@ class VacationRepository:
             return None
 
         return Request(docs[0]["half_day"])
+
+    # Returns all approved requests of the given employees overlapping the given date range (both inclusive)
+    def get_approved_requests(self, employee_ids: list[str], start: datetime.date,
+                              end: datetime.date) -> ApprovedRequests:
+        docs = frappe.get_all("Leave Application",
+                              fields=["employee", "from_date", "to_date", "half_day", "half_day_date"],
+                              filters=[["employee", "in", employee_ids], ["from_date", "<=", end],
+                                       ["to_date", ">=", start], ["status", "=", "Approved"]])
+
+        requests = ApprovedRequests()
+
+        for doc in docs:
+            requests.insert(doc.employee, LeaveApplication(doc.from_date, doc.to_date, bool(doc.half_day),
+                                                           doc.half_day_date))
+
+        return requests
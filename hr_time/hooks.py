@@ -13,6 +13,37 @@ app_include_js = ["hr_time.bundle.js"]
 
 after_install = "hr_time.setup.install.after_install"
 
+# Already processed days with changed inputs are queued for recalculation.
+# Checkins additionally maintain the day state of the employee and push the status to the desk.
+doc_events = {
+    "Employee Checkin": {
+        "after_insert": "hr_time.api.check_in.events.on_checkin_insert",
+        "on_update": [
+            "hr_time.api.flextime.events.on_checkin_change",
+            "hr_time.api.check_in.events.on_checkin_change"
+        ],
+        "on_trash": "hr_time.api.flextime.events.on_checkin_change",
+        "after_delete": "hr_time.api.check_in.events.on_checkin_change"
+    },
+    "Attendance": {
+        "on_submit": "hr_time.api.flextime.events.on_attendance_change",
+        "on_cancel": "hr_time.api.flextime.events.on_attendance_change"
+    },
+    "Leave Application": {
+        "on_update": "hr_time.api.flextime.events.on_leave_application_change",
+        "on_cancel": "hr_time.api.flextime.events.on_leave_application_change",
+        "on_trash": "hr_time.api.flextime.events.on_leave_application_change"
+    },
+    "Holiday List": {
+        "on_update": "hr_time.api.flextime.events.on_holiday_list_change"
+    },
+    "Employee": {
+        "on_update": "hr_time.api.employee.events.on_employee_change",
+        "on_trash": "hr_time.api.employee.events.on_employee_change",
+        "after_rename": "hr_time.api.employee.events.on_employee_rename"
+    }
+}
+
 scheduler_events = {
     "hourly": [
         "hr_time.api.flextime.api.generate_daily_flextime_status"
@@ -4,6 +4,14 @@
 # import frappe
 from frappe.model.document import Document
 
+from hr_time.api.flextime.break_time import BreakTimeRepository
+from hr_time.api.utils.container import services
+
 
 class Breaktimedefinition(Document):
-    pass
+    # Compiled definitions are cached site-wide
+    def on_update(self):
+        services.get(BreakTimeRepository).clear_cache()
+
+    def on_trash(self):
+        services.get(BreakTimeRepository).clear_cache()
@@ -4,6 +4,17 @@
 # import frappe
 from frappe.model.document import Document
 
+from hr_time.api.flextime.repository import FlextimeStatusRepository
+from hr_time.api.utils.container import services
+
 
 class Flextimedailystatus(Document):
-    pass
+    # Keeps the flextime account head in sync with the latest submitted status
+    def on_submit(self):
+        services.get(FlextimeStatusRepository).update_account(self.employee, self.date, self.time_balance)
+
+    def on_cancel(self):
+        services.get(FlextimeStatusRepository).reset_account(self.employee)
+
+    def on_trash(self):
+        services.get(FlextimeStatusRepository).reset_account(self.employee)
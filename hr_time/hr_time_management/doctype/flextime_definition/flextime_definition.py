@@ -4,6 +4,14 @@
 # import frappe
 from frappe.model.document import Document
 
+from hr_time.api.flextime.definition import FlextimeDefinitionRepository
+from hr_time.api.utils.container import services
+
 
 class Flextimedefinition(Document):
-    pass
+    # Built definitions are cached site-wide
+    def on_update(self):
+        services.get(FlextimeDefinitionRepository).clear_cache()
+
+    def on_trash(self):
+        services.get(FlextimeDefinitionRepository).clear_cache()
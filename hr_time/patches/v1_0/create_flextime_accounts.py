@@ -0,0 +1,19 @@
+import frappe
+
+
+# Creates the flextime account of every employee from the latest submitted daily status
+def execute():
+    frappe.reload_doc("hr_time_management", "doctype", "flextime_account")
+
+    frappe.db.sql("""
+        INSERT INTO `tabFlextime account` (name, creation, modified, owner, modified_by, docstatus, employee,
+            employee_name, last_processed_date, time_balance)
+        SELECT status.employee, NOW(), NOW(), 'Administrator', 'Administrator', 0, status.employee,
+            status.employee_name, status.date, status.time_balance
+        FROM `tabFlextime daily status` status
+        INNER JOIN (
+            SELECT employee, MAX(date) AS date FROM `tabFlextime daily status` WHERE docstatus = 1 GROUP BY employee
+        ) latest ON status.employee = latest.employee AND status.date = latest.date
+        WHERE status.docstatus = 1
+        ON DUPLICATE KEY UPDATE last_processed_date = VALUES(last_processed_date), time_balance = VALUES(time_balance)
+    """)
@@ -0,0 +1,39 @@
+import {EasyCheckinDialog} from "./easy_checkin_dialog";
+import {EasyCheckinStatus} from "./easy_checkin_status";
+
+export class CheckinDashboard {
+    /**
+     * Version of the latest received snapshot
+     */
+    static version = null;
+
+    /**
+     * Loads navbar status, checkin status number card, checkin options and flextime balance at once. Server answers without content, if the
+     * snapshot has not changed since the last refresh.
+     */
+    static refresh() {
+        frappe.call({
+            method: "hr_time.api.flextime.api.get_checkin_dashboard",
+            args: {
+                version: CheckinDashboard.version
+            },
+            callback: (response) => {
+                let snapshot = response.message;
+
+                if (!snapshot.modified) {
+                    return;
+                }
+
+                CheckinDashboard.version = snapshot.version;
+
+                EasyCheckinStatus.update(snapshot.status);
+                EasyCheckinDialog.singleton().set_options(snapshot.options);
+                EasyCheckinDialog.update_card(snapshot.card);
+
+                if (snapshot.balance !== null) {
+                    $('#hr_time_dashboard_flextime_balance').replaceWith(snapshot.balance);
+                }
+            }
+        });
+    }
+}
@@ -1,4 +1,4 @@
-import {EasyCheckinStatus} from "./easy_checkin_status";
+import {CheckinDashboard} from "./checkin_dashboard";
 
 export class EasyCheckinDialog {
     options = [];
@@ -7,24 +7,17 @@ export class EasyCheckinDialog {
     refresh_buttons;
 
     /**
-     * Preloads the current checkin status
+     * Sets the options of the current checkin status, loaded by CheckinDashboard
      */
-    preload() {
-        frappe.call({
-            method: "hr_time.api.flextime.api.get_easy_checkin_options",
-            callback: (response) => {
-                this.options = response.message.options;
-                this.default = response.message.default;
-            }
-        });
+    set_options(options) {
+        this.options = options.options;
+        this.default = options.default;
     }
 
     /**
      * Shows the checkin dialog
      */
     show() {
-        let checkin_dialog = this;
-
         let dialog = new frappe.ui.Dialog({
             title: __("Checkin"),
             fields: [
@@ -45,9 +38,8 @@ export class EasyCheckinDialog {
                         action: values.action
                     },
                     callback: (response) => {
-                        checkin_dialog.refresh_dashboard()
-                        EasyCheckinStatus.render();
-                        checkin_dialog.preload();
+                        // Navbar, checkin status card, options and balance are refreshed by a single request
+                        CheckinDashboard.refresh();
 
                         let message = "Successfully checked in";
 
@@ -97,10 +89,8 @@ export class EasyCheckinDialog {
             dialog.show();
         }
 
+        // Checkin status card is refreshed by CheckinDashboard
         dialog.refresh_buttons = [
-            document
-                .querySelector('[number_card_name="Checkin status"]')
-                .querySelector('[data-action="action-refresh"]'),
             document
                 .querySelector('[number_card_name="Employees present"]')
                 .querySelector('[data-action="action-refresh"]'),
@@ -114,6 +104,23 @@ export class EasyCheckinDialog {
         }, 15_000);
     }
 
+    /**
+     * Replaces the status of the checkin number card (if shown) by the one of the given rendered card
+     */
+    static update_card(html) {
+        let card = document.getElementById("hr_time_number_card_checkin_status");
+
+        if (card === null) {
+            return;
+        }
+
+        $(card).find('.checkin_status').replaceWith($(html).find('.checkin_status'));
+
+        card.querySelector(".checkin_status").onclick = function () {
+            EasyCheckinDialog.singleton().show();
+        }
+    }
+
     /**
      * Returns/Creates the singleton instance
      */
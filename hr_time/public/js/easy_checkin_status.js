@@ -1,17 +1,77 @@
+import {CheckinDashboard} from "./checkin_dashboard";
 import {EasyCheckinDialog} from "./easy_checkin_dialog";
 
 export class EasyCheckinStatus {
-    static render() {
-        frappe.call({
-            method: "hr_time.api.flextime.api.render_navbar_checkin_status",
-            callback: (response) => {
-                $('.navbar .checkin_status').remove();
-
-                $('.navbar .vertical-bar').after(response.message);
-                $('.navbar .checkin_status').click(() => {
-                    EasyCheckinDialog.singleton().show();
-                });
-            }
+    /**
+     * Latest status received from server, null if no status is shown
+     */
+    static status = null;
+
+    /**
+     * Client time (ms) when the latest status was received
+     */
+    static received_at = 0;
+
+    /**
+     * Status label without duration
+     */
+    static base_label = "";
+
+    /**
+     * Subscribes to status updates pushed by server on each checkin and starts counting up the duration locally
+     */
+    static subscribe() {
+        frappe.realtime.on("hr_time_checkin_status", (status) => {
+            EasyCheckinStatus.update(status);
+
+            // Options and balance depend on the changed status as well
+            CheckinDashboard.refresh();
+        });
+
+        setInterval(() => {
+            EasyCheckinStatus.tick();
+        }, 1_000);
+    }
+
+    /**
+     * Replaces the navbar status by the given one
+     */
+    static update(status) {
+        this.status = status || null;
+        this.received_at = Date.now();
+
+        $('.navbar .checkin_status').remove();
+
+        if (this.status === null) {
+            return;
+        }
+
+        $('.navbar .vertical-bar').after(this.status.html);
+        $('.navbar .checkin_status').click(() => {
+            EasyCheckinDialog.singleton().show();
         });
+
+        this.base_label = $('.navbar .checkin_status .label').text();
+        this.tick();
+    }
+
+    /**
+     * Updates the shown duration, without any server request
+     */
+    static tick() {
+        if (this.status === null) {
+            return;
+        }
+
+        let seconds = this.status.duration;
+
+        if (this.status.counting) {
+            seconds += Math.floor((Date.now() - this.received_at) / 1000);
+        }
+
+        let hours = Math.floor(seconds / 3600);
+        let minutes = String(Math.floor((seconds % 3600) / 60)).padStart(2, "0");
+
+        $('.navbar .checkin_status .label').text(this.base_label + " (" + hours + ":" + minutes + ")");
     }
-}
\ No newline at end of file
+}
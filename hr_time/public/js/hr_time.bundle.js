@@ -1,3 +1,4 @@
+import {CheckinDashboard} from "./checkin_dashboard";
 import {EasyCheckinDialog} from "./easy_checkin_dialog";
 import {EasyCheckinStatus} from "./easy_checkin_status";
 
@@ -6,13 +7,10 @@ document.bind_dashboard_easy_checkin = () => {
 }
 
 $(document).ready(function () {
-    EasyCheckinDialog.singleton().preload()
-
     frappe.run_serially([
-      () => EasyCheckinStatus.render(),
+      () => CheckinDashboard.refresh(),
     ]);
 
-    setInterval(function () {
-        EasyCheckinStatus.render()
-    }, 15_000)
+    // Status changes are pushed by server, the duration is counted up locally
+    EasyCheckinStatus.subscribe()
 });
@@ -1,7 +1,8 @@
 from hr_time.api.flextime.break_time import BreakTimeRepository
 from hr_time.api.flextime.definition import FlextimeDefinitionRepository
+from hr_time.api.utils.container import services
 
 
 def after_install():
-    FlextimeDefinitionRepository().create_default()
-    BreakTimeRepository().create_default()
+    services.get(FlextimeDefinitionRepository).create_default()
+    services.get(BreakTimeRepository).create_default()
@@ -21,6 +21,10 @@ class FakeFrappe(object):
     def logger(level, allow_site, file_count):
         return FakeLogger()
 
+    @staticmethod
+    def whitelist(*args, **kwargs):
+        return lambda function: function
+
 
 # noinspection PyTypeChecker
 sys.modules["frappe"] = FakeFrappe
@@ -0,0 +1,103 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock, patch
+
+from hr_time.api.attendance.repository import Attendance, AttendanceRepository, Status
+
+
+# Dict with attribute access, like frappe._dict
+class Doc(dict):
+    __getattr__ = dict.get
+
+
+class AttendanceRepositoryTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.repository = AttendanceRepository()
+        self.series = {"HR-ATT-2023-": 41}
+        self.inserted = []
+
+        self.db = MagicMock()
+        self.db.sql = MagicMock(side_effect=self._sql)
+        self.db.bulk_insert = MagicMock(side_effect=lambda doc_type, fields, rows: self.inserted.extend(rows))
+
+        # Parts are resolved without consuming any number, like frappe for parts without "#"
+        naming = MagicMock()
+        naming.parse_naming_series = MagicMock(
+            side_effect=lambda parts: "".join("2023" if part == "YYYY" else part for part in parts))
+
+        patches = [
+            patch("hr_time.api.attendance.repository.frappe.db", self.db, create=True),
+            patch("hr_time.api.attendance.repository.frappe.model", MagicMock(naming=naming), create=True),
+            patch("hr_time.api.attendance.repository.frappe.session", MagicMock(user="Administrator"), create=True),
+            patch("hr_time.api.attendance.repository.frappe.utils.now", MagicMock(return_value="now"), create=True),
+            patch("hr_time.api.attendance.repository.frappe.get_all", MagicMock(return_value=[
+                Doc(name="001", employee_name="Test employee", company="Company", department="Department")
+            ]), create=True)
+        ]
+
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_reserve_names_default_digits(self):
+        names = self.repository._reserve_names("HR-ATT-.YYYY.-", 2)
+
+        self.assertEqual(["HR-ATT-2023-00042", "HR-ATT-2023-00043"], names)
+        self.assertEqual(43, self.series["HR-ATT-2023-"])
+
+    def test_reserve_names_series_digits(self):
+        names = self.repository._reserve_names("HR-ATT-.YYYY.-.###", 2)
+
+        self.assertEqual(["HR-ATT-2023-042", "HR-ATT-2023-043"], names)
+
+    def test_reserve_names_new_series(self):
+        names = self.repository._reserve_names("ATT-.########", 1)
+
+        self.assertEqual(["ATT-00000001"], names)
+        self.assertEqual(1, self.series["ATT-"])
+
+    def test_create_all_skips_missing_employee(self):
+        self._set_naming_series("HR-ATT-.YYYY.-")
+
+        created = self.repository.create_all([
+            Attendance("001", datetime.date(2023, 10, 13), Status.Present, None),
+            Attendance("002", datetime.date(2023, 10, 13), Status.Present, None)
+        ], skip_hooks=True)
+
+        self.assertEqual(1, created)
+        self.assertEqual(1, len(self.inserted))
+        self.assertEqual(("HR-ATT-2023-00042", "001", "Test employee"),
+                         (self.inserted[0][0], self.inserted[0][7], self.inserted[0][8]))
+
+        # Just one name is reserved
+        self.assertEqual(42, self.series["HR-ATT-2023-"])
+
+    def test_create_all_no_employee_left(self):
+        self._set_naming_series("HR-ATT-.YYYY.-")
+
+        created = self.repository.create_all([Attendance("002", datetime.date(2023, 10, 13), Status.Present, None)],
+                                             skip_hooks=True)
+
+        self.assertEqual(0, created)
+        self.db.sql.assert_not_called()
+        self.db.bulk_insert.assert_not_called()
+
+    # Simulates the series table
+    def _sql(self, query, values=None):
+        if query.startswith("SELECT"):
+            return [(self.series[values],)] if values in self.series else []
+
+        if query.startswith("UPDATE"):
+            self.series[values[1]] += values[0]
+        else:
+            self.series[values[0]] = values[1]
+
+    def _set_naming_series(self, naming_series: str):
+        meta = MagicMock()
+        meta.get_field = MagicMock(return_value=MagicMock(options=naming_series + "\nOTHER-.####"))
+
+        patcher = patch("hr_time.api.attendance.repository.frappe.get_meta", MagicMock(return_value=meta), create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
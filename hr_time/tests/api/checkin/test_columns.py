@@ -0,0 +1,113 @@
+import datetime
+import random
+import unittest
+
+from hr_time.api.check_in.columns import CheckinColumns
+from hr_time.api.check_in.event import CheckinEvent
+from hr_time.api.check_in.list import CheckinList
+from hr_time.api.flextime.break_time import BreakTimeDefinitions, BreakTime
+from hr_time.api.flextime.repository import FlextimeDailyStatus
+
+
+class TestCheckinColumns(unittest.TestCase):
+    def test_get_durations_equal_to_list(self):
+        generator = random.Random(42)
+
+        for _ in range(500):
+            events = self.random_events(generator, datetime.date(2023, 10, 9))
+
+            expected = CheckinList(list(events)).get_durations()
+            actual = CheckinColumns.from_events(events).get_durations().materialize()
+
+            self.assertEqual(self.to_tuples(expected), self.to_tuples(actual))
+
+    def test_get_durations_sums(self):
+        events = [
+            CheckinEvent("001", datetime.datetime(2023, 10, 9, 9, 0), True, False),
+            CheckinEvent("002", datetime.datetime(2023, 10, 9, 12, 0), False, True),
+            CheckinEvent("003", datetime.datetime(2023, 10, 9, 12, 30), True, False),
+            CheckinEvent("004", datetime.datetime(2023, 10, 9, 15, 0), False, False),
+        ]
+
+        durations = CheckinColumns.from_events(events).get_durations()
+
+        self.assertEqual(3, len(durations))
+        self.assertEqual(19_800, durations.work_time)
+        self.assertEqual(1_800, durations.break_time)
+        self.assertTrue(durations.has_break())
+
+    def test_get_durations_range(self):
+        columns = CheckinColumns.from_events([
+            CheckinEvent("001", datetime.datetime(2023, 10, 9, 9, 0), True, False),
+            CheckinEvent("002", datetime.datetime(2023, 10, 9, 17, 0), False, False),
+            CheckinEvent("003", datetime.datetime(2023, 10, 10, 8, 0), True, False),
+            CheckinEvent("004", datetime.datetime(2023, 10, 10, 12, 0), False, False),
+        ])
+
+        durations = columns.get_durations(2, 4).materialize()
+
+        self.assertEqual(1, len(durations))
+        self.assertEqual(14_400, durations[0].total_time)
+        self.assertEqual("003", durations[0].event_first)
+        self.assertEqual("004", durations[0].event_second)
+
+    def test_split_by_day(self):
+        columns = CheckinColumns.from_events([
+            CheckinEvent("001", datetime.datetime(2023, 10, 9, 0, 0), True, False),
+            CheckinEvent("002", datetime.datetime(2023, 10, 9, 23, 59, 59), False, False),
+            CheckinEvent("003", datetime.datetime(2023, 10, 12, 8, 0), True, False),
+        ])
+
+        self.assertEqual({
+            datetime.date(2023, 10, 9): (0, 2),
+            datetime.date(2023, 10, 12): (2, 3)
+        }, columns.split_by_day())
+
+        lists = CheckinList.split_columns_by_day(columns)
+        self.assertEqual(["001", "002"], [event.id for event in lists[datetime.date(2023, 10, 9)].events])
+        self.assertEqual(datetime.datetime(2023, 10, 12, 8, 0), lists[datetime.date(2023, 10, 12)].events[0].timestamp)
+        self.assertTrue(lists[datetime.date(2023, 10, 12)].events[0].is_in)
+
+    def test_daily_status_equal_to_objects(self):
+        definitions = BreakTimeDefinitions()
+        definitions.insert(BreakTime(21_600, 1_800), False)
+        definitions.insert(BreakTime(32_400, 2_700), False)
+
+        generator = random.Random(7)
+
+        for _ in range(200):
+            events = self.random_events(generator, datetime.date(2023, 10, 9))
+
+            expected = FlextimeDailyStatus("001", datetime.date(2023, 10, 9), 28_800)
+
+            for duration in CheckinList(list(events)).get_durations():
+                expected.insert_duration(duration)
+
+            actual = FlextimeDailyStatus("001", datetime.date(2023, 10, 9), 28_800)
+            actual.insert_durations(CheckinColumns.from_events(events).get_durations())
+
+            expected.calculate(definitions, 3600, False, 1.5)
+            actual.calculate(definitions, 3600, False, 1.5)
+
+            self.assertEqual(expected.total_working_hours, actual.total_working_hours)
+            self.assertEqual(expected.break_time_deducted, actual.break_time_deducted)
+            self.assertEqual(expected.flextime_delta, actual.flextime_delta)
+            self.assertEqual(expected.time_balance, actual.time_balance)
+            self.assertEqual(self.to_tuples(expected.durations), self.to_tuples(actual.durations))
+
+    @staticmethod
+    def random_events(generator: random.Random, day: datetime.date) -> list[CheckinEvent]:
+        timestamp = datetime.datetime.combine(day, datetime.time(6, 0))
+        events = []
+
+        for index in range(generator.randint(0, 10)):
+            timestamp += datetime.timedelta(seconds=generator.randint(1, 4 * 3600))
+            events.append(CheckinEvent("E%03d" % index, timestamp, generator.random() < 0.5,
+                                       generator.random() < 0.3))
+
+        return events
+
+    @staticmethod
+    def to_tuples(durations) -> list[tuple]:
+        return [(duration.start, duration.end, duration.duration_type, duration.total_time, duration.event_first,
+                 duration.event_second) for duration in durations]
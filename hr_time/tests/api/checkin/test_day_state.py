@@ -0,0 +1,86 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock
+
+from hr_time.api.check_in.day_state import DayState
+from hr_time.api.check_in.event import CheckinEvent
+from hr_time.api.check_in.list import CheckinList
+from hr_time.api.utils.clock import Clock
+
+
+class DayStateTest(unittest.TestCase):
+    day = datetime.date(2023, 10, 30)
+
+    def test_empty(self):
+        state = DayState("EMP-009", self.day)
+
+        self.assertFalse(state.has_events())
+        self.assertFalse(state.is_in)
+        self.assertFalse(state.is_break)
+        self.assertEqual(0, state.get_current_duration(datetime.datetime(2023, 10, 30, 12)))
+
+    def test_apply(self):
+        state = DayState.from_events("EMP-009", self.day, [
+            self._event("001", 8, 0, True, False),
+            self._event("002", 12, 0, False, True),
+            self._event("003", 12, 30, True, False),
+        ])
+
+        self.assertTrue(state.is_in)
+        self.assertTrue(state.had_break)
+        self.assertEqual(datetime.datetime(2023, 10, 30, 12, 30), state.state_since)
+        self.assertEqual(datetime.datetime(2023, 10, 30, 8, 0), state.first_checkin)
+        self.assertEqual(14_400, state.work_seconds)
+        self.assertEqual(1_800, state.break_seconds)
+        self.assertEqual("003", state.pending.id)
+
+    def test_current_duration_does_not_modify_state(self):
+        state = DayState.from_events("EMP-009", self.day, [self._event("001", 8, 0, True, False)])
+
+        self.assertEqual(3_600, state.get_current_duration(datetime.datetime(2023, 10, 30, 9, 0)))
+        self.assertEqual(0, state.work_seconds)
+        self.assertTrue(state.is_in)
+
+    # Incremental state matches a replay of the day with CheckinList after each event
+    def test_equal_to_replay(self):
+        events = [
+            self._event("001", 7, 0, False, False),
+            self._event("002", 8, 0, True, False),
+            self._event("003", 8, 5, True, False),
+            self._event("004", 12, 0, False, True),
+            self._event("005", 12, 20, True, False),
+            self._event("006", 14, 0, False, True),
+            self._event("007", 14, 7, True, False),
+            self._event("008", 17, 3, False, False),
+            self._event("009", 18, 0, True, False),
+        ]
+        now = datetime.datetime(2023, 10, 30, 19, 13, 7)
+        state = DayState("EMP-009", self.day)
+
+        for index, event in enumerate(events):
+            state.apply(event)
+
+            replay = CheckinList(events[:index + 1])
+            latest = replay.get_latest()
+            self.assertEqual(latest.is_in, state.is_in)
+            self.assertEqual(latest.is_break, state.is_break)
+            self.assertEqual(replay.has_break(), state.had_break)
+            self.assertEqual(self._get_replay_duration(replay, now), state.get_current_duration(now))
+
+    @staticmethod
+    def _get_replay_duration(events: CheckinList, now: datetime.datetime) -> int:
+        clock = Clock()
+        clock.now = MagicMock(return_value=now)
+
+        events = CheckinList(list(events.events))
+        events.close_current(clock)
+        durations = events.get_durations()
+
+        if not durations:
+            return 0
+
+        return sum(duration.total_time for duration in durations
+                   if duration.duration_type == durations[-1].duration_type)
+
+    def _event(self, name: str, hour: int, minute: int, is_in: bool, is_break: bool) -> CheckinEvent:
+        return CheckinEvent(name, datetime.datetime.combine(self.day, datetime.time(hour, minute)), is_in, is_break)
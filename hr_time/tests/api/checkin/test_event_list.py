@@ -108,5 +108,20 @@ class TestCheckinEventList(unittest.TestCase):
         durations = event_list.get_durations()
         self.assertEqual(0, len(durations))
 
+    def test_split_by_day(self):
+        lists = CheckinList.split_by_day([
+            CheckinEvent("001", datetime.datetime(2023, 5, 1, 9, 0), True, False),
+            CheckinEvent("002", datetime.datetime(2023, 5, 1, 17, 0), False, False),
+            CheckinEvent("003", datetime.datetime(2023, 5, 3, 8, 0), True, False),
+        ])
+
+        self.assertEqual(2, len(lists))
+        self.assertEqual(["001", "002"], [event.id for event in lists[datetime.date(2023, 5, 1)].events])
+        self.assertEqual(["003"], [event.id for event in lists[datetime.date(2023, 5, 3)].events])
+        self.assertNotIn(datetime.date(2023, 5, 2), lists)
+
+    def test_split_by_day_empty(self):
+        self.assertEqual({}, CheckinList.split_by_day([]))
+
     def timestamp(self, hour: int, minute: int, second: int = 0) -> datetime.datetime:
         return datetime.datetime(year=2023, month=5, day=1, hour=hour, minute=minute, second=second)
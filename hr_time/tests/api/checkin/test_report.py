@@ -1,20 +1,21 @@
 import datetime
 import unittest
-from copy import copy
 from unittest.mock import MagicMock
 
+from hr_time.api.check_in.day_state import DayState, DayStateRepository
 from hr_time.api.check_in.event import CheckinEvent
 from hr_time.api.check_in.list import CheckinList
 from hr_time.api.check_in.report import CheckinReportService
 from hr_time.api.check_in.repository import CheckinRepository
 from hr_time.api.check_in.service import State
-from hr_time.api.employee.repository import EmployeeRepository, TimeModel
+from hr_time.api.employee.repository import EmployeeRepository
 from hr_time.tests.fixtures import Fixtures
 
 
 class CheckinReportTest(unittest.TestCase):
     employees: EmployeeRepository
     data: CheckinRepository
+    day_states: DayStateRepository
 
     service: CheckinReportService
 
@@ -23,35 +24,37 @@ class CheckinReportTest(unittest.TestCase):
 
         self.employees = EmployeeRepository()
         self.data = CheckinRepository()
+        self.day_states = DayStateRepository()
+        self.day_states.get_all = MagicMock(return_value={})
 
-        self.service = CheckinReportService(self.employees, self.data)
+        self.service = CheckinReportService(self.employees, self.data, self.day_states)
 
-    def test_get_present_not_flextime_model(self):
-        employee = copy(Fixtures.employee)
-        employee.time_model = TimeModel.Undefined
-
-        self.employees.get_all = MagicMock(return_value=[employee])
+    def test_get_present_no_flextime_employees(self):
+        self.employees.get_flextime = MagicMock(return_value=[])
+        self.data.get_range_by_employee = MagicMock()
         rows = self.service.get_present()
 
-        self.employees.get_all.assert_called_once()
+        self.employees.get_flextime.assert_called_once_with(datetime.date.today())
+        self.data.get_range_by_employee.assert_not_called()
         self.assertEqual(0, len(rows))
 
     def test_get_present_out_of_office(self):
-        self.employees.get_all = MagicMock(return_value=[Fixtures.employee])
+        self.employees.get_flextime = MagicMock(return_value=[Fixtures.employee])
 
-        self.data.get = MagicMock(return_value=CheckinList([
+        self.mock_events([
             CheckinEvent("001", datetime.datetime(year=2023, month=10, day=30, hour=10, minute=30), True, False),
             CheckinEvent("002", datetime.datetime(year=2023, month=10, day=30, hour=12, minute=00), False, True),
             CheckinEvent("003", datetime.datetime(year=2023, month=10, day=30, hour=12, minute=30), True, False),
             CheckinEvent("004", datetime.datetime(year=2023, month=10, day=30, hour=17, minute=00), False, False),
-        ]))
+        ])
 
         rows = self.service.get_present()
         self.assertEqual(0, len(rows))
 
-        self.employees.get_all.assert_called_once()
-        self.data.get.assert_called_once()
-        self.data.get.assert_called_with(datetime.date.today(), "EMP-009")
+        self.employees.get_flextime.assert_called_once()
+        self.day_states.get_all.assert_called_once_with(["EMP-009"], datetime.date.today())
+        self.data.get_range_by_employee.assert_called_once_with(datetime.date.today(), datetime.date.today(),
+                                                                ["EMP-009"])
 
     def test_get_present_break(self):
         self.setup_break_status()
@@ -65,16 +68,17 @@ class CheckinReportTest(unittest.TestCase):
         self.assertEqual(10, rows[0].work_start_today.hour)
         self.assertEqual(30, rows[0].work_start_today.minute)
 
-        self.employees.get_all.assert_called_once()
-        self.data.get.assert_called_once()
-        self.data.get.assert_called_with(datetime.date.today(), "EMP-009")
+        self.employees.get_flextime.assert_called_once()
+        self.day_states.get_all.assert_called_once_with(["EMP-009"], datetime.date.today())
+        self.data.get_range_by_employee.assert_called_once_with(datetime.date.today(), datetime.date.today(),
+                                                                ["EMP-009"])
 
     def test_get_present_work_first_event(self):
-        self.employees.get_all = MagicMock(return_value=[Fixtures.employee])
+        self.employees.get_flextime = MagicMock(return_value=[Fixtures.employee])
 
-        self.data.get = MagicMock(return_value=CheckinList([
+        self.mock_events([
             CheckinEvent("001", datetime.datetime(year=2023, month=10, day=30, hour=10, minute=30), True, False),
-        ]))
+        ])
 
         rows = self.service.get_present()
         self.assertEqual(1, len(rows))
@@ -85,18 +89,19 @@ class CheckinReportTest(unittest.TestCase):
         self.assertEqual(10, rows[0].work_start_today.hour)
         self.assertEqual(30, rows[0].work_start_today.minute)
 
-        self.employees.get_all.assert_called_once()
-        self.data.get.assert_called_once()
-        self.data.get.assert_called_with(datetime.date.today(), "EMP-009")
+        self.employees.get_flextime.assert_called_once()
+        self.day_states.get_all.assert_called_once_with(["EMP-009"], datetime.date.today())
+        self.data.get_range_by_employee.assert_called_once_with(datetime.date.today(), datetime.date.today(),
+                                                                ["EMP-009"])
 
     def test_get_present_work_after_break(self):
-        self.employees.get_all = MagicMock(return_value=[Fixtures.employee])
+        self.employees.get_flextime = MagicMock(return_value=[Fixtures.employee])
 
-        self.data.get = MagicMock(return_value=CheckinList([
+        self.mock_events([
             CheckinEvent("001", datetime.datetime(year=2023, month=10, day=30, hour=10, minute=15), True, False),
             CheckinEvent("002", datetime.datetime(year=2023, month=10, day=30, hour=12, minute=00), False, True),
             CheckinEvent("003", datetime.datetime(year=2023, month=10, day=30, hour=12, minute=30), True, False)
-        ]))
+        ])
 
         rows = self.service.get_present()
         self.assertEqual(1, len(rows))
@@ -107,9 +112,10 @@ class CheckinReportTest(unittest.TestCase):
         self.assertEqual(10, rows[0].work_start_today.hour)
         self.assertEqual(15, rows[0].work_start_today.minute)
 
-        self.employees.get_all.assert_called_once()
-        self.data.get.assert_called_once()
-        self.data.get.assert_called_with(datetime.date.today(), "EMP-009")
+        self.employees.get_flextime.assert_called_once()
+        self.day_states.get_all.assert_called_once_with(["EMP-009"], datetime.date.today())
+        self.data.get_range_by_employee.assert_called_once_with(datetime.date.today(), datetime.date.today(),
+                                                                ["EMP-009"])
 
     def test_get_present_filter_true(self):
         self.setup_break_status()
@@ -124,9 +130,31 @@ class CheckinReportTest(unittest.TestCase):
         self.assertEqual(0, len(rows))
 
     def setup_break_status(self):
-        self.employees.get_all = MagicMock(return_value=[Fixtures.employee])
+        self.employees.get_flextime = MagicMock(return_value=[Fixtures.employee])
 
-        self.data.get = MagicMock(return_value=CheckinList([
+        self.mock_events([
             CheckinEvent("001", datetime.datetime(year=2023, month=10, day=30, hour=10, minute=30), True, False),
             CheckinEvent("002", datetime.datetime(year=2023, month=10, day=30, hour=12, minute=47), False, True),
-        ]))
+        ])
+
+    def test_get_present_stored_state(self):
+        self.employees.get_flextime = MagicMock(return_value=[Fixtures.employee])
+        self.data.get_range_by_employee = MagicMock()
+
+        state = DayState.from_events("EMP-009", datetime.date.today(), [
+            CheckinEvent("001", datetime.datetime(year=2023, month=10, day=30, hour=9, minute=5), True, False),
+        ])
+        self.day_states.get_all = MagicMock(return_value={"EMP-009": state})
+
+        rows = self.service.get_present()
+        self.assertEqual(1, len(rows))
+        self.assertEqual(State.In, rows[0].status)
+        self.assertEqual(9, rows[0].work_start_today.hour)
+        self.assertEqual(5, rows[0].current_status_since.minute)
+
+        self.data.get_range_by_employee.assert_not_called()
+
+    def mock_events(self, events: list[CheckinEvent]):
+        self.data.get_range_by_employee = MagicMock(return_value={
+            "EMP-009": {datetime.date.today(): CheckinList(events)}
+        })
@@ -2,6 +2,7 @@ import datetime
 import unittest
 from unittest.mock import MagicMock
 
+from hr_time.api.check_in.day_state import DayState, DayStateRepository
 from hr_time.api.check_in.event import CheckinEvent
 from hr_time.api.check_in.list import CheckinList
 from hr_time.api.check_in.repository import CheckinRepository
@@ -13,6 +14,7 @@ from hr_time.tests.fixtures import Fixtures
 class CheckinServiceTest(unittest.TestCase):
     employee: EmployeeRepository
     data: CheckinRepository
+    day_states: DayStateRepository
 
     service: CheckinService
 
@@ -21,8 +23,10 @@ class CheckinServiceTest(unittest.TestCase):
 
         self.employee = EmployeeRepository()
         self.data = CheckinRepository()
+        self.day_states = DayStateRepository()
+        self.day_states.get = MagicMock(return_value=None)
 
-        self.service = CheckinService(self.employee, self.data)
+        self.service = CheckinService(self.employee, self.data, self.day_states)
 
     def test_get_current_status_employee_unknown(self):
         self.employee.get_current = MagicMock(return_value=None)
@@ -50,6 +54,34 @@ class CheckinServiceTest(unittest.TestCase):
 
         self.assertEqual(State.Break, self.service.get_current_status().state)
 
+    def test_get_status_of_employee(self):
+        self.employee.get_current = MagicMock()
+        self.data.get = MagicMock(return_value=CheckinList([
+            CheckinEvent("E001", datetime.datetime.now(), True, False),
+            CheckinEvent("E002", datetime.datetime.now(), False, True),
+        ]))
+
+        status = self.service.get_status(Fixtures.employee)
+
+        self.assertEqual(State.Break, status.state)
+        self.assertTrue(status.had_break)
+        self.employee.get_current.assert_not_called()
+        self.data.get.assert_called_once_with(datetime.date.today(), "EMP-009")
+
+    def test_get_status_stored_day_state(self):
+        self.data.get = MagicMock()
+        self.day_states.get = MagicMock(return_value=DayState.from_events("EMP-009", datetime.date.today(), [
+            CheckinEvent("E001", datetime.datetime.now(), True, False),
+            CheckinEvent("E002", datetime.datetime.now(), False, False),
+        ]))
+
+        status = self.service.get_status(Fixtures.employee)
+
+        self.assertEqual(State.Out, status.state)
+        self.assertFalse(status.had_break)
+        self.day_states.get.assert_called_once_with("EMP-009", datetime.date.today())
+        self.data.get.assert_not_called()
+
     def test_get_current_work(self):
         self.employee.get_current = MagicMock(return_value=Fixtures.employee)
         self.data.get = MagicMock(return_value=CheckinList([
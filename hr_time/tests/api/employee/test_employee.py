@@ -1,7 +1,11 @@
 import datetime
 import unittest
 
-from hr_time.api.employee.repository import Employee, TimeModel
+from unittest.mock import MagicMock, patch
+
+from hr_time.api.employee import events
+from hr_time.api.employee.repository import Employee, EmployeeDirectory, EmployeeRepository, TimeModel
+from hr_time.api.utils.container import services
 
 
 class TestEmployee(unittest.TestCase):
@@ -44,3 +48,85 @@ class TestEmployee(unittest.TestCase):
         employee = Employee("test", "Test employee", TimeModel.Undefined, "", datetime.date(2000, 1, 15),
                             datetime.date.today())
         self.assertFalse(employee.is_minor())
+
+    def test_get_processing_end(self):
+        employee = Employee("test", "Test employee", TimeModel.Flextime, "", datetime.date(2000, 1, 15),
+                            datetime.date(2023, 1, 1))
+        self.assertEqual(datetime.date(2023, 10, 14), employee.get_processing_end(datetime.date(2023, 10, 14)))
+
+        employee.relieving_date = datetime.date(2023, 10, 10)
+        self.assertEqual(datetime.date(2023, 10, 11), employee.get_processing_end(datetime.date(2023, 10, 14)))
+        self.assertEqual(datetime.date(2023, 10, 5), employee.get_processing_end(datetime.date(2023, 10, 5)))
+
+    def test_directory_get_active(self):
+        directory = EmployeeDirectory("version")
+        directory.insert(Employee("active", "Active employee", TimeModel.Flextime, "", datetime.date(2000, 1, 15),
+                                  datetime.date(2023, 1, 1), datetime.date(2023, 10, 10)), True)
+        directory.insert(Employee("left", "Left employee", TimeModel.Flextime, "", datetime.date(2000, 1, 15),
+                                  datetime.date(2023, 1, 1), datetime.date(2023, 10, 10)), False)
+
+        self.assertEqual(["active", "left"],
+                         [employee.id for employee in directory.get_active(datetime.date(2023, 10, 10))])
+        self.assertEqual(["active"], [employee.id for employee in directory.get_active(datetime.date(2023, 10, 11))])
+
+    def test_repository_get_flextime_cached(self):
+        directory = EmployeeDirectory("version")
+        directory.insert(Employee("active", "Active employee", TimeModel.Flextime, "", datetime.date(2000, 1, 15),
+                                  datetime.date(2023, 1, 1)), True)
+
+        cache = MagicMock()
+        cache.get = MagicMock(return_value=directory)
+        repository = EmployeeRepository(cache)
+
+        self.assertEqual("active", repository.get_flextime(datetime.date(2023, 10, 10))[0].id)
+        cache.get.assert_called_once_with("employee_directory")
+
+        repository.clear_cache()
+        cache.delete.assert_called_once_with("employee_directory")
+
+    def test_repository_get_current_cached(self):
+        employee = Employee("active", "Active employee", TimeModel.Flextime, "", datetime.date(2000, 1, 15),
+                            datetime.date(2023, 1, 1))
+
+        cache = MagicMock()
+        cache.get = MagicMock(return_value=employee)
+        repository = EmployeeRepository(cache)
+
+        with patch("hr_time.api.employee.repository.frappe.session", MagicMock(user="user@example.com"), create=True):
+            self.assertIs(employee, repository.get_current())
+
+        cache.get.assert_called_once_with("employee_by_user:user@example.com")
+
+    def test_repository_get_current_cached_without_employee(self):
+        cache = MagicMock()
+        cache.get = MagicMock(return_value=False)
+        repository = EmployeeRepository(cache)
+
+        with patch("hr_time.api.employee.repository.frappe.session", MagicMock(user="user@example.com"), create=True):
+            self.assertIsNone(repository.get_current())
+
+    def test_on_employee_change_clears_old_and_new_user(self):
+        repository = MagicMock()
+        doc = MagicMock(user_id="new@example.com")
+        doc.get_doc_before_save = MagicMock(return_value=MagicMock(user_id="old@example.com"))
+
+        services.override(EmployeeRepository, repository)
+        self.addCleanup(services.reset)
+
+        events.on_employee_change(doc, "on_update")
+
+        repository.clear_cache.assert_called_once()
+        repository.clear_user_cache.assert_called_once_with(["new@example.com", "old@example.com"])
+
+    def test_on_employee_rename(self):
+        repository = MagicMock()
+        doc = MagicMock(user_id="user@example.com")
+
+        services.override(EmployeeRepository, repository)
+        self.addCleanup(services.reset)
+
+        events.on_employee_rename(doc, "after_rename", "HR-EMP-00001", "HR-EMP-00002", False)
+
+        repository.clear_cache.assert_called_once()
+        repository.clear_user_cache.assert_called_once_with(["user@example.com"])
+        doc.get_doc_before_save.assert_not_called()
@@ -0,0 +1,125 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock, patch
+
+from hr_time.api.check_in.day_state import DayStateRepository
+from hr_time.api.check_in.service import CheckinService, CheckinStatus, State
+from hr_time.api.employee.repository import Employee, EmployeeRepository, TimeModel
+from hr_time.api.flextime import api
+from hr_time.api.flextime.repository import FlextimeAccount, FlextimeStatusRepository
+from hr_time.api.flextime.stats import FlextimeBalance, FlextimeStatisticsService
+from hr_time.api.utils.container import services
+
+
+class CheckinDashboardTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.employee = Employee("001", "Test employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                                 datetime.date(2023, 10, 1))
+
+        self.employees = MagicMock()
+        self.employees.get_current = MagicMock(return_value=self.employee)
+
+        self.daily_status = MagicMock()
+        self.daily_status.get_account = MagicMock(return_value=FlextimeAccount("001", datetime.date(2023, 10, 13), 2.0))
+
+        self.day_states = MagicMock()
+        self.day_states.get_modified = MagicMock(return_value=datetime.datetime(2023, 10, 14, 8, 0))
+
+        self.checkin = MagicMock()
+        self.checkin.get_status = MagicMock(return_value=CheckinStatus(State.In, False))
+
+        self.stats = MagicMock()
+        self.stats.get_duration = MagicMock(return_value=3600)
+        self.stats.get_employee_balance = MagicMock(return_value=FlextimeBalance(2.0, 0))
+
+        services.override(EmployeeRepository, self.employees)
+        services.override(FlextimeStatusRepository, self.daily_status)
+        services.override(DayStateRepository, self.day_states)
+        services.override(CheckinService, self.checkin)
+        services.override(FlextimeStatisticsService, self.stats)
+
+        patches = [
+            patch("hr_time.api.flextime.api.frappe.local", MagicMock(lang="en"), create=True),
+            patch("hr_time.api.flextime.api.frappe.render_template",
+                  MagicMock(side_effect=lambda template, data: template + ":" + data.get("label", "")), create=True),
+            patch("hr_time.api.check_in.service.frappe._", MagicMock(side_effect=lambda text: text), create=True),
+            patch("hr_time.api.flextime.api.render_flextime_balance", MagicMock(return_value="balance"))
+        ]
+
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        services.reset()
+
+    def test_get_checkin_dashboard(self):
+        dashboard = api.get_checkin_dashboard()
+
+        self.assertTrue(dashboard["modified"])
+        self.assertEqual(api.get_checkin_dashboard_version(self.employee), dashboard["version"])
+        self.assertEqual("templates/navbar/checkin_status.html:Checked in", dashboard["status"]["html"])
+        self.assertEqual(3600, dashboard["status"]["duration"])
+        self.assertTrue(dashboard["status"]["counting"])
+        self.assertEqual("templates/number_card/checkin_status.html:Checked in (1:00)", dashboard["card"])
+        self.assertEqual({"options": ["Break", "End of work"], "default": "Break"}, dashboard["options"])
+        self.assertEqual("balance", dashboard["balance"])
+
+        # Duration is determined once for navbar and card
+        self.stats.get_duration.assert_called_once_with("001")
+
+    def test_get_checkin_dashboard_not_modified(self):
+        version = api.get_checkin_dashboard()["version"]
+        self.checkin.get_status.reset_mock()
+        self.stats.get_employee_balance.reset_mock()
+
+        self.assertEqual({"version": version, "modified": False}, api.get_checkin_dashboard(version))
+
+        self.checkin.get_status.assert_not_called()
+        self.stats.get_employee_balance.assert_not_called()
+
+    def test_get_checkin_dashboard_modified_by_checkin(self):
+        version = api.get_checkin_dashboard()["version"]
+
+        # Checkin updates the stored day state
+        self.day_states.get_modified = MagicMock(return_value=datetime.datetime(2023, 10, 14, 12, 0))
+        self.checkin.get_status = MagicMock(return_value=CheckinStatus(State.Break, False))
+
+        dashboard = api.get_checkin_dashboard(version)
+
+        self.assertTrue(dashboard["modified"])
+        self.assertNotEqual(version, dashboard["version"])
+        self.assertEqual({"options": ["Start of work"], "default": "Start of work"}, dashboard["options"])
+
+    def test_get_checkin_dashboard_modified_by_account(self):
+        version = api.get_checkin_dashboard()["version"]
+
+        # Correction of a processed day changes the balance
+        self.daily_status.get_account = MagicMock(return_value=FlextimeAccount("001", datetime.date(2023, 10, 13), 3.5))
+
+        dashboard = api.get_checkin_dashboard(version)
+
+        self.assertTrue(dashboard["modified"])
+        self.assertNotEqual(version, dashboard["version"])
+
+    def test_get_checkin_dashboard_without_employee(self):
+        self.employees.get_current = MagicMock(return_value=None)
+        self.checkin.get_status = MagicMock(return_value=CheckinStatus(State.Unknown, False))
+
+        dashboard = api.get_checkin_dashboard()
+
+        self.assertTrue(dashboard["modified"])
+        self.assertIsNone(dashboard["status"])
+        self.assertIsNone(dashboard["balance"])
+        self.assertEqual("templates/number_card/checkin_status.html:Unknown (0:00)", dashboard["card"])
+        self.assertEqual({"options": ["Start of work", "Break", "End of work"], "default": ""}, dashboard["options"])
+
+        self.checkin.get_status.assert_called_once_with(None)
+        self.stats.get_duration.assert_not_called()
+        self.day_states.get_modified.assert_not_called()
+        self.daily_status.get_account.assert_not_called()
+
+        self.assertEqual({"version": dashboard["version"], "modified": False},
+                         api.get_checkin_dashboard(dashboard["version"]))
@@ -41,3 +41,29 @@ class TestBreakTimeDefinition(unittest.TestCase):
         self.assertEqual(definition.get_break_time(2500, True), 100)
         self.assertEqual(definition.get_break_time(3000, True), 200)
         self.assertEqual(definition.get_break_time(3500, True), 200)
+
+    def test_get_break_time_unsorted_insert(self):
+        definition = BreakTimeDefinitions()
+        definition.insert(BreakTime(3000, 200), False)
+        definition.insert(BreakTime(1000, 50), False)
+        definition.insert(BreakTime(2000, 100), False)
+
+        self.assertEqual([1000, 2000, 3000], [time.min_working_time for time in definition.regular_times])
+        self.assertEqual(definition.get_break_time(2500, False), 100)
+
+        # Compiled table is rebuilt after inserting another definition
+        definition.insert(BreakTime(2500, 150), False)
+        self.assertEqual(definition.get_break_time(2500, False), 150)
+
+    def test_compile(self):
+        definition = BreakTimeDefinitions()
+        definition.insert(BreakTime(2000, 100), False)
+        definition.insert(BreakTime(1000, 50), True)
+
+        table = definition.compile()
+
+        self.assertIs(table, definition.compile())
+        self.assertEqual((2000,), table.regular_thresholds)
+        self.assertEqual((100,), table.regular_breaks)
+        self.assertEqual((1000,), table.minor_thresholds)
+        self.assertEqual((50,), table.minor_breaks)
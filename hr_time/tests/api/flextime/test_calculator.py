@@ -0,0 +1,83 @@
+import datetime
+import random
+import unittest
+
+from hr_time.api.flextime.break_time import BreakTimeDefinitions, BreakTime
+from hr_time.api.flextime.calculator import DailyStatusCalculator
+from hr_time.api.flextime.repository import FlextimeDailyStatus, CheckinDuration, DurationType
+
+
+class DailyStatusCalculatorTest(unittest.TestCase):
+    definitions: BreakTimeDefinitions
+
+    def setUp(self):
+        super().setUp()
+        self.definitions = BreakTimeDefinitions()
+        self.definitions.insert(BreakTime(21_600, 1_800), False)
+        self.definitions.insert(BreakTime(32_400, 2_700), False)
+        self.definitions.insert(BreakTime(16_200, 1_800), True)
+
+    def test_calculate(self):
+        calculator = DailyStatusCalculator(self.definitions, 3_600)
+
+        days = calculator.calculate([28_800, 25_200, 36_000, 0], [0, 900, 3_600, 0], [False, True, True, False],
+                                    [28_800, 28_800, 14_400.0, 0], [False, False, False, False], 1.5)
+
+        self.assertEqual([3_600, 900, 0, 0], days.break_time_deducted)
+        self.assertEqual([-1.0, -1.25, 6.0, 0.0], days.flextime_delta)
+        self.assertEqual([0.5, -0.75, 5.25, 5.25], days.time_balance)
+
+    def test_calculate_minor(self):
+        calculator = DailyStatusCalculator(self.definitions, 3_600)
+
+        days = calculator.calculate([18_000, 18_000], [600, 600], [True, True], [18_000, 18_000], [True, False], 0)
+
+        self.assertEqual([1_200, 0], days.break_time_deducted)
+
+    def test_calculate_empty(self):
+        days = DailyStatusCalculator(self.definitions, 3_600).calculate([], [], [], [], [], 2.0)
+
+        self.assertEqual([], days.time_balance)
+
+    def test_identical_to_scalar(self):
+        generator = random.Random(1)
+
+        for deducted_time_on_no_break in [0, 1_800, 3_600]:
+            calculator = DailyStatusCalculator(self.definitions, deducted_time_on_no_break)
+            previous = generator.uniform(-50, 50)
+
+            working_times, break_times, breaks_found, targets, minors = [], [], [], [], []
+            expected_balance = previous
+            expected = []
+
+            for index in range(1000):
+                working_time = generator.choice([0, 16_200, 21_600, 32_400, generator.randint(0, 43_200)])
+                break_time = generator.choice([0, generator.randint(0, 3_600)])
+                target = generator.choice([0, 28_800, 21_600, 28_800 / 2, 21_600 / 2])
+                is_minor = generator.random() < 0.2
+
+                status = FlextimeDailyStatus("001", datetime.date(2023, 1, 1) + datetime.timedelta(days=index), target)
+                status.insert_duration(CheckinDuration(datetime.timedelta(hours=6),
+                                                       datetime.timedelta(hours=6, seconds=working_time),
+                                                       DurationType.WORK, "E1", "E2"))
+
+                if break_time:
+                    status.insert_duration(CheckinDuration(datetime.timedelta(hours=1),
+                                                           datetime.timedelta(hours=1, seconds=break_time),
+                                                           DurationType.BREAK, "E3", "E4"))
+
+                status.calculate(self.definitions, deducted_time_on_no_break, is_minor, expected_balance)
+                expected_balance = status.time_balance
+                expected.append(status)
+
+                working_times.append(working_time)
+                break_times.append(break_time)
+                breaks_found.append(break_time > 0)
+                targets.append(target)
+                minors.append(is_minor)
+
+            days = calculator.calculate(working_times, break_times, breaks_found, targets, minors, previous)
+
+            self.assertEqual([status.break_time_deducted for status in expected], days.break_time_deducted)
+            self.assertEqual([status.flextime_delta for status in expected], days.flextime_delta)
+            self.assertEqual([status.time_balance for status in expected], days.time_balance)
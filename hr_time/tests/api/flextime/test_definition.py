@@ -0,0 +1,79 @@
+import datetime
+import pickle
+import unittest
+from unittest.mock import MagicMock, patch
+
+from hr_time.api.flextime.definition import FlextimeDefinition, FlextimeDefinitionRepository
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+# Dict with attribute access, like frappe._dict
+class Doc(dict):
+    __getattr__ = dict.get
+
+
+class FlextimeDefinitionTest(unittest.TestCase):
+    def test_create_from_doc(self):
+        definition = FlextimeDefinition.create_from_doc(self._create_doc())
+
+        self.assertEqual(1800, definition.forced_insufficient_break_time)
+        self.assertEqual(28_800, definition.get_for_weekday(0).working_time)
+        self.assertEqual(datetime.timedelta(hours=10), definition.get_for_weekday(4).core_time_start)
+        self.assertEqual(0, definition.get_for_weekday(6).working_time)
+
+    def test_create_from_doc_is_frozen(self):
+        definition = FlextimeDefinition.create_from_doc(self._create_doc())
+
+        with self.assertRaises(TypeError):
+            definition.days[0] = None
+
+    def test_repository_cached(self):
+        definition = FlextimeDefinition.create_from_doc(self._create_doc())
+        cache = MagicMock()
+        cache.get = MagicMock(return_value={"Full-time": definition})
+
+        repository = FlextimeDefinitionRepository(cache)
+
+        self.assertIs(definition, repository.get_by_grade("Full-time"))
+        self.assertIsNone(repository.get_by_grade("Part-time"))
+        self.assertIsNone(repository.get_by_grade(None))
+        cache.get.assert_called_once_with("flextime_definitions")
+
+    def test_repository_clear_cache(self):
+        cache = MagicMock()
+        cache.get = MagicMock(return_value={})
+
+        repository = FlextimeDefinitionRepository(cache)
+        repository.get_all_by_grade()
+        repository.clear_cache()
+        repository.get_all_by_grade()
+
+        cache.delete.assert_called_once_with("flextime_definitions")
+        self.assertEqual(2, cache.get.call_count)
+
+    def test_repository_definitions_picklable(self):
+        cache = MagicMock()
+        cache.get = MagicMock(return_value=None)
+        repository = FlextimeDefinitionRepository(cache)
+
+        with patch("hr_time.api.flextime.definition.frappe.get_all", MagicMock(return_value=[self._create_doc()]),
+                   create=True):
+            definitions = repository.get_all_by_grade()
+
+        definition = pickle.loads(pickle.dumps(definitions))["Full-time"]
+
+        self.assertEqual(28_800, definition.get_for_weekday(0).working_time)
+        self.assertEqual(0, definition.get_for_weekday(6).working_time)
+
+    @staticmethod
+    def _create_doc() -> Doc:
+        doc = Doc(name="Full-time", forced_insufficient_break_time=1800)
+
+        for weekday in WEEKDAYS:
+            working_hours = None if weekday in ["saturday", "sunday"] else 28_800
+            doc[weekday + "_working_hours"] = working_hours
+            doc[weekday + "_core_time_start"] = datetime.timedelta(hours=10)
+            doc[weekday + "_core_time_end"] = datetime.timedelta(hours=15)
+
+        return doc
@@ -0,0 +1,128 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock, patch
+
+from hr_time.api.flextime import events
+from hr_time.api.flextime.dirty_day import DirtyDayRepository
+from hr_time.api.holiday.repository import HolidayRepository
+from hr_time.api.utils.container import services
+
+
+# Dict with attribute access, like frappe._dict
+class Doc(dict):
+    __getattr__ = dict.get
+
+
+class FlextimeEventsTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.dirty_days = MagicMock()
+        self.holidays = MagicMock()
+
+        services.override(DirtyDayRepository, self.dirty_days)
+        services.override(HolidayRepository, self.holidays)
+
+        patches = [
+            patch("hr_time.api.flextime.events.frappe.utils.getdate",
+                  MagicMock(side_effect=lambda value: value if isinstance(value, datetime.date)
+                            else datetime.date.fromisoformat(value)), create=True),
+            patch("hr_time.api.flextime.events.frappe.utils.get_datetime",
+                  MagicMock(side_effect=lambda value: value), create=True)
+        ]
+
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        services.reset()
+
+    def test_on_checkin_change_moved(self):
+        previous = Doc(employee="001", time=datetime.datetime(2023, 10, 10, 8, 0))
+        doc = self._doc(previous, employee="002", time=datetime.datetime(2023, 10, 11, 8, 0))
+
+        events.on_checkin_change(doc, "on_update")
+
+        self.assertEqual([("001", [datetime.date(2023, 10, 10)]), ("002", [datetime.date(2023, 10, 11)])],
+                         [call.args for call in self.dirty_days.mark.call_args_list])
+
+    def test_on_checkin_change_inserted(self):
+        doc = self._doc(None, employee="001", time=datetime.datetime(2023, 10, 11, 8, 0))
+
+        events.on_checkin_change(doc, "on_update")
+
+        self.dirty_days.mark.assert_called_once_with("001", [datetime.date(2023, 10, 11)])
+
+    def test_on_attendance_change(self):
+        doc = self._doc(None, employee="001", attendance_date="2023-10-11")
+
+        events.on_attendance_change(doc, "on_submit")
+
+        self.dirty_days.mark.assert_called_once_with("001", [datetime.date(2023, 10, 11)])
+
+    def test_on_attendance_change_derived_ignored(self):
+        doc = self._doc(None, employee="001", attendance_date="2023-10-11")
+        doc.flags = Doc(hr_time_derived=True)
+
+        events.on_attendance_change(doc, "on_submit")
+
+        self.dirty_days.mark.assert_not_called()
+
+    def test_on_leave_application_change_range(self):
+        previous = Doc(employee="001", from_date="2023-10-09", to_date="2023-10-10")
+        doc = self._doc(previous, employee="001", from_date="2023-10-10", to_date="2023-10-11")
+
+        events.on_leave_application_change(doc, "on_update")
+
+        marked = set()
+
+        for call in self.dirty_days.mark.call_args_list:
+            self.assertEqual("001", call.args[0])
+            marked |= set(call.args[1])
+
+        self.assertEqual({datetime.date(2023, 10, 9), datetime.date(2023, 10, 10), datetime.date(2023, 10, 11)},
+                         marked)
+
+    def test_on_leave_application_change_moved(self):
+        previous = Doc(employee="001", from_date="2023-10-09", to_date="2023-10-10")
+        doc = self._doc(previous, employee="002", from_date="2023-10-09", to_date="2023-10-10")
+
+        events.on_leave_application_change(doc, "on_update")
+
+        marked = {call.args[0]: sorted(call.args[1]) for call in self.dirty_days.mark.call_args_list}
+        self.assertEqual({
+            "001": [datetime.date(2023, 10, 9), datetime.date(2023, 10, 10)],
+            "002": [datetime.date(2023, 10, 9), datetime.date(2023, 10, 10)]
+        }, marked)
+
+    def test_on_holiday_list_change_symmetric_difference(self):
+        previous = Doc(holidays=[Doc(holiday_date="2023-10-03"), Doc(holiday_date="2023-12-25")])
+        doc = self._doc(previous, name="Default", holidays=[Doc(holiday_date="2023-10-03"),
+                                                            Doc(holiday_date="2023-10-31")])
+        self.holidays.get_employee_ids = MagicMock(return_value=["001", "002"])
+
+        events.on_holiday_list_change(doc, "on_update")
+
+        self.holidays.get_employee_ids.assert_called_once_with("Default")
+        self.assertEqual(["001", "002"], [call.args[0] for call in self.dirty_days.mark.call_args_list])
+
+        for call in self.dirty_days.mark.call_args_list:
+            self.assertEqual({datetime.date(2023, 10, 31), datetime.date(2023, 12, 25)}, set(call.args[1]))
+
+    def test_on_holiday_list_change_unchanged(self):
+        previous = Doc(holidays=[Doc(holiday_date="2023-10-03")])
+        doc = self._doc(previous, name="Default", holidays=[Doc(holiday_date="2023-10-03")])
+
+        events.on_holiday_list_change(doc, "on_update")
+
+        self.holidays.get_employee_ids.assert_not_called()
+        self.dirty_days.mark.assert_not_called()
+
+    @staticmethod
+    def _doc(previous, **values) -> Doc:
+        doc = Doc(values)
+        doc.flags = Doc()
+        doc.get_doc_before_save = MagicMock(return_value=previous)
+
+        return doc
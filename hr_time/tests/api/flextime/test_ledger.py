@@ -0,0 +1,160 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock, patch
+
+from hr_time.api.flextime.ledger import BalanceLedger, BalanceLedgerRepository
+
+
+# Dict with attribute access, like frappe._dict
+class Doc(dict):
+    __getattr__ = dict.get
+
+
+class BalanceLedgerTest(unittest.TestCase):
+    ledger: BalanceLedger
+
+    def setUp(self):
+        super().setUp()
+        self.ledger = BalanceLedger()
+
+        self.ledger.add(datetime.date(2023, 10, 2), 3600)
+        self.ledger.add(datetime.date(2023, 10, 3), -1800)
+        self.ledger.add(datetime.date(2023, 10, 4), 600)
+
+        # Gap of several days without status
+        self.ledger.add(datetime.date(2023, 10, 10), -7200)
+
+    def test_balance_at(self):
+        self.assertEqual(3600, self.ledger.balance_at(datetime.date(2023, 10, 2)))
+        self.assertEqual(1800, self.ledger.balance_at(datetime.date(2023, 10, 3)))
+        self.assertEqual(2400, self.ledger.balance_at(datetime.date(2023, 10, 4)))
+        self.assertEqual(-4800, self.ledger.balance_at(datetime.date(2023, 10, 10)))
+
+    def test_balance_at_gap(self):
+        self.assertEqual(2400, self.ledger.balance_at(datetime.date(2023, 10, 7)))
+
+    def test_balance_at_before_start(self):
+        self.assertEqual(0, self.ledger.balance_at(datetime.date(2023, 10, 1)))
+        self.assertEqual(0, self.ledger.balance_at(datetime.date(2020, 1, 1)))
+
+    def test_balance_at_after_end(self):
+        self.assertEqual(-4800, self.ledger.balance_at(datetime.date(2024, 10, 1)))
+
+    def test_sum_between(self):
+        self.assertEqual(-1200, self.ledger.sum_between(datetime.date(2023, 10, 3), datetime.date(2023, 10, 4)))
+        self.assertEqual(-4800, self.ledger.sum_between(datetime.date(2023, 9, 1), datetime.date(2023, 10, 31)))
+        self.assertEqual(0, self.ledger.sum_between(datetime.date(2023, 10, 5), datetime.date(2023, 10, 9)))
+        self.assertEqual(0, self.ledger.sum_between(datetime.date(2023, 10, 4), datetime.date(2023, 10, 3)))
+
+    def test_correction(self):
+        self.ledger.add(datetime.date(2023, 10, 3), 1800)
+
+        self.assertEqual(3600, self.ledger.balance_at(datetime.date(2023, 10, 3)))
+        self.assertEqual(-3000, self.ledger.balance_at(datetime.date(2023, 10, 10)))
+        self.assertEqual(-3000, self.ledger.total)
+        self.assertEqual(datetime.date(2023, 10, 10), self.ledger.last_date)
+
+    def test_add_before_start(self):
+        self.ledger.add(datetime.date(2023, 9, 29), 60)
+
+        self.assertEqual(datetime.date(2023, 9, 29), self.ledger.start)
+        self.assertEqual(60, self.ledger.balance_at(datetime.date(2023, 9, 30)))
+        self.assertEqual(3660, self.ledger.balance_at(datetime.date(2023, 10, 2)))
+        self.assertEqual(-4740, self.ledger.balance_at(datetime.date(2023, 10, 10)))
+
+    def test_matches_prefix_sums(self):
+        ledger = BalanceLedger()
+        start = datetime.date(2022, 1, 1)
+        deltas = [((day * 7919) % 1000) - 500 for day in range(1000)]
+
+        for day, delta in enumerate(deltas):
+            ledger.add(start + datetime.timedelta(days=day), delta)
+
+        balance = 0
+
+        for day, delta in enumerate(deltas):
+            balance += delta
+            self.assertEqual(balance, ledger.balance_at(start + datetime.timedelta(days=day)))
+
+    def test_empty(self):
+        ledger = BalanceLedger()
+
+        self.assertTrue(ledger.is_empty())
+        self.assertEqual(0, ledger.balance_at(datetime.date(2023, 10, 1)))
+
+
+class BalanceLedgerRepositoryTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = MagicMock()
+        self.cache.get = MagicMock(return_value=None)
+        self.repository = BalanceLedgerRepository(self.cache)
+
+        self.statuses = [Doc(date=datetime.date(2023, 10, 2), flextime_delta=1.0),
+                         Doc(date=datetime.date(2023, 10, 3), flextime_delta=-0.5)]
+
+    def test_get_clean_hit_not_written(self):
+        ledger = self._get(Doc(last_processed_date=datetime.date(2023, 10, 3), time_balance=0.5))
+        self.cache.get = MagicMock(return_value=ledger)
+        self.cache.set.reset_mock()
+
+        get_all = self._get_all_mock()
+
+        with self._patch_account(Doc(last_processed_date=datetime.date(2023, 10, 3), time_balance=0.5)), \
+                patch("hr_time.api.flextime.ledger.frappe.get_all", get_all, create=True):
+            self.assertIs(ledger, self.repository.get("001"))
+
+        get_all.assert_not_called()
+        self.cache.set.assert_not_called()
+
+    def test_get_offset_not_rebuilt_again(self):
+        # Account balance includes an opening balance of 10 hours, which is not part of the deltas
+        account = Doc(last_processed_date=datetime.date(2023, 10, 3), time_balance=10.5)
+        ledger = self._get(account)
+
+        self.assertEqual(36_000, ledger.offset)
+        self.assertEqual(37_800, ledger.balance_at(datetime.date(2023, 10, 3)))
+        self.assertEqual(39_600, ledger.balance_at(datetime.date(2023, 10, 2)))
+        self.assertEqual(36_000, ledger.balance_at(datetime.date(2023, 10, 1)))
+        self.assertEqual(-1800, ledger.sum_between(datetime.date(2023, 10, 3), datetime.date(2023, 10, 3)))
+        self.cache.set.assert_called_once_with("balance_ledger:001", ledger)
+
+        self.cache.get = MagicMock(return_value=ledger)
+        self.cache.set.reset_mock()
+        get_all = self._get_all_mock()
+
+        with self._patch_account(account), patch("hr_time.api.flextime.ledger.frappe.get_all", get_all, create=True):
+            self.assertIs(ledger, self.repository.get("001"))
+
+        get_all.assert_not_called()
+        self.cache.set.assert_not_called()
+
+    def test_get_extended_by_new_days(self):
+        ledger = self._get(Doc(last_processed_date=datetime.date(2023, 10, 3), time_balance=0.5))
+        self.cache.get = MagicMock(return_value=ledger)
+        self.cache.set.reset_mock()
+
+        self.statuses = [Doc(date=datetime.date(2023, 10, 4), flextime_delta=2.0)]
+        get_all = self._get_all_mock()
+
+        with self._patch_account(Doc(last_processed_date=datetime.date(2023, 10, 4), time_balance=2.5)), \
+                patch("hr_time.api.flextime.ledger.frappe.get_all", get_all, create=True):
+            self.assertIs(ledger, self.repository.get("001"))
+
+        get_all.assert_called_once()
+        self.assertEqual(["date", ">", datetime.date(2023, 10, 3)], get_all.call_args.kwargs["filters"][-1])
+        self.assertEqual(9000, ledger.balance_at(datetime.date(2023, 10, 4)))
+        self.cache.set.assert_called_once_with("balance_ledger:001", ledger)
+
+    def _get(self, account: Doc) -> BalanceLedger:
+        with self._patch_account(account), \
+                patch("hr_time.api.flextime.ledger.frappe.get_all", self._get_all_mock(), create=True):
+            return self.repository.get("001")
+
+    def _get_all_mock(self) -> MagicMock:
+        return MagicMock(side_effect=lambda doc_type, **kwargs: self.statuses)
+
+    @staticmethod
+    def _patch_account(account: Doc):
+        return patch("hr_time.api.flextime.ledger.frappe.db", MagicMock(get_value=MagicMock(return_value=account)),
+                     create=True)
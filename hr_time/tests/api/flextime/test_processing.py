@@ -1,19 +1,26 @@
 import datetime
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, call, patch
 
-from hr_time.api.attendance.repository import AttendanceRepository, Attendance, LeaveType, Status
+from hr_time.api.attendance.repository import AttendanceRepository, Attendance, LeaveType, Status, AttendanceIndex
 from hr_time.api.check_in.event import CheckinEvent
 from hr_time.api.check_in.list import CheckinList
 from hr_time.api.check_in.repository import CheckinRepository
 from hr_time.api.employee.repository import EmployeeRepository, Employee, TimeModel
 from hr_time.api.flextime.break_time import BreakTimeRepository, BreakTimeDefinitions
 from hr_time.api.flextime.definition import FlextimeDefinitionRepository, FlextimeDefinition, WorkdayDefinition
-from hr_time.api.flextime.processing import FlexTimeProcessingService
-from hr_time.api.flextime.repository import FlextimeStatusRepository
-from hr_time.api.holiday.repository import HolidayRepository
+from hr_time.api.flextime.dirty_day import DirtyDayRepository
+from hr_time.api.flextime.processing import FlexTimeProcessingService, ProcessingBudget, ProcessingResult
+from hr_time.api.flextime.repository import FlextimeStatusRepository, FlextimeAccount, BookedStatus, \
+    get_amended_name
+from hr_time.api.holiday.repository import HolidayRepository, HolidayCalendar
 from hr_time.api.utils.clock import Clock
-from hr_time.api.vacation.repository import VacationRepository, Request
+from hr_time.api.vacation.repository import VacationRepository, ApprovedRequests, LeaveApplication
+
+
+# Dict with attribute access, like frappe._dict
+class Doc(dict):
+    __getattr__ = dict.get
 
 
 class FlextimeProcessingTest(unittest.TestCase):
@@ -28,6 +35,7 @@ class FlextimeProcessingTest(unittest.TestCase):
     attendance: AttendanceRepository
     vacation: VacationRepository
     checkin: CheckinRepository
+    dirty_days: DirtyDayRepository
 
     service: FlexTimeProcessingService
 
@@ -41,6 +49,7 @@ class FlextimeProcessingTest(unittest.TestCase):
         self.flextime_definition.insert(WorkdayDefinition(4, 21_600, datetime.timedelta(), datetime.timedelta()))
         self.flextime_definition.insert(WorkdayDefinition(5, 0, datetime.timedelta(), datetime.timedelta()))
         self.flextime_definition.insert(WorkdayDefinition(6, 0, datetime.timedelta(), datetime.timedelta()))
+        self.flextime_definition.freeze()
 
         self.clock = Clock()
         self.daily_status = FlextimeStatusRepository()
@@ -51,10 +60,15 @@ class FlextimeProcessingTest(unittest.TestCase):
         self.attendance = AttendanceRepository()
         self.vacation = VacationRepository()
         self.checkin = CheckinRepository()
+        self.dirty_days = DirtyDayRepository()
+
+        self.daily_status.commit = MagicMock()
+        self.dirty_days.get_employee_ids = MagicMock(return_value=[])
+        self.dirty_days.get_dirty_days = MagicMock(return_value={})
 
         self.service = FlexTimeProcessingService(self.clock, self.daily_status, self.employee, self.definitions,
                                                  self.break_times, self.holidays, self.attendance, self.vacation,
-                                                 self.checkin)
+                                                 self.checkin, self.dirty_days)
 
     def test_process_daily_status_no_flextime_time_model(self):
         self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
@@ -99,18 +113,18 @@ class FlextimeProcessingTest(unittest.TestCase):
         today = datetime.date(2023, 10, 16)
         self.clock.date_today = MagicMock(return_value=today)
 
-        self.daily_status.get_latest_status_date = MagicMock(return_value=datetime.date(2023, 10, 15))
-        self.daily_status.get_flextime_balance = MagicMock(return_value=0)
+        self.daily_status.get_account = MagicMock(return_value=FlextimeAccount("001", datetime.date(2023, 10, 15), 0))
         self.daily_status.add = MagicMock()
         self.attendance.create = MagicMock()
+        self.checkin.get_range = MagicMock()
 
         self.service.process_daily_status()
 
-        self.daily_status.get_latest_status_date.assert_called_once()
-        self.daily_status.get_latest_status_date.assert_called_once_with(employee)
+        self.daily_status.get_account.assert_called_once_with("001")
 
         self.daily_status.add.assert_not_called()
         self.attendance.create.assert_not_called()
+        self.checkin.get_range.assert_not_called()
 
     def test_process_daily_status_holiday(self):
         self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
@@ -124,18 +138,17 @@ class FlextimeProcessingTest(unittest.TestCase):
         today = datetime.date(2023, 10, 17)
         self.clock.date_today = MagicMock(return_value=today)
 
-        self.daily_status.get_latest_status_date = MagicMock(return_value=datetime.date(2023, 10, 15))
-        self.daily_status.get_flextime_balance = MagicMock(return_value=1.5)
+        self.daily_status.get_account = MagicMock(return_value=FlextimeAccount("001", datetime.date(2023, 10, 15), 1.5))
         self.daily_status.add = MagicMock()
 
-        self.attendance.get = MagicMock(return_value=None)
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex())
         self.holidays.is_holiday = MagicMock(return_value=True)
 
-        self.checkin.get = MagicMock(return_value=CheckinList([]))
+        self.checkin.get_range = MagicMock(return_value={})
 
         self.service.process_daily_status()
 
-        self.holidays.is_holiday.assert_called_once_with(datetime.date(2023, 10, 16))
+        self.holidays.is_holiday.assert_called_once_with(datetime.date(2023, 10, 16), "001")
         self.attendance.create = MagicMock()
 
         self.daily_status.add.assert_called_once()
@@ -159,18 +172,21 @@ class FlextimeProcessingTest(unittest.TestCase):
         today = datetime.date(2023, 10, 5)
         self.clock.date_today = MagicMock(return_value=today)
 
-        self.daily_status.get_latest_status_date = MagicMock(return_value=None)
-        self.daily_status.get_flextime_balance = MagicMock(return_value=0)
+        self.daily_status.get_account = MagicMock(return_value=None)
         self.daily_status.add = MagicMock()
 
         self.holidays.is_holiday = MagicMock(return_value=False)
-        self.attendance.get = MagicMock(return_value=None)
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex())
 
-        self.checkin.get = MagicMock(return_value=CheckinList([]))
+        self.checkin.get_range = MagicMock(return_value={})
         self.attendance.create = MagicMock()
 
         self.service.process_daily_status()
 
+        self.checkin.get_range.assert_called_once_with(datetime.date(2023, 10, 1), datetime.date(2023, 10, 4), "001")
+        self.attendance.get_range.assert_called_once_with(["001"], datetime.date(2023, 10, 1),
+                                                          datetime.date(2023, 10, 4))
+
         self.holidays.is_holiday.assert_called()
         self.assertEqual(datetime.date(2023, 10, 1), self.holidays.is_holiday.call_args_list[0].args[0])
         self.assertEqual(datetime.date(2023, 10, 2), self.holidays.is_holiday.call_args_list[1].args[0])
@@ -200,41 +216,28 @@ class FlextimeProcessingTest(unittest.TestCase):
         today = datetime.date(2023, 10, 16)
         self.clock.date_today = MagicMock(return_value=today)
 
-        self.daily_status.get_latest_status_date = MagicMock(return_value=datetime.date(2023, 10, 8))
-        self.daily_status.get_flextime_balance = MagicMock(return_value=2.1)
+        self.daily_status.get_account = MagicMock(return_value=FlextimeAccount("001", datetime.date(2023, 10, 8), 2.1))
         self.daily_status.add = MagicMock()
 
         self.holidays.is_holiday = MagicMock(return_value=False)
-        self.attendance.get = MagicMock()
-        self.attendance.get.side_effect = [
-            Attendance("001", today, Status.Present, None),
-            None,
-            None,
-            None,
-            None,
-            None,
-            None
-        ]
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex([
+            Attendance("001", datetime.date(2023, 10, 9), Status.Present, None)
+        ]))
         self.attendance.create = MagicMock()
 
-        self.vacation.get_approved_request = MagicMock(return_value=None)
+        self.vacation.get_approved_requests = MagicMock(return_value=ApprovedRequests())
 
-        self.checkin.get = MagicMock()
-        self.checkin.get.side_effect = [
-            CheckinList([]),
-            CheckinList([]),
-            CheckinList([]),
-            CheckinList([]),
-            CheckinList([
+        self.checkin.get_range = MagicMock(return_value={
+            datetime.date(2023, 10, 13): CheckinList([
                 CheckinEvent("E001", datetime.datetime(2023, 10, 13, 8, 0), True, False),
                 CheckinEvent("E002", datetime.datetime(2023, 10, 13, 10, 0), False, False)
-            ]),
-            CheckinList([]),
-            CheckinList([])
-        ]
+            ])
+        })
 
         self.service.process_daily_status()
 
+        self.checkin.get_range.assert_called_once_with(datetime.date(2023, 10, 9), datetime.date(2023, 10, 15), "001")
+
         self.daily_status.add.assert_called()
         self.assertEqual(datetime.date(2023, 10, 9), self.daily_status.add.call_args_list[0].args[0].date)
         self.assertEqual(28_800, self.daily_status.add.call_args_list[0].args[0].target_working_time)
@@ -291,17 +294,18 @@ class FlextimeProcessingTest(unittest.TestCase):
         today = datetime.date(2023, 11, 21)
         self.clock.date_today = MagicMock(return_value=today)
 
-        self.daily_status.get_latest_status_date = MagicMock(return_value=datetime.date(2023, 11, 19))
-        self.daily_status.get_flextime_balance = MagicMock(return_value=2.1)
+        self.daily_status.get_account = MagicMock(return_value=FlextimeAccount("001", datetime.date(2023, 11, 19), 2.1))
         self.daily_status.add = MagicMock()
 
-        self.checkin.get = MagicMock(return_value=CheckinList([]))
+        self.checkin.get_range = MagicMock(return_value={})
         self.holidays.is_holiday = MagicMock(return_value=False)
 
-        self.attendance.get = MagicMock(return_value=Attendance("001", today, Status.OnLeave, None))
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex([
+            Attendance("001", datetime.date(2023, 11, 20), Status.OnLeave, None)
+        ]))
         self.attendance.create = MagicMock()
 
-        self.vacation.get_approved_request = MagicMock(return_value=None)
+        self.vacation.get_approved_requests = MagicMock(return_value=ApprovedRequests())
 
         self.service.process_daily_status()
 
@@ -309,9 +313,8 @@ class FlextimeProcessingTest(unittest.TestCase):
         self.assertEqual(datetime.date(2023, 11, 20), self.daily_status.add.call_args_list[0].args[0].date)
         self.assertEqual(0, self.daily_status.add.call_args_list[0].args[0].target_working_time)
 
-        self.vacation.get_approved_request.assert_called_once()
-        self.assertEqual("001", self.vacation.get_approved_request.call_args_list[0].args[0])
-        self.assertEqual(datetime.date(2023, 11, 20), self.vacation.get_approved_request.call_args_list[0].args[1])
+        self.vacation.get_approved_requests.assert_called_once_with(["001"], datetime.date(2023, 11, 20),
+                                                                    datetime.date(2023, 11, 20))
 
     def test_process_correct_vacation_request_full_day(self):
         self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
@@ -325,17 +328,18 @@ class FlextimeProcessingTest(unittest.TestCase):
         today = datetime.date(2023, 11, 21)
         self.clock.date_today = MagicMock(return_value=today)
 
-        self.daily_status.get_latest_status_date = MagicMock(return_value=datetime.date(2023, 11, 19))
-        self.daily_status.get_flextime_balance = MagicMock(return_value=2.1)
+        self.daily_status.get_account = MagicMock(return_value=FlextimeAccount("001", datetime.date(2023, 11, 19), 2.1))
         self.daily_status.add = MagicMock()
 
-        self.checkin.get = MagicMock(return_value=CheckinList([]))
+        self.checkin.get_range = MagicMock(return_value={})
         self.holidays.is_holiday = MagicMock(return_value=False)
 
-        self.attendance.get = MagicMock(return_value=Attendance("001", today, Status.OnLeave, None))
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex([
+            Attendance("001", datetime.date(2023, 11, 20), Status.OnLeave, None)
+        ]))
         self.attendance.create = MagicMock()
 
-        self.vacation.get_approved_request = MagicMock(return_value=Request(False))
+        self.vacation.get_approved_requests = MagicMock(return_value=self.get_requests(False))
 
         self.service.process_daily_status()
 
@@ -343,9 +347,8 @@ class FlextimeProcessingTest(unittest.TestCase):
         self.assertEqual(datetime.date(2023, 11, 20), self.daily_status.add.call_args_list[0].args[0].date)
         self.assertEqual(0, self.daily_status.add.call_args_list[0].args[0].target_working_time)
 
-        self.vacation.get_approved_request.assert_called_once()
-        self.assertEqual("001", self.vacation.get_approved_request.call_args_list[0].args[0])
-        self.assertEqual(datetime.date(2023, 11, 20), self.vacation.get_approved_request.call_args_list[0].args[1])
+        self.vacation.get_approved_requests.assert_called_once_with(["001"], datetime.date(2023, 11, 20),
+                                                                    datetime.date(2023, 11, 20))
 
     def test_process_correct_vacation_request_half_day(self):
         self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
@@ -359,17 +362,18 @@ class FlextimeProcessingTest(unittest.TestCase):
         today = datetime.date(2023, 11, 21)
         self.clock.date_today = MagicMock(return_value=today)
 
-        self.daily_status.get_latest_status_date = MagicMock(return_value=datetime.date(2023, 11, 19))
-        self.daily_status.get_flextime_balance = MagicMock(return_value=2.1)
+        self.daily_status.get_account = MagicMock(return_value=FlextimeAccount("001", datetime.date(2023, 11, 19), 2.1))
         self.daily_status.add = MagicMock()
 
-        self.checkin.get = MagicMock(return_value=CheckinList([]))
+        self.checkin.get_range = MagicMock(return_value={})
         self.holidays.is_holiday = MagicMock(return_value=False)
 
-        self.attendance.get = MagicMock(return_value=Attendance("001", today, Status.OnLeave, None))
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex([
+            Attendance("001", datetime.date(2023, 11, 20), Status.OnLeave, None)
+        ]))
         self.attendance.create = MagicMock()
 
-        self.vacation.get_approved_request = MagicMock(return_value=Request(True))
+        self.vacation.get_approved_requests = MagicMock(return_value=self.get_requests(True))
 
         self.service.process_daily_status()
 
@@ -377,9 +381,8 @@ class FlextimeProcessingTest(unittest.TestCase):
         self.assertEqual(datetime.date(2023, 11, 20), self.daily_status.add.call_args_list[0].args[0].date)
         self.assertEqual(14400, self.daily_status.add.call_args_list[0].args[0].target_working_time)
 
-        self.vacation.get_approved_request.assert_called_once()
-        self.assertEqual("001", self.vacation.get_approved_request.call_args_list[0].args[0])
-        self.assertEqual(datetime.date(2023, 11, 20), self.vacation.get_approved_request.call_args_list[0].args[1])
+        self.vacation.get_approved_requests.assert_called_once_with(["001"], datetime.date(2023, 11, 20),
+                                                                    datetime.date(2023, 11, 20))
 
     def test_process_other_leave(self):
         self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
@@ -393,17 +396,18 @@ class FlextimeProcessingTest(unittest.TestCase):
         today = datetime.date(2023, 11, 21)
         self.clock.date_today = MagicMock(return_value=today)
 
-        self.daily_status.get_latest_status_date = MagicMock(return_value=datetime.date(2023, 11, 19))
-        self.daily_status.get_flextime_balance = MagicMock(return_value=2.1)
+        self.daily_status.get_account = MagicMock(return_value=FlextimeAccount("001", datetime.date(2023, 11, 19), 2.1))
         self.daily_status.add = MagicMock()
 
-        self.checkin.get = MagicMock(return_value=CheckinList([]))
+        self.checkin.get_range = MagicMock(return_value={})
         self.holidays.is_holiday = MagicMock(return_value=False)
 
-        self.attendance.get = MagicMock(return_value=Attendance("001", today, Status.Other, None))
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex([
+            Attendance("001", datetime.date(2023, 11, 20), Status.Other, None)
+        ]))
         self.attendance.create = MagicMock()
 
-        self.vacation.get_approved_request = MagicMock()
+        self.vacation.get_approved_requests = MagicMock()
 
         self.service.process_daily_status()
 
@@ -411,4 +415,519 @@ class FlextimeProcessingTest(unittest.TestCase):
         self.assertEqual(datetime.date(2023, 11, 20), self.daily_status.add.call_args_list[0].args[0].date)
         self.assertEqual(28800, self.daily_status.add.call_args_list[0].args[0].target_working_time)
 
-        self.vacation.get_approved_request.assert_not_called()
+        self.vacation.get_approved_requests.assert_not_called()
+
+    def test_process_batch_already_up2date(self):
+        self.employee.get_all = MagicMock(return_value=[
+            Employee("001", "Test employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 10, 1))
+        ])
+        self.definitions.get_by_grade = MagicMock(return_value=self.flextime_definition)
+        self.clock.date_today = MagicMock(return_value=datetime.date(2023, 10, 16))
+
+        self.daily_status.get_due_employee_ids = MagicMock(return_value=["001"])
+        self.daily_status.get_accounts = MagicMock(return_value={
+            "001": FlextimeAccount("001", datetime.date(2023, 10, 15), 1.5)
+        })
+        self.daily_status.add_all = MagicMock()
+        self.checkin.get_range_by_employee = MagicMock()
+        self.attendance.get_range = MagicMock()
+
+        self.service.process_daily_status_batch()
+
+        self.daily_status.get_accounts.assert_called_once()
+        self.checkin.get_range_by_employee.assert_not_called()
+        self.attendance.get_range.assert_not_called()
+        self.daily_status.add_all.assert_not_called()
+
+    def test_process_batch_nothing_due(self):
+        self.clock.date_today = MagicMock(return_value=datetime.date(2023, 10, 16))
+        self.daily_status.get_due_employee_ids = MagicMock(return_value=[])
+        self.daily_status.get_accounts = MagicMock()
+        self.daily_status.add_all = MagicMock()
+        self.employee.get_all = MagicMock()
+        self.break_times.get_definitions = MagicMock()
+
+        result = self.service.process_daily_status_batch()
+
+        self.assertTrue(result.completed)
+        self.assertEqual(0, result.statuses)
+        self.daily_status.get_accounts.assert_not_called()
+        self.employee.get_all.assert_not_called()
+        self.break_times.get_definitions.assert_not_called()
+        self.daily_status.add_all.assert_not_called()
+
+    def test_process_batch_grouped_inputs(self):
+        self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
+
+        self.employee.get_all = MagicMock(return_value=[
+            Employee("001", "Test employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 10, 1)),
+            Employee("002", "New employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 10, 12)),
+            Employee("003", "Other employee", TimeModel.Undefined, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 10, 1)),
+        ])
+        self.definitions.get_by_grade = MagicMock(return_value=self.flextime_definition)
+        self.clock.date_today = MagicMock(return_value=datetime.date(2023, 10, 14))
+
+        self.daily_status.get_due_employee_ids = MagicMock(return_value=["001", "002"])
+        self.daily_status.get_accounts = MagicMock(return_value={
+            "001": FlextimeAccount("001", datetime.date(2023, 10, 12), 2.0)
+        })
+        self.daily_status.add_all = MagicMock()
+        self.holidays.is_holiday = MagicMock(return_value=False)
+
+        self.checkin.get_range_by_employee = MagicMock(return_value={
+            "002": {
+                datetime.date(2023, 10, 12): CheckinList([
+                    CheckinEvent("E001", datetime.datetime(2023, 10, 12, 8, 0), True, False),
+                    CheckinEvent("E002", datetime.datetime(2023, 10, 12, 12, 0), False, False)
+                ])
+            }
+        })
+
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex([
+            Attendance("001", datetime.date(2023, 10, 13), Status.OnLeave, None)
+        ]))
+        self.attendance.create_all = MagicMock(return_value=2)
+
+        requests = ApprovedRequests()
+        requests.insert("001", LeaveApplication(datetime.date(2023, 10, 13), datetime.date(2023, 10, 13), True))
+        self.vacation.get_approved_requests = MagicMock(return_value=requests)
+
+        result = self.service.process_daily_status_batch()
+
+        self.assertEqual(3, result.statuses)
+        self.assertEqual(2, result.attendances)
+
+        self.daily_status.get_due_employee_ids.assert_called_once_with(datetime.date(2023, 10, 14), None)
+        self.daily_status.get_accounts.assert_called_once_with(["001", "002"])
+        self.employee.get_all.assert_called_once_with(["001", "002"])
+
+        start = datetime.date(2023, 10, 12)
+        end = datetime.date(2023, 10, 13)
+        self.checkin.get_range_by_employee.assert_called_once_with(start, end, ["001", "002"])
+        self.attendance.get_range.assert_called_once_with(["001", "002"], start, end)
+        self.vacation.get_approved_requests.assert_called_once_with(["001"], start, end)
+
+        self.daily_status.add_all.assert_called_once()
+        statuses = self.daily_status.add_all.call_args.args[0]
+        self.assertEqual(3, len(statuses))
+
+        self.assertEqual("001", statuses[0].employee_id)
+        self.assertEqual(datetime.date(2023, 10, 13), statuses[0].date)
+        self.assertEqual(10_800, statuses[0].target_working_time)
+        self.assertEqual(-1.0, statuses[0].time_balance)
+
+        self.assertEqual("002", statuses[1].employee_id)
+        self.assertEqual(datetime.date(2023, 10, 12), statuses[1].date)
+        self.assertEqual(14_400, statuses[1].total_working_hours)
+        self.assertEqual(-4.0, statuses[1].time_balance)
+
+        self.assertEqual("002", statuses[2].employee_id)
+        self.assertEqual(datetime.date(2023, 10, 13), statuses[2].date)
+        self.assertEqual(-10.0, statuses[2].time_balance)
+
+        self.attendance.create_all.assert_called_once()
+        attendances = self.attendance.create_all.call_args.args[0]
+        self.assertEqual(2, len(attendances))
+        self.assertEqual("002", attendances[0].employee_id)
+        self.assertEqual(Status.Present, attendances[0].status)
+        self.assertEqual(Status.Absent, attendances[1].status)
+        self.assertFalse(self.attendance.create_all.call_args.args[1])
+
+    def test_process_batch_chunked_insert(self):
+        self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
+        self.employee.get_all = MagicMock(return_value=[
+            Employee("001", "Test employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 10, 9))
+        ])
+        self.definitions.get_by_grade = MagicMock(return_value=self.flextime_definition)
+        self.clock.date_today = MagicMock(return_value=datetime.date(2023, 10, 14))
+
+        self.daily_status.get_due_employee_ids = MagicMock(return_value=["001"])
+        self.daily_status.get_accounts = MagicMock(return_value={})
+        self.daily_status.add_all = MagicMock()
+        self.holidays.is_holiday = MagicMock(return_value=False)
+        self.checkin.get_range_by_employee = MagicMock(return_value={})
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex())
+        self.attendance.create_all = MagicMock(side_effect=lambda attendances, skip_hooks, size: len(attendances))
+        self.vacation.get_approved_requests = MagicMock(return_value=ApprovedRequests())
+
+        with patch("hr_time.api.flextime.processing.BULK_INSERT_SIZE", 2):
+            result = self.service.process_daily_status_batch(skip_attendance_hooks=True)
+
+        self.assertEqual(5, result.statuses)
+        self.assertEqual(5, result.attendances)
+        self.assertTrue(self.attendance.create_all.call_args.args[1])
+
+        self.assertEqual(3, len(self.daily_status.add_all.call_args_list))
+        self.assertEqual(2, len(self.daily_status.add_all.call_args_list[0].args[0]))
+        self.assertEqual(2, len(self.daily_status.add_all.call_args_list[1].args[0]))
+        self.assertEqual(1, len(self.daily_status.add_all.call_args_list[2].args[0]))
+
+    def test_process_batch_recreates_cancelled_day(self):
+        self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
+        self.employee.get_all = MagicMock(return_value=[
+            Employee("001", "Test employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 10, 1))
+        ])
+        self.definitions.get_by_grade = MagicMock(return_value=self.flextime_definition)
+        self.clock.date_today = MagicMock(return_value=datetime.date(2023, 10, 14))
+
+        # Latest status of 2023-10-13 got cancelled, so the account was reset to the day before
+        self.daily_status.get_due_employee_ids = MagicMock(return_value=["001"])
+        self.daily_status.get_accounts = MagicMock(return_value={
+            "001": FlextimeAccount("001", datetime.date(2023, 10, 12), 2.0)
+        })
+        self.daily_status._upsert_accounts = MagicMock()
+        self.holidays.is_holiday = MagicMock(return_value=False)
+        self.checkin.get_range_by_employee = MagicMock(return_value={})
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex())
+        self.attendance.create_all = MagicMock(return_value=0)
+        self.vacation.get_approved_requests = MagicMock()
+
+        existing = {"001-2023-10-13"}
+        inserted = []
+
+        # Fails like the primary key of the table, if a name is already taken
+        def bulk_insert(doc_type, fields, rows):
+            if doc_type == "Flextime daily status":
+                names = [row[0] for row in rows]
+                self.assertFalse(existing & set(names), "Duplicate entry")
+                existing.update(names)
+                inserted.extend(dict(zip(fields, row)) for row in rows)
+
+        def get_all(doc_type, fields, filters, **kwargs):
+            if doc_type == "Flextime daily status":
+                return [Doc(name="001-2023-10-13", employee="001", date=datetime.date(2023, 10, 13))]
+
+            return [Doc(name="001", employee_name="Test employee")]
+
+        with patch("hr_time.api.flextime.repository.frappe.get_all", MagicMock(side_effect=get_all), create=True), \
+                patch("hr_time.api.flextime.repository.frappe.db", MagicMock(bulk_insert=bulk_insert), create=True), \
+                patch("hr_time.api.flextime.repository.frappe.session", MagicMock(user="Administrator"),
+                      create=True), \
+                patch("hr_time.api.flextime.repository.frappe.utils.now", MagicMock(return_value="now"),
+                      create=True), \
+                patch("hr_time.api.flextime.repository.frappe.generate_hash", MagicMock(return_value="hash"),
+                      create=True):
+            result = self.service.process_daily_status_batch()
+
+        self.assertEqual(1, result.statuses)
+        self.assertEqual(1, len(inserted))
+        self.assertEqual("001-2023-10-13-1", inserted[0]["name"])
+        self.assertEqual("001-2023-10-13", inserted[0]["amended_from"])
+        self.assertEqual(datetime.date(2023, 10, 13), inserted[0]["date"])
+
+    def test_get_amended_name(self):
+        self.assertEqual("HR-EMP-00001-2023-10-13-1", get_amended_name("HR-EMP-00001-2023-10-13"))
+        self.assertEqual("HR-EMP-00001-2023-10-13-2", get_amended_name("HR-EMP-00001-2023-10-13-1"))
+        self.assertEqual("HR-EMP-00001-2023-10-13-10", get_amended_name("HR-EMP-00001-2023-10-13-9"))
+
+    def test_process_batch_relieving_date(self):
+        self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
+        self.employee.get_all = MagicMock(return_value=[
+            Employee("001", "Test employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 10, 9), datetime.date(2023, 10, 11))
+        ])
+        self.definitions.get_by_grade = MagicMock(return_value=self.flextime_definition)
+        self.clock.date_today = MagicMock(return_value=datetime.date(2023, 10, 14))
+
+        self.daily_status.get_due_employee_ids = MagicMock(return_value=["001"])
+        self.daily_status.get_accounts = MagicMock(return_value={})
+        self.daily_status.add_all = MagicMock()
+        self.holidays.is_holiday = MagicMock(return_value=False)
+        self.checkin.get_range_by_employee = MagicMock(return_value={})
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex())
+        self.attendance.create_all = MagicMock(side_effect=lambda attendances, skip_hooks, size: len(attendances))
+        self.vacation.get_approved_requests = MagicMock(return_value=ApprovedRequests())
+
+        result = self.service.process_daily_status_batch()
+
+        # Processing ends on the relieving date, without leaving days for the next run
+        self.assertEqual(3, result.statuses)
+        self.assertTrue(result.completed)
+        self.checkin.get_range_by_employee.assert_called_once_with(datetime.date(2023, 10, 9),
+                                                                   datetime.date(2023, 10, 11), ["001"])
+
+        statuses = self.daily_status.add_all.call_args.args[0]
+        self.assertEqual(datetime.date(2023, 10, 11), statuses[-1].date)
+
+    def test_process_batch_max_days(self):
+        self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
+        self.employee.get_all = MagicMock(return_value=[
+            Employee("001", "Test employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 10, 2)),
+            Employee("002", "Other employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 10, 1))
+        ])
+        self.definitions.get_by_grade = MagicMock(return_value=self.flextime_definition)
+        self.clock.date_today = MagicMock(return_value=datetime.date(2023, 10, 14))
+
+        self.daily_status.get_due_employee_ids = MagicMock(return_value=["001", "002"])
+        self.daily_status.get_accounts = MagicMock(return_value={
+            "002": FlextimeAccount("002", datetime.date(2023, 10, 11), 1.0)
+        })
+        self.daily_status.add_all = MagicMock()
+        self.holidays.is_holiday = MagicMock(return_value=False)
+        self.checkin.get_range_by_employee = MagicMock(return_value={})
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex())
+        self.attendance.create_all = MagicMock(side_effect=lambda attendances, skip_hooks, size: len(attendances))
+        self.vacation.get_approved_requests = MagicMock()
+
+        result = self.service.process_daily_status_batch(budget=ProcessingBudget(max_days=3))
+
+        self.assertFalse(result.completed)
+        self.assertEqual(5, result.statuses)
+
+        # Starts differ by more than the prefetch window, so each employee is prefetched separately
+        self.assertEqual([call(datetime.date(2023, 10, 12), datetime.date(2023, 10, 13), ["002"]),
+                          call(datetime.date(2023, 10, 2), datetime.date(2023, 10, 4), ["001"])],
+                         self.checkin.get_range_by_employee.call_args_list)
+
+        statuses = self.daily_status.add_all.call_args.args[0]
+        self.assertEqual([datetime.date(2023, 10, 2), datetime.date(2023, 10, 3), datetime.date(2023, 10, 4)],
+                         [status.date for status in statuses if status.employee_id == "001"])
+        self.assertEqual([datetime.date(2023, 10, 12), datetime.date(2023, 10, 13)],
+                         [status.date for status in statuses if status.employee_id == "002"])
+        self.daily_status.commit.assert_called_once()
+
+    def test_process_batch_backfill_not_widening_prefetch(self):
+        self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
+        self.employee.get_all = MagicMock(return_value=[
+            Employee("001", "Backfilled employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2020, 1, 1)),
+            Employee("002", "Test employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 1, 1)),
+            Employee("003", "Other employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 1, 1))
+        ])
+        self.definitions.get_by_grade = MagicMock(return_value=self.flextime_definition)
+        self.clock.date_today = MagicMock(return_value=datetime.date(2023, 10, 14))
+
+        # Budget is exceeded after the regular employees, so the backfill is not even prefetched
+        self.clock.monotonic = MagicMock(side_effect=[0.0, 1.0, 2.0, 3.0, 100.0, 200.0])
+
+        self.daily_status.get_due_employee_ids = MagicMock(return_value=["001", "002", "003"])
+        self.daily_status.get_accounts = MagicMock(return_value={
+            "002": FlextimeAccount("002", datetime.date(2023, 10, 12), 1.0),
+            "003": FlextimeAccount("003", datetime.date(2023, 10, 11), 2.0)
+        })
+        self.daily_status.add_all = MagicMock()
+        self.holidays.is_holiday = MagicMock(return_value=False)
+        self.checkin.get_range_by_employee = MagicMock(return_value={})
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex())
+        self.attendance.create_all = MagicMock(side_effect=lambda attendances, skip_hooks, size: len(attendances))
+        self.vacation.get_approved_requests = MagicMock()
+
+        result = self.service.process_daily_status_batch(budget=ProcessingBudget(time_limit=50))
+
+        self.assertFalse(result.completed)
+        self.assertEqual(3, result.statuses)
+
+        self.checkin.get_range_by_employee.assert_called_once_with(datetime.date(2023, 10, 12),
+                                                                   datetime.date(2023, 10, 13), ["002", "003"])
+        self.attendance.get_range.assert_called_once_with(["002", "003"], datetime.date(2023, 10, 12),
+                                                          datetime.date(2023, 10, 13))
+
+        statuses = self.daily_status.add_all.call_args.args[0]
+        self.assertEqual(["002", "003", "003"], [status.employee_id for status in statuses])
+
+    def test_process_batch_time_budget(self):
+        self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
+        self.employee.get_all = MagicMock(return_value=[
+            Employee("001", "Test employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 10, 9)),
+            Employee("002", "Other employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 10, 9))
+        ])
+        self.definitions.get_by_grade = MagicMock(return_value=self.flextime_definition)
+        self.clock.date_today = MagicMock(return_value=datetime.date(2023, 10, 14))
+
+        # Each call advances by 10 seconds, so the budget of 25 seconds is exceeded after the second day
+        self.clock.monotonic = MagicMock(side_effect=[float(second) for second in range(0, 1000, 10)])
+
+        self.daily_status.get_due_employee_ids = MagicMock(return_value=["001", "002"])
+        self.daily_status.get_accounts = MagicMock(return_value={})
+        self.daily_status.add_all = MagicMock()
+        self.holidays.is_holiday = MagicMock(return_value=False)
+        self.checkin.get_range_by_employee = MagicMock(return_value={})
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex())
+        self.attendance.create_all = MagicMock(side_effect=lambda attendances, skip_hooks, size: len(attendances))
+        self.vacation.get_approved_requests = MagicMock()
+
+        result = self.service.process_daily_status_batch(budget=ProcessingBudget(time_limit=25))
+
+        self.assertFalse(result.completed)
+        self.assertEqual(2, result.statuses)
+
+        statuses = self.daily_status.add_all.call_args.args[0]
+        self.assertEqual(["001", "001"], [status.employee_id for status in statuses])
+        self.assertEqual(datetime.date(2023, 10, 10), statuses[-1].date)
+        self.daily_status.commit.assert_called_once()
+
+    def test_process_batch_parallel(self):
+        self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
+        self.employee.get_all = MagicMock(return_value=[
+            Employee(employee_id, "Test employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 10, 2)) for employee_id in ["001", "002", "003"]
+        ])
+        self.definitions.get_by_grade = MagicMock(return_value=self.flextime_definition)
+        self.clock.date_today = MagicMock(return_value=datetime.date(2023, 10, 14))
+
+        calendar = HolidayCalendar(())
+        calendar.insert("Default", datetime.date(2023, 10, 3))
+        self.holidays.get_calendar = MagicMock(return_value=calendar)
+        self.holidays.is_holiday = calendar.is_holiday
+
+        self.daily_status.get_due_employee_ids = MagicMock(return_value=["001", "002", "003"])
+        self.daily_status.get_accounts = MagicMock(return_value={
+            "003": FlextimeAccount("003", datetime.date(2023, 10, 9), 1.0)
+        })
+        self.daily_status.add_all = MagicMock()
+        self.checkin.get_range_by_employee = MagicMock(return_value={
+            "002": {
+                datetime.date(2023, 10, 4): CheckinList([
+                    CheckinEvent("E001", datetime.datetime(2023, 10, 4, 8, 0), True, False),
+                    CheckinEvent("E002", datetime.datetime(2023, 10, 4, 17, 0), False, False)
+                ])
+            }
+        })
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex([
+            Attendance("001", datetime.date(2023, 10, 5), Status.OnLeave, None)
+        ]))
+        self.attendance.create_all = MagicMock(side_effect=lambda attendances, skip_hooks, size: len(attendances))
+        self.vacation.get_approved_requests = MagicMock(return_value=self.get_requests(True))
+
+        serial = self.service.process_daily_status_batch()
+        serial_statuses = self.daily_status.add_all.call_args.args[0]
+        serial_attendances = self.attendance.create_all.call_args.args[0]
+
+        parallel = self.service.process_daily_status_batch(workers=2)
+        parallel_statuses = self.daily_status.add_all.call_args.args[0]
+        parallel_attendances = self.attendance.create_all.call_args.args[0]
+
+        self.assertEqual(28, serial.statuses)
+        self.assertEqual(serial.to_dict(), parallel.to_dict())
+
+        self.assertEqual([(status.employee_id, status.date, status.total_working_hours, status.time_balance)
+                          for status in serial_statuses],
+                         [(status.employee_id, status.date, status.total_working_hours, status.time_balance)
+                          for status in parallel_statuses])
+        self.assertEqual([(attendance.employee_id, attendance.date, attendance.status)
+                          for attendance in serial_attendances],
+                         [(attendance.employee_id, attendance.date, attendance.status)
+                          for attendance in parallel_attendances])
+
+    def test_get_due_shards(self):
+        self.clock.date_today = MagicMock(return_value=datetime.date(2023, 10, 14))
+        self.daily_status.get_due_employee_ids = MagicMock(return_value=["001", "002", "003", "004", "005"])
+
+        self.assertEqual([["001", "003", "005"], ["002", "004"]], self.service.get_due_shards(2))
+        self.assertEqual([["001"], ["002"], ["003"], ["004"], ["005"]], self.service.get_due_shards(8))
+
+    def test_get_due_shards_dirty_days(self):
+        self.clock.date_today = MagicMock(return_value=datetime.date(2023, 10, 14))
+        self.daily_status.get_due_employee_ids = MagicMock(return_value=["002", "003"])
+        self.dirty_days.get_employee_ids = MagicMock(return_value=["001", "003"])
+
+        self.assertEqual([["001", "002", "003"]], self.service.get_due_shards(1))
+
+    def test_process_dirty_days(self):
+        self.break_times.get_definitions = MagicMock(return_value=BreakTimeDefinitions())
+        self.employee.get_all = MagicMock(return_value=[
+            Employee("001", "Test employee", TimeModel.Flextime, "Executive", datetime.date(1990, 5, 21),
+                     datetime.date(2023, 10, 1))
+        ])
+        self.definitions.get_by_grade = MagicMock(return_value=self.flextime_definition)
+        self.holidays.is_holiday = MagicMock(return_value=False)
+
+        # 2023-10-20 is not processed yet, so it is just removed from the queue
+        dates = [datetime.date(2023, 10, 10), datetime.date(2023, 10, 12), datetime.date(2023, 10, 20)]
+        self.dirty_days.get_dirty_days = MagicMock(return_value={"001": dates})
+        self.dirty_days.remove = MagicMock()
+
+        self.daily_status.get_accounts = MagicMock(return_value={
+            "001": FlextimeAccount("001", datetime.date(2023, 10, 13), -10.0)
+        })
+        self.daily_status.get_booked_statuses = MagicMock(return_value={
+            datetime.date(2023, 10, 10): BookedStatus("001-2023-10-10", datetime.date(2023, 10, 10), -8.0, -8.0),
+            datetime.date(2023, 10, 12): BookedStatus("001-2023-10-12", datetime.date(2023, 10, 12), -8.0, -10.0)
+        })
+        self.daily_status.correct = MagicMock()
+        self.daily_status.shift_balances = MagicMock()
+
+        # Late check-in of 4 hours on the first day
+        self.checkin.get_range_by_employee = MagicMock(return_value={
+            "001": {
+                datetime.date(2023, 10, 10): CheckinList([
+                    CheckinEvent("E001", datetime.datetime(2023, 10, 10, 8, 0), True, False),
+                    CheckinEvent("E002", datetime.datetime(2023, 10, 10, 12, 0), False, False)
+                ])
+            }
+        })
+        self.attendance.get_range = MagicMock(return_value=AttendanceIndex())
+        self.vacation.get_approved_requests = MagicMock()
+
+        self.assertEqual(2, self.service.process_dirty_days(["001"]))
+
+        self.dirty_days.get_dirty_days.assert_called_once_with(["001"])
+        self.checkin.get_range_by_employee.assert_called_once_with(datetime.date(2023, 10, 10),
+                                                                   datetime.date(2023, 10, 20), ["001"])
+
+        self.assertEqual(2, len(self.daily_status.correct.call_args_list))
+        first = self.daily_status.correct.call_args_list[0].args
+        self.assertEqual("001-2023-10-10", first[0])
+        self.assertEqual(14_400, first[1].total_working_hours)
+        self.assertEqual(-4.0, first[1].time_balance)
+
+        second = self.daily_status.correct.call_args_list[1].args
+        self.assertEqual("001-2023-10-12", second[0])
+        self.assertEqual(-6.0, second[1].time_balance)
+
+        # Unchanged second day does not require another shift
+        self.daily_status.shift_balances.assert_called_once_with("001", datetime.date(2023, 10, 10), 4.0)
+        self.dirty_days.remove.assert_called_once_with("001", dates)
+        self.daily_status.commit.assert_called_once()
+
+    def test_process_shard_leased(self):
+        self.daily_status.acquire_leases = MagicMock(return_value=["001", "003"])
+        self.daily_status.release_leases = MagicMock()
+        self.service.process_daily_status_batch = MagicMock(return_value=ProcessingResult())
+
+        self.service.process_shard(["001", "002", "003"], "worker-1", True, ProcessingBudget(time_limit=240))
+
+        self.daily_status.acquire_leases.assert_called_once_with(["001", "002", "003"], "worker-1", 540)
+        self.service.process_daily_status_batch.assert_called_once()
+        self.assertEqual(["001", "003"], self.service.process_daily_status_batch.call_args.args[3])
+        self.daily_status.release_leases.assert_called_once_with(["001", "003"], "worker-1")
+
+    def test_process_shard_all_leased_by_others(self):
+        self.daily_status.acquire_leases = MagicMock(return_value=[])
+        self.daily_status.release_leases = MagicMock()
+        self.service.process_daily_status_batch = MagicMock()
+
+        result = self.service.process_shard(["001", "002"], "worker-2")
+
+        self.assertEqual(0, result.statuses)
+        self.service.process_daily_status_batch.assert_not_called()
+        self.daily_status.release_leases.assert_not_called()
+
+    def test_process_shard_released_on_error(self):
+        self.daily_status.acquire_leases = MagicMock(return_value=["001"])
+        self.daily_status.release_leases = MagicMock()
+        self.service.process_daily_status_batch = MagicMock(side_effect=RuntimeError("Lost connection"))
+
+        with self.assertRaises(RuntimeError):
+            self.service.process_shard(["001"], "worker-1")
+
+        self.daily_status.release_leases.assert_called_once_with(["001"], "worker-1")
+
+    @staticmethod
+    def get_requests(is_half_day: bool) -> ApprovedRequests:
+        requests = ApprovedRequests()
+        requests.insert("001", LeaveApplication(datetime.date(2023, 11, 17), datetime.date(2023, 11, 24), is_half_day))
+
+        return requests
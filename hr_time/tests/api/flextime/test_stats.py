@@ -2,13 +2,16 @@ import datetime
 import unittest
 from unittest.mock import MagicMock
 
+from hr_time.api.check_in.day_state import DayState, DayStateRepository
 from hr_time.api.check_in.event import CheckinEvent
 from hr_time.api.check_in.list import CheckinList
 from hr_time.api.check_in.repository import CheckinRepository
 from hr_time.api.employee.repository import EmployeeRepository
-from hr_time.api.flextime.repository import FlextimeStatusRepository
+from hr_time.api.flextime.ledger import BalanceLedger, BalanceLedgerRepository
+from hr_time.api.flextime.repository import FlextimeAccount, FlextimeStatusRepository
 from hr_time.api.flextime.stats import FlextimeStatisticsService
 from hr_time.api.utils.clock import Clock
+from hr_time.api.utils.container import services
 from hr_time.tests.fixtures import Fixtures
 
 
@@ -17,6 +20,7 @@ class FlextimeStatisticsServiceTest(unittest.TestCase):
     employee: EmployeeRepository
     status: FlextimeStatusRepository
     checkin: CheckinRepository
+    day_states: DayStateRepository
 
     service: FlextimeStatisticsService
 
@@ -27,8 +31,11 @@ class FlextimeStatisticsServiceTest(unittest.TestCase):
         self.employee = EmployeeRepository()
         self.status = FlextimeStatusRepository()
         self.checkin = CheckinRepository()
+        self.day_states = DayStateRepository()
+        self.day_states.get = MagicMock(return_value=None)
 
-        self.service = FlextimeStatisticsService(self.clock, self.employee, self.status, self.checkin)
+        self.service = FlextimeStatisticsService(self.clock, self.employee, self.status, self.checkin,
+                                                 self.day_states)
 
     def test_get_balance_employee_not_found(self):
         self.employee.get_current = MagicMock(return_value=None)
@@ -88,6 +95,30 @@ class FlextimeStatisticsServiceTest(unittest.TestCase):
         self.assertEqual(datetime.date.today() - datetime.timedelta(days=30),
                          self.status.get_balance_by_date.call_args.args[1])
 
+    def test_get_balance_trend_with_opening_balance(self):
+        today = datetime.date.today()
+
+        # Opening balance of 10 hours is part of the account, but not of any delta
+        ledger = BalanceLedger()
+        ledger.add(today - datetime.timedelta(days=40), 3600)
+        ledger.add(today - datetime.timedelta(days=10), 1800)
+        ledger.offset = 36_000
+
+        ledgers = MagicMock()
+        ledgers.get = MagicMock(return_value=ledger)
+        services.override(BalanceLedgerRepository, ledgers)
+        self.addCleanup(services.reset)
+
+        self.status.get_account = MagicMock(return_value=FlextimeAccount("EMP-009", today, 11.5))
+
+        balance = self.service.get_employee_balance("EMP-009")
+
+        self.assertEqual(11, balance.balance_hours)
+        self.assertEqual(30, balance.balance_minutes)
+        self.assertEqual(0, balance.trend_hours)
+        self.assertEqual(30, balance.trend_minutes)
+        self.assertAlmostEqual(0.5 / 11.5, balance.trend_percent)
+
     def test_get_current_duration_employee_unknown(self):
         self.employee.get_current = MagicMock(return_value=None)
 
@@ -120,6 +151,30 @@ class FlextimeStatisticsServiceTest(unittest.TestCase):
         self.assertEqual(datetime.date.today(), self.checkin.get.call_args.args[0])
         self.assertEqual("EMP-009", self.checkin.get.call_args.args[1])
 
+    def test_get_duration_of_employee(self):
+        self.clock.now = MagicMock(return_value=datetime.datetime(2023, 1, 1, 8, 30))
+
+        self.employee.get_current = MagicMock()
+        self.checkin.get = MagicMock(return_value=CheckinList([
+            CheckinEvent("001", datetime.datetime(2023, 1, 1, 8, 0), True, False),
+        ]))
+
+        self.assertEqual(1800, self.service.get_duration("EMP-009"))
+
+        self.employee.get_current.assert_not_called()
+        self.assertEqual("EMP-009", self.checkin.get.call_args.args[1])
+
+    def test_get_duration_stored_day_state(self):
+        self.clock.now = MagicMock(return_value=datetime.datetime(2023, 1, 1, 13, 0))
+        self.checkin.get = MagicMock()
+        self.day_states.get = MagicMock(return_value=DayState.from_events("EMP-009", datetime.date(2023, 1, 1), [
+            CheckinEvent("001", datetime.datetime(2023, 1, 1, 8, 0), True, False),
+            CheckinEvent("002", datetime.datetime(2023, 1, 1, 12, 0), False, True),
+        ]))
+
+        self.assertEqual(3600, self.service.get_duration("EMP-009"))
+        self.checkin.get.assert_not_called()
+
     def test_get_current_duration_closed_work(self):
         self.employee.get_current = MagicMock(return_value=Fixtures.employee)
         self.checkin.get = MagicMock(return_value=CheckinList([
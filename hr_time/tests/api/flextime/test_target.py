@@ -0,0 +1,108 @@
+import datetime
+import unittest
+
+from hr_time.api.attendance.repository import Attendance, AttendanceIndex, Status
+from hr_time.api.employee.repository import Employee, TimeModel
+from hr_time.api.flextime.definition import FlextimeDefinition, WorkdayDefinition
+from hr_time.api.flextime.target import DayType, TargetCalendar
+from hr_time.api.holiday.repository import HolidayCalendar
+from hr_time.api.vacation.repository import ApprovedRequests, LeaveApplication
+
+
+class TargetCalendarTest(unittest.TestCase):
+    employee: Employee
+    definition: FlextimeDefinition
+    holidays: HolidayCalendar
+    attendances: AttendanceIndex
+    requests: ApprovedRequests
+
+    def setUp(self):
+        super().setUp()
+        # Turns 18 on Wednesday, 2023-10-04
+        self.employee = Employee("employee", "Test employee", TimeModel.Flextime, "Full-time",
+                                 datetime.date(2005, 10, 4), datetime.date(2023, 1, 1))
+
+        self.definition = FlextimeDefinition(3600)
+
+        for weekday in range(7):
+            working_time = 0 if weekday >= 5 else (21_601 if weekday == 4 else 28_800)
+            self.definition.insert(WorkdayDefinition(weekday, working_time, datetime.timedelta(),
+                                                     datetime.timedelta()))
+
+        self.holidays = HolidayCalendar(())
+        self.holidays.insert("Germany", datetime.date(2023, 10, 3))
+        self.holidays.assign("employee", "Germany")
+
+        self.attendances = AttendanceIndex([
+            Attendance("employee", datetime.date(2023, 10, 3), Status.OnLeave),
+            Attendance("employee", datetime.date(2023, 10, 4), Status.OnLeave),
+            Attendance("employee", datetime.date(2023, 10, 5), Status.OnLeave),
+            Attendance("employee", datetime.date(2023, 10, 6), Status.OnLeave),
+        ])
+
+        self.requests = ApprovedRequests()
+        self.requests.insert("employee", LeaveApplication(datetime.date(2023, 10, 3), datetime.date(2023, 10, 4),
+                                                          False))
+        self.requests.insert("employee", LeaveApplication(datetime.date(2023, 10, 6), datetime.date(2023, 10, 6),
+                                                          True))
+
+    def test_build(self):
+        calendar = self._build()
+
+        self.assertEqual(7, len(calendar))
+
+        # Regular workday
+        self.assertEqual(28_800, calendar.get_target_working_time(datetime.date(2023, 10, 2)))
+        self.assertEqual(DayType.Workday, calendar.get_day_type(datetime.date(2023, 10, 2)))
+
+        # Holiday takes precedence over leave
+        self.assertEqual(0, calendar.get_target_working_time(datetime.date(2023, 10, 3)))
+        self.assertEqual(DayType.Holiday, calendar.get_day_type(datetime.date(2023, 10, 3)))
+
+        # Full-day leave
+        self.assertEqual(0, calendar.get_target_working_time(datetime.date(2023, 10, 4)))
+        self.assertEqual(DayType.Leave, calendar.get_day_type(datetime.date(2023, 10, 4)))
+
+        # Leave without request
+        self.assertEqual(0, calendar.get_target_working_time(datetime.date(2023, 10, 5)))
+        self.assertEqual(DayType.Leave, calendar.get_day_type(datetime.date(2023, 10, 5)))
+
+        # Half-day leave
+        self.assertEqual(10_800.5, calendar.get_target_working_time(datetime.date(2023, 10, 6)))
+        self.assertEqual(DayType.HalfDayLeave, calendar.get_day_type(datetime.date(2023, 10, 6)))
+
+        # Weekend
+        self.assertEqual(0, calendar.get_target_working_time(datetime.date(2023, 10, 8)))
+        self.assertEqual(DayType.Workday, calendar.get_day_type(datetime.date(2023, 10, 8)))
+
+    def test_build_integer_targets(self):
+        calendar = self._build()
+
+        self.assertIsInstance(calendar.get_target_working_time(datetime.date(2023, 10, 2)), int)
+
+    def test_is_minor_by_day(self):
+        calendar = self._build()
+
+        self.assertTrue(calendar.is_minor(datetime.date(2023, 10, 2)))
+        self.assertTrue(calendar.is_minor(datetime.date(2023, 10, 3)))
+        self.assertFalse(calendar.is_minor(datetime.date(2023, 10, 4)))
+        self.assertFalse(calendar.is_minor(datetime.date(2023, 10, 8)))
+
+    def test_is_minor_no_birthday(self):
+        self.employee.date_of_birth = None
+        calendar = self._build()
+
+        self.assertFalse(calendar.is_minor(datetime.date(2023, 10, 2)))
+
+    def test_out_of_range(self):
+        calendar = self._build()
+
+        with self.assertRaises(IndexError):
+            calendar.get_target_working_time(datetime.date(2023, 10, 1))
+
+        with self.assertRaises(IndexError):
+            calendar.get_target_working_time(datetime.date(2023, 10, 9))
+
+    def _build(self) -> TargetCalendar:
+        return TargetCalendar.build(self.employee, self.definition, datetime.date(2023, 10, 2),
+                                    datetime.date(2023, 10, 9), self.holidays, self.attendances, self.requests)
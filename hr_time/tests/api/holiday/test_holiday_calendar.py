@@ -0,0 +1,43 @@
+import datetime
+import unittest
+
+from hr_time.api.holiday.repository import HolidayCalendar
+
+
+class HolidayCalendarTest(unittest.TestCase):
+    calendar: HolidayCalendar
+
+    def setUp(self):
+        super().setUp()
+
+        self.calendar = HolidayCalendar(())
+        self.calendar.insert("Germany", datetime.date(2023, 1, 1))
+        self.calendar.insert("Germany", datetime.date(2023, 12, 31))
+        self.calendar.insert("Germany", datetime.date(2024, 2, 29))
+        self.calendar.insert("Bavaria", datetime.date(2023, 8, 15))
+
+        self.calendar.assign("001", "Germany")
+        self.calendar.assign("002", "Bavaria")
+
+    def test_is_holiday_assigned_list(self):
+        self.assertTrue(self.calendar.is_holiday(datetime.date(2023, 1, 1), "001"))
+        self.assertTrue(self.calendar.is_holiday(datetime.date(2023, 12, 31), "001"))
+        self.assertTrue(self.calendar.is_holiday(datetime.date(2024, 2, 29), "001"))
+        self.assertFalse(self.calendar.is_holiday(datetime.date(2023, 8, 15), "001"))
+        self.assertFalse(self.calendar.is_holiday(datetime.date(2024, 3, 1), "001"))
+
+        self.assertTrue(self.calendar.is_holiday(datetime.date(2023, 8, 15), "002"))
+        self.assertFalse(self.calendar.is_holiday(datetime.date(2023, 1, 1), "002"))
+
+    def test_is_holiday_no_assigned_list(self):
+        self.assertTrue(self.calendar.is_holiday(datetime.date(2023, 1, 1), "003"))
+        self.assertTrue(self.calendar.is_holiday(datetime.date(2023, 8, 15)))
+        self.assertFalse(self.calendar.is_holiday(datetime.date(2023, 8, 16)))
+
+    def test_is_holiday_unknown_year(self):
+        self.assertFalse(self.calendar.is_holiday(datetime.date(2022, 1, 1), "001"))
+        self.assertFalse(self.calendar.is_holiday(datetime.date(2022, 1, 1)))
+
+    def test_get_holiday_list(self):
+        self.assertEqual("Germany", self.calendar.get_holiday_list("001"))
+        self.assertIsNone(self.calendar.get_holiday_list("003"))
@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from hr_time.api.check_in.service import CheckinService
+from hr_time.api.employee.repository import EmployeeRepository
+from hr_time.api.utils.clock import Clock
+from hr_time.api.utils.container import Lifetime, ServiceContainer, services
+
+
+class Counter:
+    pass
+
+
+class TestServiceContainer(unittest.TestCase):
+    def setUp(self):
+        self.container = ServiceContainer()
+
+    def tearDown(self):
+        self.container.reset()
+        services.reset()
+
+    def test_get_request_shared_until_reset(self):
+        first = self.container.get(Counter)
+
+        self.assertIs(first, self.container.get(Counter))
+
+        self.container.reset()
+        self.assertIsNot(first, self.container.get(Counter))
+
+    def test_get_request_scoped_by_frappe_local(self):
+        with patch("hr_time.api.utils.container.frappe.local", MagicMock(spec=[]), create=True):
+            first = self.container.get(Counter)
+            self.assertIs(first, self.container.get(Counter))
+
+        # New request
+        with patch("hr_time.api.utils.container.frappe.local", MagicMock(spec=[]), create=True):
+            self.assertIsNot(first, self.container.get(Counter))
+
+    def test_get_worker_shared_across_requests(self):
+        self.container.provide(Lifetime.Worker)(Counter)
+
+        with patch("hr_time.api.utils.container.frappe.local", MagicMock(spec=[]), create=True):
+            first = self.container.get(Counter)
+
+        with patch("hr_time.api.utils.container.frappe.local", MagicMock(spec=[]), create=True):
+            self.assertIs(first, self.container.get(Counter))
+
+    def test_get_site_scoped_by_site(self):
+        self.container.provide(Lifetime.Site)(Counter)
+
+        with patch("hr_time.api.utils.container.frappe.local", MagicMock(site="first"), create=True):
+            first = self.container.get(Counter)
+
+        with patch("hr_time.api.utils.container.frappe.local", MagicMock(site="first"), create=True):
+            self.assertIs(first, self.container.get(Counter))
+
+        with patch("hr_time.api.utils.container.frappe.local", MagicMock(site="second"), create=True):
+            self.assertIsNot(first, self.container.get(Counter))
+
+    def test_get_factory(self):
+        instance = Counter()
+
+        self.assertIs(instance, self.container.get(Counter, lambda: instance))
+
+    def test_override(self):
+        fake = MagicMock()
+        self.container.override(Counter, fake)
+
+        self.assertIs(fake, self.container.get(Counter))
+
+    def test_prod_uses_shared_repositories(self):
+        employee = MagicMock()
+        services.override(EmployeeRepository, employee)
+
+        service = CheckinService.prod()
+
+        self.assertIs(service, CheckinService.prod())
+        self.assertIs(employee, service.employee)
+
+    def test_declared_lifetimes(self):
+        self.assertEqual(Lifetime.Worker, services.lifetimes[Clock])
+        self.assertEqual(Lifetime.Site, services.lifetimes[EmployeeRepository])
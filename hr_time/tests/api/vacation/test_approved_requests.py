@@ -0,0 +1,47 @@
+import datetime
+import unittest
+
+from hr_time.api.vacation.repository import ApprovedRequests, LeaveApplication
+
+
+class ApprovedRequestsTest(unittest.TestCase):
+    requests: ApprovedRequests
+
+    def setUp(self):
+        super().setUp()
+
+        self.requests = ApprovedRequests()
+        self.requests.insert("001", LeaveApplication(datetime.date(2023, 8, 14), datetime.date(2023, 8, 25), False))
+        self.requests.insert("001", LeaveApplication(datetime.date(2023, 5, 2), datetime.date(2023, 5, 2), True))
+        self.requests.insert("001", LeaveApplication(datetime.date(2023, 12, 27), datetime.date(2023, 12, 29), True,
+                                                     datetime.date(2023, 12, 29)))
+        self.requests.insert("002", LeaveApplication(datetime.date(2023, 5, 1), datetime.date(2023, 5, 5), False))
+
+    def test_get_approved_request_full_day(self):
+        self.assertFalse(self.requests.get_approved_request("001", datetime.date(2023, 8, 14)).is_half_day)
+        self.assertFalse(self.requests.get_approved_request("001", datetime.date(2023, 8, 20)).is_half_day)
+        self.assertFalse(self.requests.get_approved_request("001", datetime.date(2023, 8, 25)).is_half_day)
+
+    def test_get_approved_request_half_day(self):
+        self.assertTrue(self.requests.get_approved_request("001", datetime.date(2023, 5, 2)).is_half_day)
+
+    def test_get_approved_request_half_day_date(self):
+        self.assertFalse(self.requests.get_approved_request("001", datetime.date(2023, 12, 27)).is_half_day)
+        self.assertFalse(self.requests.get_approved_request("001", datetime.date(2023, 12, 28)).is_half_day)
+        self.assertTrue(self.requests.get_approved_request("001", datetime.date(2023, 12, 29)).is_half_day)
+
+    def test_get_approved_request_not_covered(self):
+        self.assertIsNone(self.requests.get_approved_request("001", datetime.date(2023, 5, 1)))
+        self.assertIsNone(self.requests.get_approved_request("001", datetime.date(2023, 5, 3)))
+        self.assertIsNone(self.requests.get_approved_request("001", datetime.date(2023, 8, 26)))
+        self.assertIsNone(self.requests.get_approved_request("001", datetime.date(2024, 1, 1)))
+
+    def test_get_approved_request_unknown_employee(self):
+        self.assertIsNone(self.requests.get_approved_request("003", datetime.date(2023, 8, 14)))
+
+    def test_get_approved_request_overlapping(self):
+        self.requests.insert("002", LeaveApplication(datetime.date(2023, 5, 3), datetime.date(2023, 5, 3), True))
+
+        self.assertFalse(self.requests.get_approved_request("002", datetime.date(2023, 5, 4)).is_half_day)
+        self.assertIsNotNone(self.requests.get_approved_request("002", datetime.date(2023, 5, 1)))
+        self.assertIsNone(self.requests.get_approved_request("002", datetime.date(2023, 5, 6)))